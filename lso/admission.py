@@ -0,0 +1,177 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Admission control for jobs that are run by a local executor.
+
+The thread pool and process pool executors queue every submitted job without limit. Admission control bounds the
+amount of jobs that wait for a worker, and optionally the amount of jobs per playbook or executable. Jobs over either
+limit are rejected straight away, with an estimate of when to retry, instead of waiting unseen in the queue.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from fastapi import HTTPException, status
+
+from lso.config import ExecutorType, settings
+
+#: Amount of recent job durations that are used to estimate when a slot frees up.
+_DURATION_SAMPLES = 50
+#: Estimated duration of a job, in seconds, as long as no job has finished yet.
+_DEFAULT_DURATION_SEC = 60.0
+
+
+class JobRejectedError(HTTPException):
+    """Exception raised when a job is not admitted, because the executor is at capacity."""
+
+
+def local_workers() -> int:
+    """Return the amount of workers of the configured local executor."""
+    if settings.EXECUTOR == ExecutorType.PROCESSPOOL:
+        return settings.MAX_PROCESS_POOL_WORKERS
+    return settings.MAX_THREAD_POOL_WORKERS
+
+
+def _mean(durations: deque[float]) -> float:
+    return sum(durations) / len(durations) if durations else _DEFAULT_DURATION_SEC
+
+
+class AdmissionController:
+    """Keep track of the jobs that are in flight in a local executor, and reject new jobs over the configured limits.
+
+    A job is in flight from the moment it is admitted, until it has finished running. The limits are read from the
+    settings on every admission:
+
+    * `MAX_QUEUED_JOBS` bounds the amount of jobs that are in flight but wait for a worker. When it is reached, new jobs
+      are rejected with a 503.
+    * `MAX_CONCURRENT_JOBS` bounds the amount of jobs in flight per playbook or executable. When it is reached, new jobs
+      for that playbook or executable are rejected with a 429.
+
+    Both responses carry a `Retry-After` header, estimated from the durations of recently finished jobs.
+    """
+
+    def __init__(self) -> None:
+        """Start without any jobs in flight."""
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._in_flight_per_name: dict[str, int] = {}
+        self._durations: deque[float] = deque(maxlen=_DURATION_SAMPLES)
+        self._durations_per_name: dict[str, deque[float]] = {}
+
+    def _reject(self, status_code: int, detail: str, retry_after_sec: float) -> JobRejectedError:
+        return JobRejectedError(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_sec)))},
+        )
+
+    def admit(self, name: str) -> Callable[[Future | None], None]:
+        """Admit a job for the given playbook or executable.
+
+        Jobs that are dispatched to Celery are always admitted, since they are queued by the message broker instead.
+
+        Returns:
+            A function that must be added as a done callback to the future of the job, to release its slot. If the job
+            is not run after all, it can be called without a future. Only its first call releases the slot.
+
+        Raises:
+            JobRejectedError: If admitting the job would exceed either of the limits.
+
+        """
+        if settings.EXECUTOR == ExecutorType.WORKER:
+            return lambda _future=None: None
+
+        with self._lock:
+            name_limit = settings.MAX_CONCURRENT_JOBS.get(name)
+            name_in_flight = self._in_flight_per_name.get(name, 0)
+            if name_limit is not None and name_in_flight >= name_limit:
+                durations = self._durations_per_name.get(name, self._durations)
+                raise self._reject(
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    f"Too many jobs for '{name}' are in progress, the limit is {name_limit}.",
+                    _mean(durations) * (name_in_flight - name_limit + 1) / max(name_limit, 1),
+                )
+
+            workers = local_workers()
+            queued = self._in_flight - workers
+            if settings.MAX_QUEUED_JOBS is not None and queued >= settings.MAX_QUEUED_JOBS:
+                raise self._reject(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    f"Too many jobs are waiting to be run, the limit is {settings.MAX_QUEUED_JOBS}.",
+                    _mean(self._durations) * (queued - settings.MAX_QUEUED_JOBS + 1) / workers,
+                )
+
+            self._in_flight += 1
+            self._in_flight_per_name[name] = name_in_flight + 1
+
+        admitted_at = time.monotonic()
+        released = threading.Lock()
+
+        def _release(future: Future | None = None) -> None:
+            if released.acquire(blocking=False):
+                self.release(name, time.monotonic() - admitted_at if future is not None else None)
+
+        return _release
+
+    def admit_all(self, names: list[str]) -> list[Callable[[Future | None], None]]:
+        """Admit a batch of jobs, either all at once or none at all.
+
+        Returns:
+            The release functions of the jobs, in the same order as `names`.
+
+        Raises:
+            JobRejectedError: If admitting any of the jobs would exceed either of the limits. Jobs of the batch that
+                were already admitted are released again.
+
+        """
+        releases: list[Callable[[Future | None], None]] = []
+        try:
+            releases.extend(self.admit(name) for name in names)
+        except JobRejectedError:
+            for release in releases:
+                release()
+            raise
+        return releases
+
+    def release(self, name: str, duration_sec: float | None) -> None:
+        """Release the slot of a finished job, and record how long it was in flight, if it was run."""
+        with self._lock:
+            self._in_flight -= 1
+            self._in_flight_per_name[name] -= 1
+            if not self._in_flight_per_name[name]:
+                del self._in_flight_per_name[name]
+            if duration_sec is None:
+                return
+            self._durations.append(duration_sec)
+            self._durations_per_name.setdefault(name, deque(maxlen=_DURATION_SAMPLES)).append(duration_sec)
+
+    def in_flight(self, name: str | None = None) -> int:
+        """Return the amount of jobs in flight, either in total or for one playbook or executable."""
+        with self._lock:
+            return self._in_flight if name is None else self._in_flight_per_name.get(name, 0)
+
+
+_admission_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Initialize or return a cached AdmissionController for the local executor."""
+    global _admission_controller  # noqa: PLW0603
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+
+    return _admission_controller
@@ -19,9 +19,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from lso import environment
+from lso.catalogue import get_playbook_catalogue
+from lso.config import settings
+from lso.execute import prepare_artifacts_dir
+from lso.outbox import get_callback_outbox
+from lso.routes.callbacks import router as callbacks_router
 from lso.routes.default import router as default_router
 from lso.routes.execute import router as executable_router
+from lso.routes.facts import router as facts_router
+from lso.routes.jobs import router as jobs_router
+from lso.routes.metrics import router as metrics_router
 from lso.routes.playbook import router as playbook_router
+from lso.tracing import tracing_middleware
 
 logger = logging.getLogger(__name__)
 
@@ -34,11 +43,22 @@ def create_app() -> FastAPI:
         CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"]
     )
 
+    if settings.TRACING_ENABLED:
+        app.middleware("http")(tracing_middleware)
+
     app.include_router(default_router, prefix="/api")
     app.include_router(playbook_router, prefix="/api/playbook")
     app.include_router(executable_router, prefix="/api/execute")
+    app.include_router(jobs_router, prefix="/api/jobs")
+    app.include_router(metrics_router, prefix="/api/metrics")
+    app.include_router(facts_router, prefix="/api/facts")
+    app.include_router(callbacks_router, prefix="/api/callbacks")
 
     environment.setup_logging()
+    get_playbook_catalogue()
+    prepare_artifacts_dir()
+    if settings.CALLBACK_OUTBOX_ENABLED:
+        get_callback_outbox()
 
     logger.info("FastAPI app initialised")
 
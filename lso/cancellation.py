@@ -0,0 +1,201 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cancellation of queued and running jobs.
+
+A job is cancelled in the job registry, which is shared by the API and all workers. A queued job is skipped once a
+worker picks it up, or taken out of the queue of the local executor right away. Every process that runs jobs watches the
+registry for cancellations of the jobs it is running, and kills the processes that run them. The same happens to a run
+that passes its deadline. Those processes are found by the `LSO_JOB_ID` environment variable that they are started with.
+"""
+
+import contextlib
+import logging
+import os
+import signal
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from pathlib import Path
+
+from lso.config import settings
+from lso.jobs import get_job_registry
+
+logger = logging.getLogger(__name__)
+
+#: Environment variable that marks the processes that run a job with its job ID.
+JOB_ID_ENVVAR = "LSO_JOB_ID"
+
+
+def job_envvars(job_id: str) -> dict[str, str]:
+    """Return the environment variables that mark the processes of a job, so they can be killed when it is cancelled."""
+    return {JOB_ID_ENVVAR: job_id}
+
+
+def kill_process_group(pid: int) -> None:
+    """Kill the process group of a process, unless it is the process group of LSO itself."""
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        process_group = os.getpgid(pid)
+        if process_group != os.getpgrp():
+            os.killpg(process_group, signal.SIGKILL)
+
+
+def kill_job_processes(job_id: str) -> None:
+    """Kill the process groups of all processes that were started with the environment variables of a job.
+
+    Processes are found through `/proc`, so this only has an effect on Linux.
+    """
+    marker = f"{JOB_ID_ENVVAR}={job_id}".encode()
+    for environ_path in Path("/proc").glob("[0-9]*/environ"):
+        try:
+            if marker in environ_path.read_bytes().split(b"\0"):
+                kill_process_group(int(environ_path.parent.name))
+        except OSError:
+            continue
+
+
+class WatchedRun:
+    """A run of a job, that is terminated once the job is cancelled, or once the run passes its deadline.
+
+    Args:
+        job_id (str): The job ID of the job that is run.
+        terminate (Callable[[], None]): Called once the run must stop, to kill the processes that run it.
+        deadline_sec (int, optional): The wall-clock time that the run may take, in seconds, counted from the moment it
+            is watched. Unbounded when not set.
+
+    Attributes:
+        job_id (str): The job ID of the job that is run.
+        cancelled (threading.Event): Set once the job is cancelled.
+        timed_out (threading.Event): Set once the run has passed its deadline.
+
+    """
+
+    def __init__(self, job_id: str, terminate: Callable[[], None], deadline_sec: int | None = None) -> None:
+        """Store how to terminate the run, and how long it may take."""
+        self.job_id = job_id
+        self.deadline_sec = deadline_sec
+        self.cancelled = threading.Event()
+        self.timed_out = threading.Event()
+        self._terminate = terminate
+
+    def is_stopped(self) -> bool:
+        """Return whether the run must stop, because its job was cancelled or it passed its deadline."""
+        return self.cancelled.is_set() or self.timed_out.is_set()
+
+    def stop(self, *, timed_out: bool) -> None:
+        """Record why the run must stop, and kill the processes that run it."""
+        (self.timed_out if timed_out else self.cancelled).set()
+        logger.info("Terminating job_id=%s, which %s", self.job_id, "timed out" if timed_out else "was cancelled")
+        try:
+            self._terminate()
+        except Exception:
+            logger.exception("Failed to terminate job_id=%s", self.job_id)
+
+
+class CancellationWatcher:
+    """Watch the runs in this process for cancellation of their jobs, and for their deadlines.
+
+    A single background thread polls the job registry every `JOB_CANCEL_POLL_INTERVAL_SEC`, for the jobs of all runs
+    that are being watched at that moment, and terminates the runs of jobs that were cancelled or that passed their
+    deadline.
+    """
+
+    def __init__(self) -> None:
+        """Start without any runs to watch. The polling thread is started once the first run is watched."""
+        self._lock = threading.Lock()
+        self._runs: dict[WatchedRun, float | None] = {}
+        self._thread: threading.Thread | None = None
+
+    @contextlib.contextmanager
+    def watch(self, run: WatchedRun) -> Iterator[WatchedRun]:
+        """Terminate a run if its job is cancelled, or once it passes its deadline, while the context is active."""
+        deadline = time.monotonic() + run.deadline_sec if run.deadline_sec is not None else None
+        with self._lock:
+            self._runs[run] = deadline
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name="lso-cancellation-watcher", daemon=True)
+                self._thread.start()
+        try:
+            yield run
+        finally:
+            with self._lock:
+                self._runs.pop(run, None)
+
+    def _poll(self) -> None:
+        while True:
+            time.sleep(settings.JOB_CANCEL_POLL_INTERVAL_SEC)
+            with self._lock:
+                runs = dict(self._runs)
+            if not runs:
+                continue
+            now = time.monotonic()
+            try:
+                cancelled = get_job_registry().cancelled(list({run.job_id for run in runs}))
+            except sqlite3.Error:
+                logger.exception("Failed to look up cancelled jobs")
+                cancelled = set()
+            for run, deadline in runs.items():
+                timed_out = deadline is not None and now > deadline
+                if run.job_id not in cancelled and not timed_out:
+                    continue
+                with self._lock:
+                    self._runs.pop(run, None)
+                run.stop(timed_out=run.job_id not in cancelled)
+
+
+_watcher: CancellationWatcher | None = None
+_watcher_pid: int | None = None
+_watcher_lock = threading.Lock()
+
+
+def get_cancellation_watcher() -> CancellationWatcher:
+    """Initialize or return a cached `CancellationWatcher` for the current process.
+
+    A new watcher is created after a fork, since the polling thread does not survive it.
+    """
+    global _watcher, _watcher_pid  # noqa: PLW0603
+    with _watcher_lock:
+        if _watcher is None or _watcher_pid != os.getpid():
+            _watcher = CancellationWatcher()
+            _watcher_pid = os.getpid()
+
+    return _watcher
+
+
+_local_jobs: dict[str, set[Future]] = {}
+_local_jobs_lock = threading.Lock()
+
+
+def track_local_job(job_id: str, future: Future) -> None:
+    """Keep track of the future of a job that was submitted to a local executor, until it is done."""
+    with _local_jobs_lock:
+        _local_jobs.setdefault(job_id, set()).add(future)
+
+    def _untrack(done: Future) -> None:
+        with _local_jobs_lock:
+            futures = _local_jobs.get(job_id, set())
+            futures.discard(done)
+            if not futures:
+                _local_jobs.pop(job_id, None)
+
+    future.add_done_callback(_untrack)
+
+
+def cancel_local_job(job_id: str) -> None:
+    """Take a job out of the queue of the local executor, if it has not started yet."""
+    with _local_jobs_lock:
+        futures = list(_local_jobs.get(job_id, ()))
+    for future in futures:
+        future.cancel()
@@ -0,0 +1,163 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory catalogue of the playbooks that are available in `ANSIBLE_PLAYBOOKS_ROOT_DIR`.
+
+The catalogue is kept up to date by polling the modification times of the files in the playbook directory, in a
+background thread. Only files that have changed since the previous poll are hashed again.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+
+from lso.config import settings
+from lso.schema import PlaybookInfo
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_file(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class PlaybookCatalogue:
+    """Index of all files in a playbook directory, with their size, modification time, and content hash.
+
+    Once the index is older than the refresh interval, accessing it starts a refresh in a background thread, and the
+    current index is used until that is done. A playbook that exists on disk but is not indexed yet is indexed on its
+    own when it is looked up. Hidden files and directories are skipped, and symbolic links are followed.
+
+    Args:
+        root (Path): The directory that contains the playbooks.
+        refresh_interval_sec (float): Maximum age of the index before it is refreshed, in seconds.
+
+    """
+
+    def __init__(self, root: Path, refresh_interval_sec: float) -> None:
+        """Build the initial index of the playbook directory."""
+        self.root = root
+        self._refresh_interval_sec = refresh_interval_sec
+        self._entries: dict[str, tuple[int, int, PlaybookInfo]] = {}
+        self._refreshed_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self.refresh()
+
+    def _walk(self) -> Iterator[Path]:
+        """Yield the paths of all files in the playbook directory, following symbolic links to directories.
+
+        A directory that is reached more than once, such as through a symbolic link that points to one of its parents,
+        is only walked the first time.
+        """
+        visited: set[tuple[int, int]] = set()
+        for dirpath, dirnames, filenames in os.walk(self.root, followlinks=True):
+            try:
+                stat = Path(dirpath).stat()
+            except OSError:
+                dirnames.clear()
+                continue
+            if (stat.st_dev, stat.st_ino) in visited:
+                dirnames.clear()
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith(".")]
+            yield from (Path(dirpath) / filename for filename in filenames if not filename.startswith("."))
+
+    def _index(self, path: Path, name: str) -> tuple[int, int, PlaybookInfo]:
+        """Return the index entry of a file, which is only hashed again if it changed since it was last indexed.
+
+        Raises:
+            OSError: If the file can't be read.
+
+        """
+        stat = path.stat()
+        previous = self._entries.get(name)
+        if previous and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+            return previous
+        info = PlaybookInfo(
+            name=name,
+            size=stat.st_size,
+            modified_at=datetime.fromtimestamp(stat.st_mtime, tz=UTC),
+            sha256=_hash_file(path),
+        )
+        return stat.st_size, stat.st_mtime_ns, info
+
+    def refresh(self) -> None:
+        """Walk the playbook directory, and update the index with any added, changed, or removed files.
+
+        If another thread is already refreshing, this returns straight away, and the current index is used until the
+        refresh in progress is done.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            entries: dict[str, tuple[int, int, PlaybookInfo]] = {}
+            for path in self._walk():
+                name = path.relative_to(self.root).as_posix()
+                try:
+                    entries[name] = self._index(path, name)
+                except OSError:
+                    logger.warning("Skipping playbook %s, it could not be read", path)
+
+            self._entries = entries
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_if_stale(self) -> None:
+        if time.monotonic() - self._refreshed_at > self._refresh_interval_sec and not self._refresh_lock.locked():
+            threading.Thread(target=self.refresh, name="playbook-catalogue-refresh", daemon=True).start()
+
+    def get(self, playbook_name: Path) -> PlaybookInfo | None:
+        """Look up a playbook by its path relative to the playbook directory, returns `None` if it does not exist."""
+        self._refresh_if_stale()
+        if playbook_name.is_absolute() or any(part.startswith(".") for part in playbook_name.parts):
+            # Hidden files, and files outside of the playbook directory, are never indexed.
+            return None
+        name = playbook_name.as_posix()
+        entry = self._entries.get(name)
+        if entry is None and (self.root / playbook_name).is_file():
+            # The playbook was added since the last refresh, only index this file rather than the whole directory.
+            try:
+                entry = self._index(self.root / playbook_name, name)
+            except OSError:
+                logger.warning("Skipping playbook %s, it could not be read", name)
+                return None
+            # Replace rather than update the index, so it is not changed while another thread iterates over it.
+            self._entries = {**self._entries, name: entry}
+
+        return entry[2] if entry else None
+
+    def entries(self) -> list[PlaybookInfo]:
+        """Return all playbooks in the catalogue, sorted by name."""
+        self._refresh_if_stale()
+        return [entry[2] for _, entry in sorted(self._entries.items())]
+
+
+_catalogue: PlaybookCatalogue | None = None
+
+
+def get_playbook_catalogue() -> PlaybookCatalogue:
+    """Initialize or return a cached `PlaybookCatalogue` of the configured `ANSIBLE_PLAYBOOKS_ROOT_DIR`."""
+    global _catalogue  # noqa: PLW0603
+    root = Path(settings.ANSIBLE_PLAYBOOKS_ROOT_DIR)
+    if _catalogue is None or _catalogue.root != root:
+        _catalogue = PlaybookCatalogue(root, settings.PLAYBOOK_CATALOGUE_REFRESH_SEC)
+
+    return _catalogue
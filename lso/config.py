@@ -17,7 +17,9 @@ Uses `pydantic`'s `BaseSettings` to load settings from environment variables.
 """
 
 import os
+import tempfile
 from enum import Enum
+from pathlib import Path
 
 from pydantic_settings import BaseSettings
 
@@ -27,6 +29,28 @@ class ExecutorType(Enum):
 
     WORKER = "celery"
     THREADPOOL = "threadpool"
+    PROCESSPOOL = "processpool"
+
+
+class TracingExporter(Enum):
+    """Enumerator representing where spans are exported to, when tracing is enabled."""
+
+    OTLP = "otlp"
+    FILE = "file"
+
+
+class ProcessStartMethod(Enum):
+    """Enumerator representing how the processes of the process pool executor are started."""
+
+    SPAWN = "spawn"
+    FORKSERVER = "forkserver"
+
+
+class ProgressQueueFullPolicy(Enum):
+    """Enumerator representing what happens to a progress update when the queue of unsent updates is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
 
 
 class Config(BaseSettings):
@@ -35,34 +59,185 @@ class Config(BaseSettings):
     Attributes:
         TESTING (bool, optional): `True` if running in a testing environment, `False` otherwise.
         ANSIBLE_PLAYBOOKS_ROOT_DIR (str): Absolute path to the location where Ansible playbooks are stored.
+        PLAYBOOK_CATALOGUE_REFRESH_SEC (int, optional): Interval at which the catalogue of playbooks in
+            `ANSIBLE_PLAYBOOKS_ROOT_DIR` is checked for changes, in seconds.
         EXECUTABLES_ROOT_DIR (str): Absolute path to the location where executables are stored.
         EXECUTOR (ExecutorType, optional): The executor type that LSO uses.
         MAX_THREAD_POOL_WORKERS (int, optional): The amount of threads in the pool, if using the thread pool executor.
+        MAX_PROCESS_POOL_WORKERS (int, optional): The amount of processes in the pool, if using the process pool
+            executor.
+        PROCESS_POOL_START_METHOD (ProcessStartMethod, optional): How the processes of the process pool are started.
+        PROCESS_POOL_MAX_TASKS_PER_CHILD (int, optional): The amount of tasks a process of the process pool runs,
+            before it is replaced by a fresh one.
+        MAX_QUEUED_JOBS (int, optional): The amount of jobs that may wait for a worker of the thread pool or process
+            pool executor. Further jobs are rejected until the queue drains. Unbounded when not set.
+        MAX_CONCURRENT_JOBS (dict[str, int], optional): The amount of jobs that may be queued or running at the same
+            time, per playbook or executable. Keys are names relative to `ANSIBLE_PLAYBOOKS_ROOT_DIR` or
+            `EXECUTABLES_ROOT_DIR`.
         REQUEST_TIMEOUT_SEC (int, optional): HTTP Timeout, in seconds.
+        HTTP_POOL_CONNECTIONS (int, optional): Amount of hosts for which HTTP connections are kept open, for sending
+            callbacks and progress updates.
+        HTTP_POOL_MAXSIZE (int, optional): Maximum amount of HTTP connections that are kept open per host.
+        CALLBACK_OUTBOX_ENABLED (bool, optional): Whether callbacks are stored in a durable outbox and delivered in the
+            background, instead of being sent by the job itself.
+        CALLBACK_OUTBOX_PATH (str, optional): Path to the SQLite database of the callback outbox.
+        CALLBACK_RETRY_MAX_ATTEMPTS (int, optional): Maximum amount of attempts to deliver a callback from the outbox.
+        CALLBACK_RETRY_BASE_DELAY_SEC (float, optional): Delay before the first retry of a failed callback, in seconds.
+            The delay doubles with every attempt.
+        CALLBACK_RETRY_MAX_DELAY_SEC (float, optional): Maximum delay between two attempts to deliver a callback, in
+            seconds.
+        CALLBACK_CIRCUIT_BREAKER_THRESHOLD (int, optional): Amount of consecutive failed callbacks to a host, after
+            which no callbacks are sent to that host for a while.
+        CALLBACK_CIRCUIT_BREAKER_RESET_SEC (float, optional): How long no callbacks are sent to a host after its
+            circuit opened, in seconds.
+        PROGRESS_QUEUE_MAX_SIZE (int, optional): Maximum amount of playbook events that are waiting to be sent as a
+            progress update, per playbook run.
+        PROGRESS_QUEUE_FULL_POLICY (ProgressQueueFullPolicy, optional): Whether to drop the oldest waiting event, or to
+            block the playbook run, when the queue of progress updates is full.
+        PROGRESS_BATCH_MAX_EVENTS (int, optional): Maximum amount of playbook events that are combined into a single
+            progress update.
+        PROGRESS_BATCH_WINDOW_SEC (float, optional): Maximum time that a playbook event waits for other events to be
+            combined with, in seconds.
+        PROGRESS_BUFFER_MAX_LINES (int, optional): Maximum amount of progress output lines that are stored per job, when
+            progress updates are sequenced.
         CELERY_BROKER_URL (str, optional): Celery broker URL, required when using the Celery executor.
         CELERY_RESULT_BACKEND (str, optional): Celery result backend URL, required when using the Celery executor.
         CELERY_RESULT_EXPIRES (int, optional): Celery result expiration timeout, in seconds.
         WORKER_QUEUE_NAME (str, optional): Celery worker queue name.
+        CELERY_QUEUE_ROUTES (dict[str, str], optional): Routing rules that map glob patterns of playbook or executable
+            names to the Celery queue that their jobs are sent to. The first matching pattern is used, and jobs that
+            match none are sent to `WORKER_QUEUE_NAME`.
         EXECUTABLE_TIMEOUT_SEC (int, optional): Timeout period for an executable, in seconds.
+        EXECUTABLE_OUTPUT_MAX_BYTES (int, optional): Maximum size of the output of an executable that is returned in
+            full. Larger output is stored as an artifact on disk, and only its head and tail are returned.
+        EXECUTABLE_OUTPUT_EXCERPT_BYTES (int, optional): Size of both the head and the tail of the output that are
+            returned, when the output of an executable is too large.
+        EXECUTABLE_ARTIFACTS_DIR (str, optional): Directory where the output of executables is captured, and where
+            artifacts are stored. With the Celery executor, it must be shared between the API and the workers.
+        EXECUTABLE_ARTIFACT_RETENTION_SEC (int, optional): How long artifacts are kept, in seconds.
+        EXECUTABLE_CACHE_PATTERNS (list[str], optional): Glob patterns of the names of executables, relative to
+            `EXECUTABLES_ROOT_DIR`, of which successful results are cached. Only meant for executables that give the
+            same result for the same arguments, such as read-only lookups.
+        EXECUTABLE_CACHE_MAX_ENTRIES (int, optional): Maximum amount of executable results that are cached, per
+            process.
+        EXECUTABLE_CACHE_TTL_SEC (int, optional): How long the result of an executable is cached, in seconds.
         ANSIBLE_PLAYBOOK_TIMEOUT_SEC (int, optional): Idle/read timeout, in seconds, for the `ansible-runner` output
             pipe. This is passed to `ansible-runner` as its `pexpect_timeout` so that a transient gap in playbook
             output (e.g. a slow-but-healthy device operation) does not abort an otherwise-successful run. Defaults to
             a large value to tolerate such gaps; the underlying job is still bounded by the run itself.
+        ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC (int, optional): Maximum wall-clock time of a playbook run, in seconds, after
+            which it is killed and reported with status `timeout`. Requests may set a shorter `deadline_sec`, and runs
+            without one get this deadline. Unbounded when not set.
+        ANSIBLE_RUNNER_DATA_DIR (str, optional): Directory in which every playbook run gets its own `ansible-runner`
+            private data directory, named after its job ID. It holds the inventory, environment, and artifacts of the
+            run, such as its output and event files.
+        ANSIBLE_RUNNER_DATA_TMPFS (bool, optional): Whether the private data directories are placed on the tmpfs at
+            `/dev/shm` instead, so the many small files that `ansible-runner` writes are kept in memory.
+        ANSIBLE_RUNNER_DATA_RETENTION_SEC (int, optional): How long private data directories are kept, in seconds.
+        ANSIBLE_RUNNER_DATA_MAX_COUNT (int, optional): Maximum amount of private data directories that are kept. The
+            oldest are removed first.
+        ANSIBLE_RUNNER_DATA_MAX_BYTES (int, optional): Maximum combined size of the private data directories that are
+            kept, in bytes. The oldest are removed first.
+        ANSIBLE_WARM_WORKERS (int, optional): Amount of warm workers, which have Ansible imported already, that run
+            playbooks without progress updates. Set to 0 to run every playbook with `ansible-runner` instead.
+        ANSIBLE_WARM_WORKER_MAX_RUNS (int, optional): Amount of playbook runs after which a warm worker is replaced.
+        ANSIBLE_WARM_WORKER_MAX_RSS_BYTES (int, optional): Memory usage of a warm worker, in bytes, above which the
+            warm workers are replaced.
+        JOB_REGISTRY_PATH (str, optional): Path to the SQLite database that keeps track of submitted jobs. When using
+            the Celery executor, this file must be shared between the API and the workers for job status to be
+            reported.
+        JOB_RETENTION_SEC (int, optional): How long finished jobs are kept in the job registry, in seconds.
+        JOB_CANCEL_POLL_INTERVAL_SEC (float, optional): Interval at which processes that run jobs check the job registry
+            for cancellations of their jobs, in seconds.
+        JOB_OUTPUT_SUMMARY_MAX_CHARS (int, optional): Maximum amount of output characters stored per job in the job
+            registry. Only the tail end of the output is kept.
+        PLAYBOOK_DEDUPLICATION_ENABLED (bool, optional): Whether a playbook request that is identical to one that is
+            still queued or running is attached to it, instead of running the playbook a second time.
+        PLAYBOOK_DEDUPLICATION_WINDOW_SEC (int, optional): How long after its submission a job can be attached to, in
+            seconds. Keeps requests from attaching to a job that was lost, e.g. because its worker was killed.
+        MAX_PLAYBOOK_SHARDS (int, optional): The amount of shards that a single playbook run may be split into.
+        MAX_BATCH_SIZE (int, optional): The amount of runs that may be submitted at once in a single batch request.
+        FACT_CACHE_ENABLED (bool, optional): Whether the facts that playbook runs gather are cached, and reused by later
+            runs on the same worker.
+        FACT_CACHE_DIR (str, optional): Directory where cached facts are stored, one file per host.
+        FACT_CACHE_TTL_SEC (int, optional): How long cached facts are used, in seconds.
+        INVENTORY_CACHE_MAX_ENTRIES (int, optional): Maximum amount of inventory validation results that are cached.
+            Set to 0 to disable caching.
+        INVENTORY_CACHE_TTL_SEC (int, optional): How long an inventory validation result is cached, in seconds.
+        TRACING_ENABLED (bool, optional): Whether OpenTelemetry spans are recorded. Requires the `tracing` extra.
+        TRACING_EXPORTER (TracingExporter, optional): Where spans are exported to. The OTLP exporter is configured
+            with the standard `OTEL_EXPORTER_OTLP_*` environment variables.
+        TRACING_FILE_PATH (str, optional): File that spans are appended to as JSON lines, if using the file exporter.
+        TRACING_SERVICE_NAME (str, optional): The service name that spans are reported under.
 
     """
 
     TESTING: bool = True
     ANSIBLE_PLAYBOOKS_ROOT_DIR: str = "/path/to/ansible/playbooks"
+    PLAYBOOK_CATALOGUE_REFRESH_SEC: int = 30
     EXECUTABLES_ROOT_DIR: str = "/path/to/executables"
     EXECUTOR: ExecutorType = ExecutorType.THREADPOOL
     MAX_THREAD_POOL_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
+    MAX_PROCESS_POOL_WORKERS: int = os.cpu_count() or 1
+    PROCESS_POOL_START_METHOD: ProcessStartMethod = ProcessStartMethod.FORKSERVER
+    PROCESS_POOL_MAX_TASKS_PER_CHILD: int = 100
+    MAX_QUEUED_JOBS: int | None = None
+    MAX_CONCURRENT_JOBS: dict[str, int] = {}
     REQUEST_TIMEOUT_SEC: int = 10
+    HTTP_POOL_CONNECTIONS: int = 10
+    HTTP_POOL_MAXSIZE: int = min(32, (os.cpu_count() or 1) + 4)
+    CALLBACK_OUTBOX_ENABLED: bool = False
+    CALLBACK_OUTBOX_PATH: str = str(Path(tempfile.gettempdir()) / "lso-outbox.sqlite3")
+    CALLBACK_RETRY_MAX_ATTEMPTS: int = 10
+    CALLBACK_RETRY_BASE_DELAY_SEC: float = 1.0
+    CALLBACK_RETRY_MAX_DELAY_SEC: float = 300.0
+    CALLBACK_CIRCUIT_BREAKER_THRESHOLD: int = 5
+    CALLBACK_CIRCUIT_BREAKER_RESET_SEC: float = 60.0
+    PROGRESS_QUEUE_MAX_SIZE: int = 1000
+    PROGRESS_QUEUE_FULL_POLICY: ProgressQueueFullPolicy = ProgressQueueFullPolicy.DROP_OLDEST
+    PROGRESS_BATCH_MAX_EVENTS: int = 50
+    PROGRESS_BATCH_WINDOW_SEC: float = 1.0
+    PROGRESS_BUFFER_MAX_LINES: int = 10000
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     CELERY_RESULT_EXPIRES: int = 3600
     WORKER_QUEUE_NAME: str | None = None
+    CELERY_QUEUE_ROUTES: dict[str, str] = {}
     EXECUTABLE_TIMEOUT_SEC: int = 300
+    EXECUTABLE_OUTPUT_MAX_BYTES: int = 1024 * 1024
+    EXECUTABLE_OUTPUT_EXCERPT_BYTES: int = 16 * 1024
+    EXECUTABLE_ARTIFACTS_DIR: str = str(Path(tempfile.gettempdir()) / "lso-artifacts")
+    EXECUTABLE_ARTIFACT_RETENTION_SEC: int = 7 * 24 * 3600
+    EXECUTABLE_CACHE_PATTERNS: list[str] = []
+    EXECUTABLE_CACHE_MAX_ENTRIES: int = 1024
+    EXECUTABLE_CACHE_TTL_SEC: int = 60
     ANSIBLE_PLAYBOOK_TIMEOUT_SEC: int = 300
+    ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC: int | None = None
+    ANSIBLE_RUNNER_DATA_DIR: str = str(Path(tempfile.gettempdir()) / "lso-runner")
+    ANSIBLE_RUNNER_DATA_TMPFS: bool = False
+    ANSIBLE_RUNNER_DATA_RETENTION_SEC: int = 24 * 3600
+    ANSIBLE_RUNNER_DATA_MAX_COUNT: int = 1000
+    ANSIBLE_RUNNER_DATA_MAX_BYTES: int = 1024 * 1024 * 1024
+    ANSIBLE_WARM_WORKERS: int = 0
+    ANSIBLE_WARM_WORKER_MAX_RUNS: int = 100
+    ANSIBLE_WARM_WORKER_MAX_RSS_BYTES: int = 512 * 1024 * 1024
+    JOB_REGISTRY_PATH: str = str(Path(tempfile.gettempdir()) / "lso-jobs.sqlite3")
+    JOB_RETENTION_SEC: int = 7 * 24 * 3600
+    JOB_CANCEL_POLL_INTERVAL_SEC: float = 1.0
+    JOB_OUTPUT_SUMMARY_MAX_CHARS: int = 4096
+    PLAYBOOK_DEDUPLICATION_ENABLED: bool = False
+    PLAYBOOK_DEDUPLICATION_WINDOW_SEC: int = 3600
+    MAX_PLAYBOOK_SHARDS: int = 32
+    MAX_BATCH_SIZE: int = 1000
+    FACT_CACHE_ENABLED: bool = False
+    FACT_CACHE_DIR: str = str(Path(tempfile.gettempdir()) / "lso-facts")
+    FACT_CACHE_TTL_SEC: int = 24 * 3600
+    INVENTORY_CACHE_MAX_ENTRIES: int = 128
+    INVENTORY_CACHE_TTL_SEC: int = 3600
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: TracingExporter = TracingExporter.OTLP
+    TRACING_FILE_PATH: str = str(Path(tempfile.gettempdir()) / "lso-traces.jsonl")
+    TRACING_SERVICE_NAME: str = "lso"
 
 
 settings = Config()
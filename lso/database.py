@@ -0,0 +1,70 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local SQLite database, as used by the job registry and the callback outbox."""
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Database:
+    """A SQLite database in WAL mode, with a single connection that is shared by all threads of a process.
+
+    Access to the connection is serialised with a lock. Concurrent access from multiple processes is handled by SQLite
+    itself.
+
+    Args:
+        path (str): Path to the SQLite database file.
+        schema (str): Script that creates the tables, if they don't exist yet.
+        added_columns (dict[str, dict[str, str]], optional): Per table, columns and their types that were added to the
+            schema later on. They are added to existing databases when they are opened.
+        indexes (str, optional): Script that creates indexes, which may refer to added columns.
+
+    """
+
+    def __init__(
+        self, path: str, schema: str, added_columns: dict[str, dict[str, str]] | None = None, indexes: str = ""
+    ) -> None:
+        """Open the database and make sure the schema exists."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(schema)
+        for table, table_columns in (added_columns or {}).items():
+            columns = {row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in table_columns.items():
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        self._connection.executescript(indexes)
+
+    def execute(self, query: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        """Execute a single statement, which SQLite commits straight away."""
+        with self._lock:
+            return self._connection.execute(query, parameters)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the lock and a write transaction, that is rolled back if an exception is raised."""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
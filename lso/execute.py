@@ -13,16 +13,47 @@
 
 """Module for handling the execution of arbitrary executables."""
 
+import asyncio
+import codecs
+import contextlib
+import itertools
+import logging
+import os
+import shutil
+import signal
 import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future
+from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import Any, Self
 from uuid import UUID, uuid4
 
-from pydantic import HttpUrl
+from pydantic import BaseModel, HttpUrl
 
+from lso.admission import get_admission_controller
+from lso.cancellation import WatchedRun, get_cancellation_watcher, job_envvars, kill_process_group, track_local_job
 from lso.config import ExecutorType, settings
-from lso.schema import ExecutionResult
-from lso.tasks import run_executable_proc_task
-from lso.utils import get_thread_pool
+from lso.jobs import get_job_registry
+from lso.routing import task_options
+from lso.schema import ExecutionResult, JobStatus
+from lso.tasks import run_executable_proc_task, worker_crash_handler_factory
+from lso.tracing import propagate_context, start_span
+from lso.utils import TTLCache, get_thread_pool, submit_to_process_pool
+
+logger = logging.getLogger(__name__)
+
+#: File that the API creates in `EXECUTABLE_ARTIFACTS_DIR`, when executables run on Celery workers.
+_API_MARKER = ".lso-api"
+
+#: Minimum interval between two prunes of expired artifacts, in seconds.
+_ARTIFACT_PRUNE_INTERVAL_SEC = 60
+
+_artifact_prune_lock = threading.Lock()
+_last_artifact_prune = 0.0
 
 
 def get_executable_path(executable_name: Path) -> Path:
@@ -30,34 +61,313 @@ def get_executable_path(executable_name: Path) -> Path:
     return Path(settings.EXECUTABLES_ROOT_DIR) / executable_name
 
 
-def run_executable_async(executable_path: Path, args: list[str], callback: HttpUrl | None) -> UUID:
+class ExecutableRun(BaseModel):
+    """A run of an executable that is submitted as part of a batch.
+
+    Attributes:
+        executable_path (Path): Path to the executable.
+        args (list[str]): Arguments that are passed to the executable.
+        callback (HttpUrl, optional): Callback URL where the result of this run is sent.
+        priority (int, optional): The priority of this run in its Celery queue, from 0 to 9.
+
+    """
+
+    executable_path: Path
+    args: list[str] = []
+    callback: HttpUrl | None = None
+    priority: int | None = None
+
+    @property
+    def name(self) -> str:
+        """The name of the executable, relative to `EXECUTABLES_ROOT_DIR`."""
+        return os.path.relpath(self.executable_path, settings.EXECUTABLES_ROOT_DIR)
+
+
+def _admit(run: ExecutableRun) -> Callable[[Future | None], None]:
+    return get_admission_controller().admit(run.name)
+
+
+def _submit_locally(job_id: UUID, run: ExecutableRun, release: Callable[[Future | None], None]) -> None:
+    """Submit an executable run to the thread pool or the process pool."""
+    callback_url = str(run.callback) if run.callback else None
+    task_args = (str(job_id), str(run.executable_path), run.args, callback_url)
+    if settings.EXECUTOR == ExecutorType.PROCESSPOOL:
+        future = submit_to_process_pool(propagate_context(run_executable_proc_task), *task_args)
+        future.add_done_callback(worker_crash_handler_factory(str(job_id), callback_url, kind="executable"))
+    else:
+        future = get_thread_pool().submit(propagate_context(run_executable_proc_task), *task_args)
+    future.add_done_callback(release)
+    track_local_job(str(job_id), future)
+    if settings.TESTING:
+        future.result()
+
+
+def run_executable_async(
+    executable_path: Path, args: list[str], callback: HttpUrl | None, priority: int | None = None
+) -> UUID:
     """Dispatch the task for executing an arbitrary executable remotely.
 
-    Uses a ThreadPoolExecutor (for local execution) or a Celery worker (for distributed tasks).
+    Uses a ThreadPoolExecutor or a ProcessPoolExecutor (for local execution) or a Celery worker (for distributed tasks).
+    The `priority` of the run, from 0 to 9, only applies to Celery.
+
+    Raises:
+        JobRejectedError: If a local executor is used, and it has no capacity to run the executable.
+
     """
     job_id = uuid4()
-    callback_url = str(callback) if callback else None
-    if settings.EXECUTOR == ExecutorType.THREADPOOL:
-        executor = get_thread_pool()
-        future = executor.submit(run_executable_proc_task, str(job_id), str(executable_path), args, callback_url)
-        if settings.TESTING:
-            future.result()
-    elif settings.EXECUTOR == ExecutorType.WORKER:
-        run_executable_proc_task.delay(str(job_id), str(executable_path), args, callback_url)
+    run = ExecutableRun(executable_path=executable_path, args=args, callback=callback, priority=priority)
+    release = _admit(run)
+
+    with start_span("dispatch executable", **{"lso.job_id": str(job_id), "lso.executable": str(executable_path)}):
+        try:
+            get_job_registry().create(
+                str(job_id), "executable", str(executable_path), callback=str(callback) if callback else None
+            )
+            if settings.EXECUTOR == ExecutorType.WORKER:
+                callback_url = str(callback) if callback else None
+                run_executable_proc_task.apply_async(
+                    (str(job_id), str(executable_path), args, callback_url), **task_options(run.name, priority)
+                )
+            else:
+                _submit_locally(job_id, run, release)
+        except BaseException:
+            # A slot is only released once, so this has no effect if the future of the run already released it.
+            release()
+            raise
     return job_id
 
 
-def run_executable_sync(executable_path: str, args: list[str]) -> ExecutionResult:
-    """Run the given executable synchronously and return the result."""
-    try:
-        result = subprocess.run(  # noqa: S603
-            [executable_path, *args],
-            text=True,
-            capture_output=True,
-            timeout=settings.EXECUTABLE_TIMEOUT_SEC,
-            check=False,
+def _register_batch(
+    job_ids: list[UUID], runs: list[ExecutableRun], batch_id: UUID | None, callback: HttpUrl | None
+) -> None:
+    """Register a batch and its jobs.
+
+    Every job is registered before the first one is dispatched, so the batch can't finish before it is complete.
+    """
+    registry = get_job_registry()
+    if batch_id:
+        registry.create_batch(str(batch_id), str(callback), len(runs))
+    for job_id, run in zip(job_ids, runs, strict=True):
+        registry.create(
+            str(job_id),
+            "executable",
+            str(run.executable_path),
+            callback=str(run.callback) if run.callback else None,
+            batch_id=str(batch_id) if batch_id else None,
         )
-        output = result.stdout + result.stderr
+
+
+def run_executable_batch(runs: list[ExecutableRun], callback: HttpUrl | None) -> tuple[UUID | None, list[UUID]]:
+    """Dispatch a batch of executable runs at once.
+
+    All runs are admitted before any of them is dispatched, so a batch is either accepted or rejected as a whole. They
+    are then sent to Celery as a single group, or submitted to the local executor in one loop.
+
+    Args:
+        runs (list[ExecutableRun]): The executable runs in the batch.
+        callback (HttpUrl, optional): Callback URL where a summary of the batch is sent, once all of its runs have
+            finished.
+
+    Returns:
+        The batch ID, if a callback was given, and the job IDs of all runs in the batch.
+
+    Raises:
+        JobRejectedError: If a local executor is used, and it has no capacity to run all executables in the batch.
+
+    """
+    releases = get_admission_controller().admit_all([run.name for run in runs])
+    job_ids = [uuid4() for _ in runs]
+    batch_id = uuid4() if callback else None
+    # The runs whose slots are not yet released by the future of a submitted run.
+    pending = list(zip(job_ids, runs, releases, strict=True))
+    with start_span("dispatch executable batch", **{"lso.batch_size": str(len(runs))}):
+        try:
+            _register_batch(job_ids, runs, batch_id, callback)
+            if settings.EXECUTOR == ExecutorType.WORKER:
+                from celery import group  # noqa: PLC0415
+
+                group(
+                    run_executable_proc_task.si(
+                        str(job_id), str(run.executable_path), run.args, str(run.callback) if run.callback else None
+                    ).set(**task_options(run.name, run.priority))
+                    for job_id, run in zip(job_ids, runs, strict=True)
+                ).apply_async()
+            else:
+                while pending:
+                    job_id, run, release = pending[0]
+                    _submit_locally(job_id, run, release)
+                    pending.pop(0)
+        except BaseException:
+            for *_, release in pending:
+                release()
+            raise
+
+    return batch_id, job_ids
+
+
+def get_artifact_path(artifact_id: UUID) -> Path:
+    """Return the path of the file that holds the full output of an executable run."""
+    return Path(settings.EXECUTABLE_ARTIFACTS_DIR) / f"{artifact_id}.log"
+
+
+def prune_artifacts(*, force: bool = False) -> None:
+    """Remove output artifacts that are older than `EXECUTABLE_ARTIFACT_RETENTION_SEC`.
+
+    Temporary output files that were left behind by runs that never finished, such as when their worker was killed, are
+    removed as well. Since this lists the whole directory, it is done at most once a minute per process, unless forced.
+    """
+    global _last_artifact_prune  # noqa: PLW0603
+    now = time.time()
+    with _artifact_prune_lock:
+        if not force and now - _last_artifact_prune < _ARTIFACT_PRUNE_INTERVAL_SEC:
+            return
+        _last_artifact_prune = now
+
+    expired = now - settings.EXECUTABLE_ARTIFACT_RETENTION_SEC
+    artifacts_dir = Path(settings.EXECUTABLE_ARTIFACTS_DIR)
+    for artifact in itertools.chain(artifacts_dir.glob("*.log"), artifacts_dir.glob("*.tmp")):
+        with contextlib.suppress(FileNotFoundError):
+            if artifact.stat().st_mtime < expired:
+                artifact.unlink()
+
+
+def prepare_artifacts_dir() -> None:
+    """Create `EXECUTABLE_ARTIFACTS_DIR` when the API starts, and remove expired artifacts.
+
+    With the Celery executor, artifacts are written by the workers, but downloaded from the API, so the directory must
+    be shared between them. The API marks the directory, so a worker can tell whether it writes to the same one.
+    """
+    artifacts_dir = Path(settings.EXECUTABLE_ARTIFACTS_DIR)
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    if settings.EXECUTOR == ExecutorType.WORKER:
+        (artifacts_dir / _API_MARKER).touch()
+    prune_artifacts(force=True)
+
+
+def _artifacts_reachable() -> bool:
+    """Return whether artifacts written by this process can be downloaded from the API."""
+    if settings.EXECUTOR != ExecutorType.WORKER or (Path(settings.EXECUTABLE_ARTIFACTS_DIR) / _API_MARKER).exists():
+        return True
+
+    logger.warning(
+        "Not keeping the full output of an executable, EXECUTABLE_ARTIFACTS_DIR %s is not shared with the API",
+        settings.EXECUTABLE_ARTIFACTS_DIR,
+    )
+    return False
+
+
+class _OutputCapture:
+    """Capture the output of an executable in temporary files, so it is never held in memory as a whole.
+
+    If the combined output fits within `EXECUTABLE_OUTPUT_MAX_BYTES`, it is read back in full. Otherwise, the output is
+    kept on disk as an artifact, and only an excerpt of its head and tail is read back.
+    """
+
+    def __enter__(self) -> Self:
+        artifacts_dir = Path(settings.EXECUTABLE_ARTIFACTS_DIR)
+        artifacts_dir.mkdir(parents=True, exist_ok=True)
+        prune_artifacts()
+        self.stdout = tempfile.NamedTemporaryFile(dir=artifacts_dir, suffix=".tmp", delete=False)
+        self.stderr = tempfile.TemporaryFile(dir=artifacts_dir)
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        self.stdout.close()
+        self.stderr.close()
+        Path(self.stdout.name).unlink(missing_ok=True)
+
+    def read(self) -> tuple[str, UUID | None]:
+        """Return the captured output, and the ID of the artifact that holds the full output if it was truncated."""
+        stdout_size = self.stdout.seek(0, os.SEEK_END)
+        stderr_size = self.stderr.seek(0, os.SEEK_END)
+        self.stderr.seek(0)
+        if stdout_size + stderr_size <= settings.EXECUTABLE_OUTPUT_MAX_BYTES:
+            self.stdout.seek(0)
+            return (self.stdout.read() + self.stderr.read()).decode(errors="replace"), None
+
+        # Append stderr to stdout, the same as for output that fits in memory, and keep the result as an artifact.
+        shutil.copyfileobj(self.stderr, self.stdout)
+        self.stdout.flush()
+        total_size = stdout_size + stderr_size
+        excerpt_size = min(settings.EXECUTABLE_OUTPUT_EXCERPT_BYTES, total_size // 2)
+        self.stdout.seek(0)
+        head = self.stdout.read(excerpt_size)
+        self.stdout.seek(total_size - excerpt_size)
+        tail = self.stdout.read(excerpt_size)
+
+        omitted = total_size - 2 * excerpt_size
+        if not _artifacts_reachable():
+            marker = f"\n[... {omitted} bytes omitted ...]\n"
+            return head.decode(errors="replace") + marker + tail.decode(errors="replace"), None
+
+        artifact_id = uuid4()
+        Path(self.stdout.name).rename(get_artifact_path(artifact_id))
+        marker = f"\n[... {omitted} bytes omitted, full output is available as artifact {artifact_id} ...]\n"
+        return head.decode(errors="replace") + marker + tail.decode(errors="replace"), artifact_id
+
+
+_result_cache: TTLCache[tuple[Any, ...], ExecutionResult] = TTLCache(
+    settings.EXECUTABLE_CACHE_MAX_ENTRIES, settings.EXECUTABLE_CACHE_TTL_SEC
+)
+
+
+def _result_cache_key(executable_path: str, args: list[str]) -> tuple[Any, ...] | None:
+    """Return the key under which the result of an executable run is cached, or `None` if it's not cacheable.
+
+    Only executables that match one of `EXECUTABLE_CACHE_PATTERNS` are cached. The key holds the inode, size, and
+    modification time of the executable, so a result is not reused once the executable is replaced or changed.
+    """
+    name = os.path.relpath(executable_path, settings.EXECUTABLES_ROOT_DIR)
+    if not any(fnmatchcase(name, pattern) for pattern in settings.EXECUTABLE_CACHE_PATTERNS):
+        return None
+    try:
+        stat = Path(executable_path).stat()
+    except OSError:
+        return None
+    return executable_path, stat.st_ino, stat.st_size, stat.st_mtime_ns, tuple(args)
+
+
+def _cache_result(cache_key: tuple[Any, ...] | None, result: ExecutionResult) -> ExecutionResult:
+    """Store the result of a cacheable executable run, if it was successful, and return it.
+
+    Results with truncated output are not stored, since the artifact that holds their full output may be pruned while
+    the result is still cached.
+    """
+    if cache_key is not None and result.return_code == 0 and result.artifact_id is None:
+        _result_cache.set(cache_key, result)
+    return result
+
+
+def run_executable_sync(
+    executable_path: str, args: list[str], *, envvars: dict[str, str] | None = None
+) -> ExecutionResult:
+    """Run the given executable synchronously and return the result.
+
+    Output is captured on disk rather than in memory. If it exceeds `EXECUTABLE_OUTPUT_MAX_BYTES`, the result only holds
+    the head and tail of the output, and a reference to an artifact that holds the full output. The executable runs in
+    its own process group, with `envvars` added to its environment, so it can be killed as a whole if its job is
+    cancelled.
+
+    The successful result of an executable that matches `EXECUTABLE_CACHE_PATTERNS` is cached, and returned for the
+    same arguments without running the executable again, until it expires after `EXECUTABLE_CACHE_TTL_SEC`.
+    """
+    cache_key = _result_cache_key(executable_path, args)
+    if cache_key is not None and (cached := _result_cache.get(cache_key)) is not None:
+        return cached
+
+    artifact_id = None
+    try:
+        with _OutputCapture() as capture:
+            result = subprocess.run(  # noqa: S603
+                [executable_path, *args],
+                stdout=capture.stdout,
+                stderr=capture.stderr,
+                timeout=settings.EXECUTABLE_TIMEOUT_SEC,
+                check=False,
+                env={**os.environ, **envvars} if envvars else None,
+                start_new_session=True,
+            )
+            output, artifact_id = capture.read()
         return_code = result.returncode
     except subprocess.TimeoutExpired:
         output = "Execution timed out."
@@ -66,7 +376,198 @@ def run_executable_sync(executable_path: str, args: list[str]) -> ExecutionResul
         output = str(e)
         return_code = -1
 
-    return ExecutionResult(
-        output=output,
-        return_code=return_code,
+    return _cache_result(
+        cache_key,
+        ExecutionResult(
+            output=output,
+            return_code=return_code,
+            artifact_id=artifact_id,
+        ),
+    )
+
+
+class _JobProcess:
+    """The process group of an executable that is run for a job on the event loop, killed if the job is cancelled.
+
+    The processes are marked with the job ID, and the run is watched by the `CancellationWatcher` of this process while
+    the context is active. Without a job ID, nothing is watched.
+    """
+
+    def __init__(self, job_id: str | None) -> None:
+        self.envvars = job_envvars(job_id) if job_id else None
+        self._pid: int | None = None
+        self._run = WatchedRun(job_id, self._kill) if job_id else None
+        self._stack = contextlib.ExitStack()
+
+    def __enter__(self) -> Self:
+        if self._run is not None:
+            self._stack.enter_context(get_cancellation_watcher().watch(self._run))
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        self._stack.close()
+
+    @property
+    def env(self) -> dict[str, str] | None:
+        """The environment that the executable is started with."""
+        return {**os.environ, **self.envvars} if self.envvars else None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the job was cancelled while the executable ran."""
+        return self._run is not None and self._run.cancelled.is_set()
+
+    def started(self, pid: int) -> None:
+        """Record the process that was started, and kill it straight away if the job was cancelled in the meantime."""
+        self._pid = pid
+        if self._run is not None and self._run.is_stopped():
+            self._kill()
+
+    def _kill(self) -> None:
+        if self._pid is not None:
+            kill_process_group(self._pid)
+
+
+@contextlib.asynccontextmanager
+async def _output_capture_aio() -> AsyncIterator[_OutputCapture]:
+    """Enter and exit an `_OutputCapture` in a worker thread, since creating and removing its files touches the disk."""
+    capture = _OutputCapture()
+    await asyncio.to_thread(capture.__enter__)
+    try:
+        yield capture
+    finally:
+        await asyncio.to_thread(capture.__exit__, None, None, None)
+
+
+async def run_executable_aio(executable_path: str, args: list[str], job_id: str | None = None) -> ExecutionResult:
+    """Run the given executable on the event loop and return the result.
+
+    Behaves the same as `run_executable_sync`, but does not occupy a thread while the executable runs. Output is
+    written by the executable straight into the capture files, and the timeout is enforced by the event loop. The
+    executable runs in its own process group, which is killed as a whole when it times out, or when the job with the
+    given `job_id` is cancelled. The result then has status `cancelled`. Results are cached in the same way.
+
+    Only starting the executable and waiting for it happen on the event loop. Everything that touches the disk, such as
+    looking up the cache key, reading back the output, and storing it as an artifact, is done in a worker thread, so a
+    run with a large output does not hold up other requests.
+    """
+    cache_key = await asyncio.to_thread(_result_cache_key, executable_path, args)
+    if cache_key is not None and (cached := _result_cache.get(cache_key)) is not None:
+        return cached
+
+    artifact_id = None
+    process = None
+    with _JobProcess(job_id) as job_process:
+        try:
+            async with _output_capture_aio() as capture:
+                process = await asyncio.create_subprocess_exec(
+                    executable_path,
+                    *args,
+                    stdout=capture.stdout,
+                    stderr=capture.stderr,
+                    env=job_process.env,
+                    start_new_session=True,
+                )
+                job_process.started(process.pid)
+                return_code = await asyncio.wait_for(process.wait(), settings.EXECUTABLE_TIMEOUT_SEC)
+                output, artifact_id = await asyncio.to_thread(capture.read)
+        except TimeoutError:
+            output = "Execution timed out."
+            return_code = -1
+        except Exception as e:  # noqa: BLE001
+            output = str(e)
+            return_code = -1
+        finally:
+            if process is not None and process.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(process.pid, signal.SIGKILL)
+                await process.wait()
+
+    return _cache_result(
+        cache_key,
+        ExecutionResult(
+            output=output,
+            return_code=return_code,
+            status=JobStatus.CANCELLED if job_process.cancelled else None,
+            artifact_id=artifact_id,
+        ),
+    )
+
+
+async def stream_executable(job_id: UUID, executable_path: str, args: list[str]) -> AsyncIterator[dict[str, Any]]:
+    """Run the given executable, and yield its output while it runs.
+
+    Output is yielded in chunks as soon as it is read, as `{"job_id", "stream", "output"}` frames, where `stream` is
+    either `stdout` or `stderr`. The final frame holds the `return_code` and `status` of the run. Output is not kept in
+    memory, except for the tail end that is stored in the job registry.
+
+    The executable runs in its own process group, which is killed if it runs longer than `EXECUTABLE_TIMEOUT_SEC`, if
+    the consumer stops iterating, e.g. because the client disconnected, or if the job is cancelled.
+    """
+    # The job registry is a SQLite database, of which writes can wait on a lock, so they are done in a worker thread.
+    registry = get_job_registry()
+    await asyncio.to_thread(registry.create, str(job_id), "executable", executable_path)
+    await asyncio.to_thread(registry.mark_running, str(job_id))
+    output_tail = ""
+    return_code = -1
+    process = None
+    job_process = _JobProcess(str(job_id))
+    try:
+        with job_process:
+            process = await asyncio.create_subprocess_exec(
+                executable_path,
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=job_process.env,
+                start_new_session=True,
+            )
+            job_process.started(process.pid)
+            chunks: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue()
+
+            async def _read(stream: asyncio.StreamReader, name: str) -> None:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                while chunk := await stream.read(65536):
+                    await chunks.put((name, decoder.decode(chunk)))
+                await chunks.put(None)
+
+            readers = [
+                asyncio.create_task(_read(stream, name))
+                for stream, name in ((process.stdout, "stdout"), (process.stderr, "stderr"))
+                if stream is not None
+            ]
+            deadline = time.monotonic() + settings.EXECUTABLE_TIMEOUT_SEC
+            open_streams = len(readers)
+            try:
+                while open_streams:
+                    item = await asyncio.wait_for(chunks.get(), deadline - time.monotonic())
+                    if item is None:
+                        open_streams -= 1
+                        continue
+                    stream_name, output = item
+                    output_tail = (output_tail + output)[-settings.JOB_OUTPUT_SUMMARY_MAX_CHARS :]
+                    yield {"job_id": str(job_id), "stream": stream_name, "output": output}
+                return_code = await asyncio.wait_for(process.wait(), max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                output_tail = "Execution timed out."
+                yield {"job_id": str(job_id), "stream": "stderr", "output": output_tail}
+            finally:
+                for reader in readers:
+                    reader.cancel()
+    except Exception as e:  # noqa: BLE001
+        output_tail = str(e)
+        yield {"job_id": str(job_id), "stream": "stderr", "output": output_tail}
+    finally:
+        if process is not None and process.returncode is None:
+            # Kill the whole process group, so no child processes are left behind that keep the output pipes open.
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+        await asyncio.to_thread(
+            registry.mark_finished, str(job_id), return_code=return_code, output=output_tail, failed=return_code != 0
+        )
+
+    result = ExecutionResult(
+        output="", return_code=return_code, status=JobStatus.CANCELLED if job_process.cancelled else None
     )
+    yield {"job_id": str(job_id), "return_code": result.return_code, "status": result.status}
@@ -0,0 +1,64 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of Ansible facts, that is shared by all playbook runs on a worker.
+
+When `FACT_CACHE_ENABLED` is set, playbook runs are configured to store the facts they gather in `FACT_CACHE_DIR`, using
+the `jsonfile` cache plugin of Ansible, and to only gather facts of hosts that are not in the cache yet. Cached facts
+expire after `FACT_CACHE_TTL_SEC`, or when they are invalidated.
+"""
+
+from pathlib import Path
+
+from lso.config import settings
+
+
+def fact_cache_envvars(*, refresh: bool = False) -> dict[str, str]:
+    """Return the environment variables that configure the fact cache for a playbook run.
+
+    Args:
+        refresh (bool, optional): Whether facts are gathered from all hosts, even if they are cached. The cache is
+            updated with the newly gathered facts.
+
+    Returns:
+        The environment variables, which are empty if the fact cache is disabled.
+
+    """
+    if not settings.FACT_CACHE_ENABLED:
+        return {}
+
+    return {
+        "ANSIBLE_GATHERING": "implicit" if refresh else "smart",
+        "ANSIBLE_CACHE_PLUGIN": "jsonfile",
+        "ANSIBLE_CACHE_PLUGIN_CONNECTION": settings.FACT_CACHE_DIR,
+        "ANSIBLE_CACHE_PLUGIN_TIMEOUT": str(settings.FACT_CACHE_TTL_SEC),
+    }
+
+
+def invalidate_facts(hosts: list[str]) -> list[str]:
+    """Remove the cached facts of the given hosts from the fact cache of this worker.
+
+    Returns:
+        The hosts of which cached facts were removed.
+
+    """
+    cache_dir = Path(settings.FACT_CACHE_DIR)
+    invalidated = []
+    for host in hosts:
+        cache_file = cache_dir / host
+        # The jsonfile plugin stores the facts of every host in a file named after it, directly in the cache directory.
+        if cache_file.parent != cache_dir or not cache_file.is_file():
+            continue
+        cache_file.unlink(missing_ok=True)
+        invalidated.append(host)
+    return invalidated
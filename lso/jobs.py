@@ -0,0 +1,415 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry that keeps track of the state of submitted jobs.
+
+Jobs are stored in a local SQLite database, so no additional service is required. Every process (the API, and any
+Celery worker) opens its own connection to the database file, and updates the state of the jobs it runs.
+"""
+
+import json
+import os
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+from lso.config import settings
+from lso.database import Database
+from lso.metrics import observe_job
+from lso.schema import JobInfo, JobState
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL,
+    return_code INTEGER,
+    output TEXT,
+    request_hash TEXT,
+    attached_to TEXT,
+    callback TEXT,
+    batch_id TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at);
+CREATE TABLE IF NOT EXISTS job_progress (
+    job_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    line TEXT NOT NULL,
+    PRIMARY KEY (job_id, sequence)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_shards (
+    job_id TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    status TEXT,
+    return_code INTEGER,
+    output TEXT,
+    stats TEXT,
+    PRIMARY KEY (job_id, shard)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    callback TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+"""
+
+#: Columns that were added to the jobs table later on, and are added to existing databases when they are opened.
+_ADDED_COLUMNS = {"request_hash": "TEXT", "attached_to": "TEXT", "callback": "TEXT", "batch_id": "TEXT"}
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash) WHERE request_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS jobs_attached_to ON jobs (attached_to) WHERE attached_to IS NOT NULL;
+CREATE INDEX IF NOT EXISTS jobs_batch_id ON jobs (batch_id) WHERE batch_id IS NOT NULL;
+"""
+
+#: Minimum interval between two purges of expired jobs, in seconds.
+_PURGE_INTERVAL_SEC = 60
+
+
+def _to_datetime(timestamp: float | None) -> datetime | None:
+    return datetime.fromtimestamp(timestamp, tz=UTC) if timestamp is not None else None
+
+
+_SELECT_JOBS = (
+    "SELECT job_id, kind, name, state, created_at, started_at, finished_at, return_code, output, attached_to, batch_id "
+    "FROM jobs"
+)
+
+
+def _to_job_info(row: tuple) -> JobInfo:
+    return JobInfo(
+        job_id=row[0],
+        kind=row[1],
+        name=row[2],
+        state=row[3],
+        created_at=_to_datetime(row[4]),
+        started_at=_to_datetime(row[5]),
+        finished_at=_to_datetime(row[6]),
+        return_code=row[7],
+        output=row[8],
+        attached_to=row[9],
+        batch_id=row[10],
+    )
+
+
+class JobRegistry:
+    """Store and look up the state of jobs in a SQLite database.
+
+    A single connection is shared by all threads of a process, and access to it is serialised with a lock. Concurrent
+    access from multiple processes is handled by SQLite itself.
+
+    Args:
+        path (str): Path to the SQLite database file.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open the database and make sure the schema exists."""
+        self._database = Database(path, _SCHEMA, {"jobs": _ADDED_COLUMNS}, _INDEXES)
+        self._last_purge = 0.0
+
+    def _purge_expired(self, now: float) -> None:
+        if now - self._last_purge > _PURGE_INTERVAL_SEC:
+            self._last_purge = now
+            self.purge(now - settings.JOB_RETENTION_SEC)
+
+    def create(
+        self, job_id: str, kind: str, name: str, *, callback: str | None = None, batch_id: str | None = None
+    ) -> None:
+        """Register a new job in the `queued` state, optionally as part of a batch.
+
+        The callback URL is stored so that the job can be reported as `cancelled` by the API, if it is cancelled.
+        """
+        now = time.time()
+        self._database.execute(
+            "INSERT INTO jobs (job_id, kind, name, state, created_at, updated_at, callback, batch_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, name, JobState.QUEUED, now, now, callback, batch_id),
+        )
+        self._purge_expired(now)
+
+    def create_batch(self, batch_id: str, callback: str | None, size: int) -> None:
+        """Register a new batch of `size` jobs, which are registered separately with its batch ID."""
+        self._database.execute(
+            "INSERT INTO batches (batch_id, callback, size, created_at) VALUES (?, ?, ?, ?)",
+            (batch_id, callback, size, time.time()),
+        )
+
+    def create_or_attach(
+        self,
+        job_id: str,
+        kind: str,
+        name: str,
+        request_hash: str,
+        callback: str | None,
+        *,
+        batch_id: str | None = None,
+    ) -> str | None:
+        """Register a new job, unless an identical job is still queued or running.
+
+        If there is such a job, that was submitted less than `PLAYBOOK_DEDUPLICATION_WINDOW_SEC` ago, the new job is
+        attached to it instead. It then follows the state of that job, and is finished together with it. Otherwise, the
+        new job is registered in the `queued` state, so that identical jobs that are submitted later can attach to it.
+
+        Returns:
+            The ID of the job that the new job was attached to, or `None` if the new job must be run.
+
+        """
+        now = time.time()
+        with self._database.transaction() as connection:
+            row = connection.execute(
+                "SELECT job_id, state, started_at FROM jobs "
+                "WHERE request_hash = ? AND attached_to IS NULL AND state IN (?, ?) AND created_at > ? "
+                "ORDER BY created_at LIMIT 1",
+                (request_hash, JobState.QUEUED, JobState.RUNNING, now - settings.PLAYBOOK_DEDUPLICATION_WINDOW_SEC),
+            ).fetchone()
+            attached_to, state, started_at = row if row is not None else (None, JobState.QUEUED, None)
+            connection.execute(
+                "INSERT INTO jobs (job_id, kind, name, state, created_at, started_at, updated_at, request_hash, "
+                "attached_to, callback, batch_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, name, state, now, started_at, now, request_hash, attached_to, callback, batch_id),
+            )
+        self._purge_expired(now)
+        return attached_to
+
+    def mark_running(self, job_id: str) -> bool:
+        """Move a job, and any jobs attached to it, to the `running` state, unless the job has been cancelled.
+
+        Returns:
+            `False` if the job has been cancelled, and must not be run. `True` otherwise.
+
+        """
+        now = time.time()
+        with self._database.transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, started_at = ?, updated_at = ? "
+                "WHERE (job_id = ? OR attached_to = ?) AND state != ?",
+                (JobState.RUNNING, now, now, job_id, job_id, JobState.CANCELLED),
+            )
+            row = connection.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row is None or row[0] != JobState.CANCELLED
+
+    def mark_finished(
+        self, job_id: str, *, return_code: int, output: str, failed: bool
+    ) -> list[tuple[str, str | None]] | None:
+        """Move a job, and any jobs attached to it, to the `finished` or the `failed` state, and store the result.
+
+        Only the tail end of the output is stored, bounded by `JOB_OUTPUT_SUMMARY_MAX_CHARS`. The duration of the job is
+        recorded in the metrics. A job that has been cancelled keeps its `cancelled` state, since it has already been
+        reported as such.
+
+        Returns:
+            The job ID and callback URL of every job that was attached to this job, so their callbacks can be sent.
+            `None` if the job has been cancelled.
+
+        """
+        now = time.time()
+        state = JobState.FAILED if failed else JobState.FINISHED
+        summary = output[-settings.JOB_OUTPUT_SUMMARY_MAX_CHARS :] if settings.JOB_OUTPUT_SUMMARY_MAX_CHARS else ""
+        with self._database.transaction() as connection:
+            cancelled = connection.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND state = ?", (job_id, JobState.CANCELLED)
+            ).fetchone()
+            if cancelled is not None:
+                return None
+            row = connection.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, updated_at = ?, return_code = ?, output = ? "
+                "WHERE job_id = ? RETURNING kind, name, COALESCE(started_at, created_at)",
+                (state, now, now, return_code, summary, job_id),
+            ).fetchone()
+            attached = connection.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, updated_at = ?, return_code = ?, output = ? "
+                "WHERE attached_to = ? AND state IN (?, ?) RETURNING job_id, callback",
+                (state, now, now, return_code, summary, job_id, JobState.QUEUED, JobState.RUNNING),
+            ).fetchall()
+        if row is not None:
+            observe_job(row[0], row[1], failed=failed, duration_sec=now - row[2])
+
+        return [(attached_job_id, callback) for attached_job_id, callback in attached]
+
+    def cancel(self, job_id: str, output: str) -> list[tuple[str, str, str | None]]:
+        """Move a queued or running job, and any jobs attached to it, to the `cancelled` state.
+
+        Processes that run the job notice this through `cancelled`, and stop running it.
+
+        Returns:
+            The job ID, kind and callback URL of every job that was cancelled, starting with the job itself. Empty if
+            the job is unknown, or has already finished.
+
+        """
+        now = time.time()
+        with self._database.transaction() as connection:
+            cancelled = connection.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, updated_at = ?, return_code = ?, output = ? "
+                "WHERE (job_id = ? OR attached_to = ?) AND state IN (?, ?) RETURNING job_id, kind, callback",
+                (JobState.CANCELLED, now, now, -1, output, job_id, job_id, JobState.QUEUED, JobState.RUNNING),
+            ).fetchall()
+        if all(row[0] != job_id for row in cancelled):
+            return []
+
+        return sorted(cancelled, key=lambda row: row[0] != job_id)
+
+    def cancelled(self, job_ids: list[str]) -> set[str]:
+        """Return which of the given jobs have been cancelled."""
+        placeholders = ", ".join("?" * len(job_ids))
+        rows = self._database.execute(
+            f"SELECT job_id FROM jobs WHERE state = ? AND job_id IN ({placeholders})",  # noqa: S608
+            (JobState.CANCELLED, *job_ids),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def in_progress(self, job_ids: list[str]) -> set[str]:
+        """Return which of the given jobs are queued or running."""
+        placeholders = ", ".join("?" * len(job_ids))
+        rows = self._database.execute(
+            f"SELECT job_id FROM jobs WHERE state IN (?, ?) AND job_id IN ({placeholders})",  # noqa: S608
+            (JobState.QUEUED, JobState.RUNNING, *job_ids),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def create_shards(self, job_id: str, count: int) -> None:
+        """Register that a job is run as `count` shards, of which the results are merged once they have all finished."""
+        with self._database.transaction() as connection:
+            connection.executemany(
+                "INSERT INTO job_shards (job_id, shard) VALUES (?, ?)", [(job_id, shard) for shard in range(count)]
+            )
+
+    def finish_shard(
+        self, job_id: str, shard: int, *, status: str, return_code: int, output: list[str], stats: dict[str, Any]
+    ) -> list[tuple[str, int, list[str], dict[str, Any]]] | None:
+        """Store the result of a shard of a job.
+
+        The results of all shards are only returned to the last shard that finishes, which reports the merged result.
+        They are then removed from the registry.
+
+        Returns:
+            The status, return code, output lines and stats of every shard, in order, if all shards have finished.
+            `None` otherwise.
+
+        """
+        with self._database.transaction() as connection:
+            connection.execute(
+                "UPDATE job_shards SET status = ?, return_code = ?, output = ?, stats = ? "
+                "WHERE job_id = ? AND shard = ? AND status IS NULL",
+                (status, return_code, json.dumps(output), json.dumps(stats, default=str), job_id, shard),
+            )
+            (pending,) = connection.execute(
+                "SELECT COUNT(*) FROM job_shards WHERE job_id = ? AND status IS NULL", (job_id,)
+            ).fetchone()
+            if pending:
+                return None
+            rows = connection.execute(
+                "DELETE FROM job_shards WHERE job_id = ? RETURNING shard, status, return_code, output, stats", (job_id,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        return [(row[1], row[2], json.loads(row[3]), json.loads(row[4])) for row in sorted(rows)]
+
+    def finish_batches(self, job_ids: list[str]) -> list[tuple[str, str | None, list[JobInfo]]]:
+        """Mark the batches of the given jobs as finished, if all of their jobs have finished.
+
+        Every batch is only reported once, by the first call after its last job has finished.
+
+        Returns:
+            The batch ID, callback URL and jobs of every batch that has just finished.
+
+        """
+        now = time.time()
+        finished = []
+        with self._database.transaction() as connection:
+            placeholders = ", ".join("?" * len(job_ids))
+            batch_ids = connection.execute(
+                f"SELECT DISTINCT batch_id FROM jobs WHERE batch_id IS NOT NULL AND job_id IN ({placeholders})",  # noqa: S608
+                tuple(job_ids),
+            ).fetchall()
+            for (batch_id,) in batch_ids:
+                row = connection.execute(
+                    "UPDATE batches SET finished_at = ? WHERE batch_id = ? AND finished_at IS NULL "
+                    "AND size = (SELECT COUNT(*) FROM jobs WHERE batch_id = ? AND state IN (?, ?, ?)) "
+                    "RETURNING callback",
+                    (now, batch_id, batch_id, JobState.FINISHED, JobState.FAILED, JobState.CANCELLED),
+                ).fetchone()
+                if row is not None:
+                    finished.append((batch_id, row[0]))
+        return [(batch_id, callback, self.get_batch_jobs(batch_id)) for batch_id, callback in finished]
+
+    def get_batch_jobs(self, batch_id: str) -> list[JobInfo]:
+        """Return all jobs of a batch, in the order in which they were submitted."""
+        rows = self._database.execute(f"{_SELECT_JOBS} WHERE batch_id = ? ORDER BY rowid", (batch_id,)).fetchall()
+        return [_to_job_info(row) for row in rows]
+
+    def get(self, job_id: str) -> JobInfo | None:
+        """Look up a job, returns `None` if it is unknown."""
+        row = self._database.execute(f"{_SELECT_JOBS} WHERE job_id = ?", (job_id,)).fetchone()
+        return _to_job_info(row) if row is not None else None
+
+    def append_progress(self, job_id: str, first_sequence: int, lines: list[str]) -> None:
+        """Store the progress output lines of a job, numbered from `first_sequence` onwards.
+
+        Only the last `PROGRESS_BUFFER_MAX_LINES` lines of each job are kept.
+        """
+        rows = [(job_id, first_sequence + offset, line) for offset, line in enumerate(lines)]
+        with self._database.transaction() as connection:
+            connection.executemany("INSERT OR REPLACE INTO job_progress VALUES (?, ?, ?)", rows)
+            connection.execute(
+                "DELETE FROM job_progress WHERE job_id = ? AND sequence < ?",
+                (job_id, first_sequence + len(lines) - settings.PROGRESS_BUFFER_MAX_LINES),
+            )
+
+    def get_progress(self, job_id: str, since: int, limit: int) -> list[tuple[int, str]]:
+        """Return at most `limit` stored progress lines of a job, starting at sequence number `since`."""
+        return self._database.execute(
+            "SELECT sequence, line FROM job_progress WHERE job_id = ? AND sequence >= ? ORDER BY sequence LIMIT ?",
+            (job_id, since, limit),
+        ).fetchall()
+
+    def purge(self, before: float) -> None:
+        """Remove all jobs that have not been updated since the given timestamp."""
+        with self._database.transaction() as connection:
+            connection.execute(
+                "DELETE FROM job_progress WHERE job_id IN (SELECT job_id FROM jobs WHERE updated_at < ?)", (before,)
+            )
+            connection.execute(
+                "DELETE FROM job_shards WHERE job_id IN (SELECT job_id FROM jobs WHERE updated_at < ?)", (before,)
+            )
+            connection.execute("DELETE FROM jobs WHERE updated_at < ?", (before,))
+            connection.execute(
+                "DELETE FROM batches WHERE created_at < ? AND batch_id NOT IN "
+                "(SELECT batch_id FROM jobs WHERE batch_id IS NOT NULL)",
+                (before,),
+            )
+
+
+_registry: JobRegistry | None = None
+_registry_pid: int | None = None
+
+
+def get_job_registry() -> JobRegistry:
+    """Initialize or return a cached `JobRegistry` for the current process.
+
+    A new connection is opened after a fork, since SQLite connections can't be shared between processes.
+    """
+    global _registry, _registry_pid  # noqa: PLW0603
+    if _registry is None or _registry_pid != os.getpid():
+        _registry = JobRegistry(settings.JOB_REGISTRY_PATH)
+        _registry_pid = os.getpid()
+
+    return _registry
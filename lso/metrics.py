@@ -0,0 +1,117 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prometheus metrics of LSO.
+
+Metrics are recorded in the process that does the work, which may be the API, a process pool worker, or a Celery
+worker. When the `PROMETHEUS_MULTIPROC_DIR` environment variable points to a directory that all of these processes
+share, the metrics of every process are combined when they are collected.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from lso.admission import get_admission_controller, local_workers
+from lso.config import ExecutorType, settings
+
+JOB_DURATION = Histogram(
+    "lso_job_duration_seconds",
+    "Time from the start until the end of a job.",
+    ["kind", "name", "outcome"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, float("inf")),
+)
+HTTP_POST_DURATION = Histogram(
+    "lso_http_post_duration_seconds",
+    "Latency of callbacks and progress updates that are POSTed to external systems.",
+    ["kind"],
+)
+HTTP_POST_FAILURES = Counter(
+    "lso_http_post_failures",
+    "Callbacks and progress updates that could not be delivered to external systems.",
+    ["kind"],
+)
+CALLBACK_OUTBOX_FAILURES = Counter(
+    "lso_callback_outbox_failures",
+    "Callbacks in the outbox that could not be delivered within the maximum amount of attempts.",
+)
+INVENTORY_VALIDATION_DURATION = Histogram(
+    "lso_inventory_validation_duration_seconds",
+    "Time it takes to validate an inventory, including validations served from the cache.",
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "lso_executor_queue_depth",
+    "Jobs that wait for a worker of the local executor.",
+    multiprocess_mode="livesum",
+)
+EXECUTOR_ACTIVE_WORKERS = Gauge(
+    "lso_executor_active_workers",
+    "Workers of the local executor that are running a job.",
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def observe_http_post(kind: str) -> Iterator[None]:
+    """Measure the latency of a POST to an external system, and count it as failed if an exception is raised.
+
+    Args:
+        kind (str): What is POSTed, either `callback` or `progress`.
+
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        HTTP_POST_FAILURES.labels(kind).inc()
+        raise
+    finally:
+        HTTP_POST_DURATION.labels(kind).observe(time.perf_counter() - start)
+
+
+def observe_job(kind: str, name: str, *, failed: bool, duration_sec: float) -> None:
+    """Record the duration of a finished job."""
+    JOB_DURATION.labels(kind, name, "failed" if failed else "finished").observe(duration_sec)
+
+
+def _update_executor_gauges() -> None:
+    """Derive the state of the local executor from the jobs that are in flight."""
+    if settings.EXECUTOR == ExecutorType.WORKER:
+        return
+
+    workers = local_workers()
+    in_flight = get_admission_controller().in_flight()
+    EXECUTOR_QUEUE_DEPTH.set(max(in_flight - workers, 0))
+    EXECUTOR_ACTIVE_WORKERS.set(min(in_flight, workers))
+
+
+def collect_metrics() -> bytes:
+    """Return the current metrics in the Prometheus exposition format."""
+    _update_executor_gauges()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+    return generate_latest(REGISTRY)
@@ -0,0 +1,263 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Durable outbox for callbacks, that are delivered in the background.
+
+When `CALLBACK_OUTBOX_ENABLED` is set, a finished job stores its callback in a local SQLite database instead of POSTing
+it straight away. A dispatcher thread delivers stored callbacks, and retries failed deliveries with exponential backoff.
+Callbacks therefore survive an outage of the receiving system, and a restart of LSO itself. A callback that still fails
+after `CALLBACK_RETRY_MAX_ATTEMPTS` attempts is kept as failed, until it is replayed or expires after
+`JOB_RETENTION_SEC`.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+
+from lso.config import settings
+from lso.database import Database
+from lso.metrics import CALLBACK_OUTBOX_FAILURES, observe_http_post
+from lso.schema import FailedCallback
+from lso.tracing import attach_context, detach_context, inject_headers, start_span
+from lso.utils import get_http_session
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS callbacks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS callbacks_next_attempt_at ON callbacks (next_attempt_at);
+"""
+
+#: Columns that were added to the callbacks table later on, and are added to existing databases when they are opened.
+_ADDED_COLUMNS = {"headers": "TEXT", "failed_at": "REAL"}
+
+#: Maximum amount of callbacks that are claimed by a dispatcher at once.
+_BATCH_SIZE = 20
+#: Maximum time the dispatcher sleeps before checking for due callbacks again, in seconds.
+_POLL_INTERVAL_SEC = 1.0
+
+
+class _CircuitBreaker:
+    """Keep track of consecutive delivery failures per destination host.
+
+    After `CALLBACK_CIRCUIT_BREAKER_THRESHOLD` consecutive failures, the circuit for that host opens, and no deliveries
+    are attempted until `CALLBACK_CIRCUIT_BREAKER_RESET_SEC` has passed.
+    """
+
+    def __init__(self) -> None:
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+
+    def open_until(self, host: str) -> float:
+        return self._open_until.get(host, 0.0)
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(host, None)
+        self._open_until.pop(host, None)
+
+    def record_failure(self, host: str, now: float) -> None:
+        self._failures[host] = self._failures.get(host, 0) + 1
+        if self._failures[host] >= settings.CALLBACK_CIRCUIT_BREAKER_THRESHOLD:
+            self._open_until[host] = now + settings.CALLBACK_CIRCUIT_BREAKER_RESET_SEC
+            logger.warning("Opening circuit for callbacks to %s after %d failures", host, self._failures[host])
+
+
+def _backoff_delay(attempts: int) -> float:
+    """Return the delay before the next delivery attempt: exponential in the amount of attempts, with jitter."""
+    delay = min(settings.CALLBACK_RETRY_MAX_DELAY_SEC, settings.CALLBACK_RETRY_BASE_DELAY_SEC * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)  # noqa: S311
+
+
+class CallbackOutbox:
+    """Store callbacks in a SQLite database, and deliver them with retries.
+
+    Multiple processes can share the same database. Each dispatcher claims a callback with a lease before delivering
+    it, so a callback is not delivered twice at the same time.
+
+    Args:
+        path (str): Path to the SQLite database file.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open the database and make sure the schema exists."""
+        self._database = Database(path, _SCHEMA, {"callbacks": _ADDED_COLUMNS})
+        self._circuit_breaker = _CircuitBreaker()
+        self._wakeup = threading.Event()
+        self._dispatcher: threading.Thread | None = None
+
+    def enqueue(self, url: str, payload: dict[str, Any]) -> None:
+        """Store a callback, to be delivered by the dispatcher as soon as possible.
+
+        The current trace context is stored along with it, so its delivery continues the trace of the job.
+        """
+        self._database.execute(
+            "INSERT INTO callbacks (url, payload, headers, next_attempt_at) VALUES (?, ?, ?, ?)",
+            (url, json.dumps(payload), json.dumps(inject_headers({})), time.time()),
+        )
+        self._wakeup.set()
+
+    def pending(self) -> int:
+        """Return the amount of callbacks that have not been delivered yet, and are still being retried."""
+        return self._database.execute("SELECT COUNT(*) FROM callbacks WHERE failed_at IS NULL").fetchone()[0]
+
+    def failed(self) -> list[FailedCallback]:
+        """Return the callbacks that could not be delivered within `CALLBACK_RETRY_MAX_ATTEMPTS` attempts."""
+        rows = self._database.execute(
+            "SELECT id, url, payload, attempts, failed_at FROM callbacks WHERE failed_at IS NOT NULL ORDER BY id"
+        ).fetchall()
+        return [
+            FailedCallback(
+                callback_id=row[0],
+                url=row[1],
+                payload=json.loads(row[2]),
+                attempts=row[3],
+                failed_at=datetime.fromtimestamp(row[4], tz=UTC),
+            )
+            for row in rows
+        ]
+
+    def replay(self, callback_ids: list[int] | None = None) -> int:
+        """Deliver failed callbacks again, with a fresh amount of attempts, and return how many there are.
+
+        Args:
+            callback_ids (list[int], optional): The failed callbacks to replay. All of them when not given.
+
+        """
+        query = "UPDATE callbacks SET attempts = 0, next_attempt_at = ?, failed_at = NULL WHERE failed_at IS NOT NULL"
+        parameters: tuple[Any, ...] = (time.time(),)
+        if callback_ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(callback_ids))})"
+            parameters += tuple(callback_ids)
+        replayed = self._database.execute(query, parameters).rowcount
+        self._wakeup.set()
+        return replayed
+
+    def _claim_due(self, now: float) -> list[tuple[int, str, str, str | None, int]]:
+        lease_until = now + settings.REQUEST_TIMEOUT_SEC * _BATCH_SIZE
+        with self._database.transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, url, payload, headers, attempts FROM callbacks "
+                "WHERE failed_at IS NULL AND next_attempt_at <= ? AND lease_until < ? ORDER BY next_attempt_at LIMIT ?",
+                (now, now, _BATCH_SIZE),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE callbacks SET lease_until = ? WHERE id = ?", [(lease_until, row[0]) for row in rows]
+            )
+        return rows
+
+    def _reschedule(self, callback_id: int, attempts: int, next_attempt_at: float) -> None:
+        self._database.execute(
+            "UPDATE callbacks SET attempts = ?, next_attempt_at = ?, lease_until = 0 WHERE id = ?",
+            (attempts, next_attempt_at, callback_id),
+        )
+
+    def _fail(self, callback_id: int, attempts: int, now: float) -> None:
+        with self._database.transaction() as connection:
+            connection.execute(
+                "UPDATE callbacks SET attempts = ?, failed_at = ?, lease_until = 0 WHERE id = ?",
+                (attempts, now, callback_id),
+            )
+            connection.execute("DELETE FROM callbacks WHERE failed_at < ?", (now - settings.JOB_RETENTION_SEC,))
+        CALLBACK_OUTBOX_FAILURES.inc()
+
+    def _delete(self, callback_id: int) -> None:
+        self._database.execute("DELETE FROM callbacks WHERE id = ?", (callback_id,))
+
+    def _post(self, url: str, payload: str, trace_headers: str | None) -> None:
+        """POST a stored callback, continuing the trace it was stored in."""
+        token = attach_context(json.loads(trace_headers or "{}"))
+        try:
+            with start_span("send callback", **{"url.full": url}), observe_http_post("callback"):
+                response = get_http_session().post(
+                    url,
+                    data=payload,
+                    headers=inject_headers({"Content-Type": "application/json"}),
+                    timeout=settings.REQUEST_TIMEOUT_SEC,
+                )
+                response.raise_for_status()
+        finally:
+            detach_context(token)
+
+    def dispatch_due(self) -> None:
+        """Attempt to deliver all callbacks that are due."""
+        now = time.time()
+        for callback_id, url, payload, trace_headers, previous_attempts in self._claim_due(now):
+            host = urlsplit(url).netloc
+            open_until = self._circuit_breaker.open_until(host)
+            if open_until > now:
+                self._reschedule(callback_id, previous_attempts, open_until)
+                continue
+
+            try:
+                self._post(url, payload, trace_headers)
+            except requests.RequestException as e:
+                attempts = previous_attempts + 1
+                self._circuit_breaker.record_failure(host, now)
+                if attempts >= settings.CALLBACK_RETRY_MAX_ATTEMPTS:
+                    logger.error("Giving up on callback to %s after %d attempts: %s", url, attempts, e)  # noqa: TRY400
+                    self._fail(callback_id, attempts, time.time())
+                else:
+                    logger.warning("Callback to %s failed, attempt %d: %s", url, attempts, e)
+                    self._reschedule(callback_id, attempts, time.time() + _backoff_delay(attempts))
+                continue
+
+            self._circuit_breaker.record_success(host)
+            self._delete(callback_id)
+
+    def _dispatch_forever(self) -> None:
+        while True:
+            try:
+                self.dispatch_due()
+            except Exception:
+                logger.exception("Failed to dispatch callbacks")
+            self._wakeup.wait(_POLL_INTERVAL_SEC)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the dispatcher thread, if it is not running yet."""
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_forever, name="lso-outbox", daemon=True)
+            self._dispatcher.start()
+
+
+_outbox: CallbackOutbox | None = None
+_outbox_pid: int | None = None
+_outbox_lock = threading.Lock()
+
+
+def get_callback_outbox() -> CallbackOutbox:
+    """Initialize or return a cached `CallbackOutbox` for the current process, with its dispatcher running."""
+    global _outbox, _outbox_pid  # noqa: PLW0603
+    with _outbox_lock:
+        if _outbox is None or _outbox_pid != os.getpid():
+            _outbox = CallbackOutbox(settings.CALLBACK_OUTBOX_PATH)
+            _outbox_pid = os.getpid()
+            _outbox.start()
+
+    return _outbox
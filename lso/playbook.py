@@ -13,15 +13,25 @@
 
 """Module that gathers common API responses and data models."""
 
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Any
 from uuid import UUID, uuid4
 
-from pydantic import HttpUrl
+from pydantic import BaseModel, HttpUrl
 
+from lso.admission import get_admission_controller
+from lso.cancellation import track_local_job
 from lso.config import ExecutorType, settings
-from lso.tasks import run_playbook_proc_task
-from lso.utils import get_thread_pool
+from lso.jobs import get_job_registry
+from lso.routing import task_options
+from lso.tasks import run_playbook_proc_task, worker_crash_handler_factory
+from lso.tracing import propagate_context, start_span
+from lso.utils import get_thread_pool, submit_to_process_pool
 
 
 def get_playbook_path(playbook_name: Path) -> Path:
@@ -29,6 +39,198 @@ def get_playbook_path(playbook_name: Path) -> Path:
     return Path(settings.ANSIBLE_PLAYBOOKS_ROOT_DIR) / playbook_name
 
 
+def _ini_inventory_hosts(inventory: str) -> list[str]:
+    hosts: dict[str, None] = {}
+    in_hosts_section = True
+    for raw_line in inventory.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("["):
+            in_hosts_section = not line.rstrip("]").endswith((":vars", ":children"))
+        elif in_hosts_section:
+            hosts[line.split()[0]] = None
+    return list(hosts)
+
+
+def _inventory_hosts(inventory: dict[str, Any] | str) -> list[str]:
+    """Return the names of all hosts in an inventory, in the order in which they first appear.
+
+    Dictionaries are walked through their groups and `children`, strings are read as INI inventories. Host ranges such
+    as `web[01:10]` are not expanded.
+    """
+    if isinstance(inventory, str):
+        return _ini_inventory_hosts(inventory)
+
+    hosts: dict[str, None] = {}
+
+    def _walk(inventory_group: Any) -> None:
+        if not isinstance(inventory_group, dict):
+            return
+        hosts.update(dict.fromkeys(inventory_group.get("hosts") or {}))
+        children = inventory_group.get("children") or {}
+        if isinstance(children, dict):
+            for child in children.values():
+                _walk(child)
+
+    for group_name, inventory_group in inventory.items():
+        if group_name != "_meta":
+            _walk(inventory_group)
+    return list(hosts)
+
+
+class PlaybookRun(BaseModel):
+    """A run of an Ansible playbook, as it is dispatched to an executor.
+
+    Attributes:
+        playbook_path (Path): Path to the playbook to be executed.
+        extra_vars (dict[str, Any]): Any extra vars needed for the playbook to run.
+        inventory (dict[str, Any] | str): The inventory that the playbook is executed against.
+        callback (HttpUrl, optional): Callback URL where the result of this run is sent.
+        progress (HttpUrl, optional): URL where the progress updates of this run are sent.
+        progress_is_incremental (bool): Whether progress updates should only contain the latest info.
+        progress_is_sequenced (bool): Whether progress updates should be numbered with a sequence number.
+        shards (int, optional): The amount of shards to split the hosts of the inventory into, each of which is run as a
+            separate task. Not sharded when not set, or when the inventory has fewer than two hosts.
+        refresh_facts (bool): Whether facts are gathered again, even if they are in the fact cache.
+        priority (int, optional): The priority of the tasks of this run in their Celery queue, from 0 to 9.
+        deadline_sec (int, optional): The wall-clock time that every task of this run may take, in seconds.
+
+    """
+
+    playbook_path: Path
+    extra_vars: dict[str, Any]
+    inventory: dict[str, Any] | str
+    callback: HttpUrl | None = None
+    progress: HttpUrl | None = None
+    progress_is_incremental: bool = True
+    progress_is_sequenced: bool = False
+    shards: int | None = None
+    refresh_facts: bool = False
+    priority: int | None = None
+    deadline_sec: int | None = None
+
+    @property
+    def name(self) -> str:
+        """The name of the playbook, relative to `ANSIBLE_PLAYBOOKS_ROOT_DIR`."""
+        return os.path.relpath(self.playbook_path, settings.ANSIBLE_PLAYBOOKS_ROOT_DIR)
+
+    def request_hash(self) -> str:
+        """Return a hash of this run, that is the same for runs that would run the exact same playbook, the same way."""
+        request = {
+            "playbook": str(self.playbook_path),
+            "extra_vars": self.extra_vars,
+            "inventory": self.inventory,
+            "shards": self.shards,
+            "deadline_sec": self.deadline_sec,
+            "refresh_facts": self.refresh_facts,
+        }
+        request_json = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(request_json.encode()).hexdigest()
+
+    def task_calls(self, job_id: UUID) -> list[tuple[tuple[Any, ...], dict[str, Any]]]:
+        """Return the positional and keyword arguments of every `run_playbook_proc_task` that this run consists of.
+
+        A run that is not sharded is a single task. A sharded run is a task per shard, limited to the hosts of that
+        shard. Hosts are spread over the shards round-robin.
+        """
+        args = (
+            str(job_id),
+            str(self.playbook_path),
+            self.extra_vars,
+            self.inventory,
+            str(self.callback) if self.callback else None,
+            str(self.progress) if self.progress else None,
+        )
+        kwargs = {
+            "progress_is_incremental": self.progress_is_incremental,
+            "progress_is_sequenced": self.progress_is_sequenced,
+            "refresh_facts": self.refresh_facts,
+            "deadline_sec": self.deadline_sec,
+        }
+        hosts = _inventory_hosts(self.inventory) if self.shards and self.shards > 1 else []
+        shard_count = min(self.shards or 1, len(hosts))
+        if shard_count < 2:  # noqa: PLR2004
+            return [(args, kwargs)]
+
+        return [(args, {**kwargs, "shard": shard, "limit": hosts[shard::shard_count]}) for shard in range(shard_count)]
+
+
+def _register(job_id: UUID, run: PlaybookRun, shard_count: int, batch_id: UUID | None = None) -> str | None:
+    """Register the job of a playbook run, and return the ID of the job it was attached to, if it is a duplicate."""
+    batch_id_str = str(batch_id) if batch_id else None
+    registry = get_job_registry()
+    if settings.PLAYBOOK_DEDUPLICATION_ENABLED:
+        attached_to = registry.create_or_attach(
+            str(job_id),
+            "playbook",
+            str(run.playbook_path),
+            run.request_hash(),
+            str(run.callback) if run.callback else None,
+            batch_id=batch_id_str,
+        )
+        if attached_to is not None:
+            return attached_to
+    else:
+        registry.create(
+            str(job_id),
+            "playbook",
+            str(run.playbook_path),
+            callback=str(run.callback) if run.callback else None,
+            batch_id=batch_id_str,
+        )
+
+    if shard_count > 1:
+        registry.create_shards(str(job_id), shard_count)
+    return None
+
+
+def _submit_locally(
+    run: PlaybookRun, args: tuple[Any, ...], kwargs: dict[str, Any], release: Callable[[Future | None], None]
+) -> None:
+    """Submit a task of a playbook run to the thread pool or the process pool."""
+    if settings.EXECUTOR == ExecutorType.PROCESSPOOL:
+        executor_handle = submit_to_process_pool(propagate_context(run_playbook_proc_task), *args, **kwargs)
+        callback = str(run.callback) if run.callback else None
+        executor_handle.add_done_callback(
+            worker_crash_handler_factory(args[0], callback, kind="playbook", shard=kwargs.get("shard"))
+        )
+    else:
+        executor_handle = get_thread_pool().submit(propagate_context(run_playbook_proc_task), *args, **kwargs)
+    executor_handle.add_done_callback(release)
+    track_local_job(args[0], executor_handle)
+    if settings.TESTING:
+        executor_handle.result()
+
+
+def _dispatch(
+    tasks: list[tuple[PlaybookRun, tuple[Any, ...], dict[str, Any], Callable[[Future | None], None]]],
+) -> None:
+    """Dispatch the tasks of registered playbook runs, as a single Celery group or in one loop to the local executor.
+
+    Tasks are removed from the list once they are handed to an executor, so if dispatching fails, the admission slots of
+    the tasks that remain in the list can still be released.
+    """
+    if settings.EXECUTOR == ExecutorType.WORKER:
+        if len(tasks) == 1:
+            run, args, kwargs, _release = tasks[0]
+            run_playbook_proc_task.apply_async(args, kwargs, **task_options(run.name, run.priority))
+        else:
+            from celery import group  # noqa: PLC0415
+
+            group(
+                run_playbook_proc_task.si(*args, **kwargs).set(**task_options(run.name, run.priority))
+                for run, args, kwargs, _release in tasks
+            ).apply_async()
+        tasks.clear()
+        return
+
+    while tasks:
+        run, args, kwargs, release = tasks[0]
+        _submit_locally(run, args, kwargs, release)
+        tasks.pop(0)
+
+
 def run_playbook(
     playbook_path: Path,
     extra_vars: dict[str, Any],
@@ -37,6 +239,11 @@ def run_playbook(
     progress: HttpUrl | None,
     *,
     progress_is_incremental: bool,
+    progress_is_sequenced: bool = False,
+    shards: int | None = None,
+    refresh_facts: bool = False,
+    priority: int | None = None,
+    deadline_sec: int | None = None,
 ) -> UUID:
     """Run an Ansible playbook against a specified inventory.
 
@@ -50,40 +257,114 @@ def run_playbook(
             progresses.
         progress_is_incremental (bool): `True` if the progress updates should only contain the latest info. `False` if
             the progress update should contain the complete history of the playbook execution.
+        progress_is_sequenced (bool, optional): `True` if the progress updates should only contain the latest info,
+            numbered with a sequence number. Takes precedence over `progress_is_incremental`.
+        shards (int, optional): Split the hosts of the inventory into this many shards, that are run as separate tasks,
+            possibly on different workers. Their results are merged into a single callback once all of them finished.
+        refresh_facts (bool, optional): `True` if facts should be gathered from all hosts, even if they are cached.
+        priority (int, optional): The priority of the playbook run in its Celery queue, from 0 to 9. Ignored by the
+            local executors.
+        deadline_sec (int, optional): The wall-clock time that the playbook run may take, in seconds, after which it is
+            killed and reported with status `timeout`.
+
+    When `PLAYBOOK_DEDUPLICATION_ENABLED` is set, and an identical request is still queued or running, the playbook is
+    not run again. Instead, the new job is attached to the one in progress, and its callback receives the same result.
+
+    Raises:
+        JobRejectedError: If a local executor is used, and it has no capacity to run the playbook.
 
     """
     job_id = uuid4()
-    callback_str = None
-    progress_str = None
-    if callback:
-        callback_str = str(callback)
-    if progress:
-        progress_str = str(progress)
-
-    if settings.EXECUTOR == ExecutorType.THREADPOOL:
-        executor = get_thread_pool()
-        executor_handle = executor.submit(
-            run_playbook_proc_task,
-            str(job_id),
-            str(playbook_path),
-            extra_vars,
-            inventory,
-            callback_str,
-            progress_str,
-            progress_is_incremental=progress_is_incremental,
-        )
-        if settings.TESTING:
-            executor_handle.result()
+    run = PlaybookRun(
+        playbook_path=playbook_path,
+        extra_vars=extra_vars,
+        inventory=inventory,
+        callback=callback,
+        progress=progress,
+        progress_is_incremental=progress_is_incremental,
+        progress_is_sequenced=progress_is_sequenced,
+        shards=shards,
+        refresh_facts=refresh_facts,
+        priority=priority,
+        deadline_sec=deadline_sec,
+    )
+    calls = run.task_calls(job_id)
+    releases = get_admission_controller().admit_all([run.name] * len(calls))
 
-    elif settings.EXECUTOR == ExecutorType.WORKER:
-        run_playbook_proc_task.delay(
-            str(job_id),
-            str(playbook_path),
-            extra_vars,
-            inventory,
-            callback_str,
-            progress_str,
-            progress_is_incremental=progress_is_incremental,
-        )
+    tasks = [(run, args, kwargs, release) for (args, kwargs), release in zip(calls, releases, strict=True)]
+    with start_span("dispatch playbook", **{"lso.job_id": str(job_id), "lso.playbook": str(playbook_path)}) as span:
+        try:
+            attached_to = _register(job_id, run, len(calls))
+            if attached_to is not None:
+                span.set_attribute("lso.attached_to", attached_to)
+                for release in releases:
+                    release()
+                return job_id
+
+            _dispatch(tasks)
+        except BaseException:
+            # Release the slots of the tasks that were not handed to an executor, those that were release their own.
+            for *_, release in tasks:
+                release()
+            raise
 
     return job_id
+
+
+def run_playbook_batch(runs: list[PlaybookRun], callback: HttpUrl | None) -> tuple[UUID | None, list[UUID]]:
+    """Run a batch of Ansible playbooks at once.
+
+    All runs are admitted before any of them is dispatched, so a batch is either accepted or rejected as a whole. They
+    are then sent to Celery as a single group, or submitted to the local executor in one loop. Each run is a job of its
+    own, which reports to its own callback. Duplicates are attached to jobs in progress, the same as for `run_playbook`.
+
+    Args:
+        runs (list[PlaybookRun]): The playbook runs in the batch.
+        callback (HttpUrl, optional): Callback URL where a summary of the batch is sent, once all of its runs have
+            finished.
+
+    Returns:
+        The batch ID, if a callback was given, and the job IDs of all runs in the batch.
+
+    Raises:
+        JobRejectedError: If a local executor is used, and it has no capacity to run all playbooks in the batch.
+
+    """
+    job_ids = [uuid4() for _ in runs]
+    calls = [run.task_calls(job_id) for job_id, run in zip(job_ids, runs, strict=True)]
+    admitted = get_admission_controller().admit_all(
+        [run.name for run, run_calls in zip(runs, calls, strict=True) for _ in run_calls]
+    )
+    releases = iter(admitted)
+    batch_id = uuid4() if callback else None
+    with start_span("dispatch playbook batch", **{"lso.batch_size": str(len(runs))}):
+        tasks = []
+        try:
+            if batch_id:
+                get_job_registry().create_batch(str(batch_id), str(callback), len(runs))
+            # Every job is registered before the first one is dispatched, so the batch can't finish before it is
+            # complete.
+            for job_id, run, run_calls in zip(job_ids, runs, calls, strict=True):
+                run_releases = [next(releases) for _ in run_calls]
+                if _register(job_id, run, len(run_calls), batch_id) is not None:
+                    for release in run_releases:
+                        release()
+                    continue
+                tasks.extend(
+                    (run, args, kwargs, release)
+                    for (args, kwargs), release in zip(run_calls, run_releases, strict=True)
+                )
+        except BaseException:
+            for release in admitted:
+                release()
+            raise
+
+        try:
+            _dispatch(tasks)
+        except BaseException:
+            # Release the slots of the tasks that were not handed to an executor, those that were release their own.
+            for *_, release in tasks:
+                release()
+            raise
+
+    return batch_id, job_ids
@@ -0,0 +1,187 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Delivery of playbook progress updates, in the background.
+
+Playbook events are put on a bounded queue by the `ansible-runner` event handler, and sent to the progress URL in
+batches by a separate thread. This way, a slow progress endpoint never holds up the playbook run itself.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import requests
+
+from lso.config import ProgressQueueFullPolicy, settings
+from lso.jobs import get_job_registry
+from lso.metrics import observe_http_post
+from lso.utils import get_http_session
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReporter:
+    """Send the output of playbook events to a progress URL, combining events into batches.
+
+    A batch is sent when it holds `PROGRESS_BATCH_MAX_EVENTS` events, or when its first event has waited for
+    `PROGRESS_BATCH_WINDOW_SEC` seconds, whichever comes first. When the queue holds `PROGRESS_QUEUE_MAX_SIZE` events,
+    `PROGRESS_QUEUE_FULL_POLICY` decides whether the oldest event is dropped, or the caller waits for room. If the
+    sender thread has stopped unexpectedly, the caller never waits, and the oldest event is dropped instead.
+
+    In sequenced mode, each update contains only the new output, together with the `sequence` number of its first
+    line. Output lines are numbered from 0 onwards, so the receiver can rebuild the whole history and detect any gaps.
+    The last `PROGRESS_BUFFER_MAX_LINES` lines are also stored in the job registry, from where missed lines can be
+    retrieved. Lines are numbered as soon as they are queued, and kept apart from the queue until the sender thread
+    stores them in batches, before it sends the next update. Events that are dropped from a full queue are therefore
+    only missing from the updates that are sent, never from the stored history. The lines that wait to be stored are
+    limited to `PROGRESS_BUFFER_MAX_LINES` as well, with the same `PROGRESS_QUEUE_FULL_POLICY`. Dropping the oldest of
+    them loses nothing, since the job registry would not keep them either.
+
+    Args:
+        progress (str): The progress URL where the external system expects to receive updates.
+        job_id (str): The job ID of the playbook run.
+        progress_is_incremental (bool): Whether each update contains only the new output, or the whole history of
+            output of the playbook run. Ignored in sequenced mode.
+        progress_is_sequenced (bool, optional): Whether updates are sent in sequenced mode.
+
+    """
+
+    def __init__(
+        self, progress: str, job_id: str, *, progress_is_incremental: bool, progress_is_sequenced: bool = False
+    ) -> None:
+        """Start the thread that sends progress updates."""
+        self._progress = progress
+        self._job_id = job_id
+        self._progress_is_incremental = progress_is_incremental
+        self._progress_is_sequenced = progress_is_sequenced
+        self._sequence = 0
+        self._queue: deque[tuple[int, list[str]]] = deque()
+        self._unstored: deque[str] = deque()
+        self._unstored_sequence = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._sender_stopped = False
+        self._history: list[str] = []
+        self.dropped = 0
+        self._sender = threading.Thread(target=self._send_batches, name="lso-progress", daemon=True)
+        self._sender.start()
+
+    def _must_wait(self) -> bool:
+        return settings.PROGRESS_QUEUE_FULL_POLICY == ProgressQueueFullPolicy.BLOCK and not self._sender_stopped
+
+    def put(self, lines: list[str]) -> None:
+        """Queue the output lines of a single playbook event."""
+        with self._condition:
+            sequence = self._sequence
+            self._sequence += len(lines)
+            if self._progress_is_sequenced:
+                self._buffer_unstored(lines)
+            while len(self._queue) >= settings.PROGRESS_QUEUE_MAX_SIZE:
+                if self._must_wait():
+                    self._condition.wait()
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append((sequence, lines))
+            self._condition.notify_all()
+
+    def _buffer_unstored(self, lines: list[str]) -> None:
+        """Keep lines until the sender thread stores them, must be called while holding the condition."""
+        while self._unstored and len(self._unstored) + len(lines) > settings.PROGRESS_BUFFER_MAX_LINES:
+            if self._must_wait():
+                self._condition.wait()
+            else:
+                self._unstored.popleft()
+                self._unstored_sequence += 1
+        self._unstored.extend(lines)
+        while len(self._unstored) > settings.PROGRESS_BUFFER_MAX_LINES:
+            self._unstored.popleft()
+            self._unstored_sequence += 1
+
+    def close(self) -> None:
+        """Send all queued events, and stop the sender thread. Calling this more than once has no effect."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._sender.join()
+
+    def _next_batch(self) -> list[tuple[int, list[str]]]:
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            deadline = time.monotonic() + settings.PROGRESS_BATCH_WINDOW_SEC
+            while len(self._queue) < settings.PROGRESS_BATCH_MAX_EVENTS and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), settings.PROGRESS_BATCH_MAX_EVENTS))]
+            self._condition.notify_all()
+            return batch
+
+    def _store_unstored(self) -> None:
+        with self._condition:
+            first_sequence = self._unstored_sequence
+            lines = list(self._unstored)
+            self._unstored.clear()
+            self._unstored_sequence += len(lines)
+            self._condition.notify_all()
+        if lines:
+            get_job_registry().append_progress(self._job_id, first_sequence, lines)
+
+    def _payloads(self, batch: list[tuple[int, list[str]]]) -> list[dict[str, Any]]:
+        lines = [line for _sequence, event_lines in batch for line in event_lines]
+        if not self._progress_is_sequenced:
+            if self._progress_is_incremental:
+                return [{"progress": lines}]
+            self._history.extend(lines)
+            return [{"progress": self._history}]
+
+        # Events that were dropped leave a gap in the sequence numbers, which the receiver must be able to detect.
+        payloads: list[dict[str, Any]] = []
+        for sequence, event_lines in batch:
+            if payloads and payloads[-1]["sequence"] + len(payloads[-1]["progress"]) == sequence:
+                payloads[-1]["progress"].extend(event_lines)
+            else:
+                payloads.append({"progress": list(event_lines), "sequence": sequence})
+        return payloads
+
+    def _send(self, payload: dict[str, Any]) -> None:
+        try:
+            with observe_http_post("progress"):
+                response = get_http_session().post(self._progress, json=payload, timeout=settings.REQUEST_TIMEOUT_SEC)
+                response.raise_for_status()
+        except requests.RequestException:
+            logger.warning("Failed to POST progress update to %s", self._progress, exc_info=True)
+
+    def _send_batches(self) -> None:
+        try:
+            while True:
+                batch = self._next_batch()
+                try:
+                    # Stored lines are available to the receiver before the update that may reveal a gap.
+                    self._store_unstored()
+                    for payload in self._payloads(batch) if batch else []:
+                        self._send(payload)
+                except Exception:
+                    logger.exception("Failed to send progress update of job_id=%s", self._job_id)
+                if not batch:
+                    break
+        finally:
+            # Never leave a caller waiting for room in the queue that the sender thread will not make anymore.
+            with self._condition:
+                self._sender_stopped = True
+                self._condition.notify_all()
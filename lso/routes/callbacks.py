@@ -0,0 +1,54 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""FastAPI routes for inspecting and replaying callbacks that could not be delivered from the callback outbox."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from lso.config import settings
+from lso.outbox import CallbackOutbox, get_callback_outbox
+from lso.schema import FailedCallback
+
+router = APIRouter()
+
+
+def _outbox() -> CallbackOutbox:
+    if not settings.CALLBACK_OUTBOX_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The callback outbox is not enabled.")
+    return get_callback_outbox()
+
+
+@router.get("/failed", response_model=list[FailedCallback])
+def list_failed_callbacks_endpoint() -> list[FailedCallback]:
+    """Return the callbacks that could not be delivered within `CALLBACK_RETRY_MAX_ATTEMPTS` attempts.
+
+    Raises:
+        HTTPException: Raises a 404 if the callback outbox is not enabled.
+
+    """
+    return _outbox().failed()
+
+
+@router.post("/replay")
+def replay_failed_callbacks_endpoint(callback_id: Annotated[list[int] | None, Query()] = None) -> dict[str, int]:
+    """Deliver failed callbacks again, all of them or only those given as `callback_id`.
+
+    Replayed callbacks get a fresh `CALLBACK_RETRY_MAX_ATTEMPTS` delivery attempts.
+
+    Raises:
+        HTTPException: Raises a 404 if the callback outbox is not enabled.
+
+    """
+    return {"replayed": _outbox().replay(callback_id)}
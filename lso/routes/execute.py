@@ -14,15 +14,29 @@
 """FastAPI route for running arbitrary executables."""
 
 import asyncio
+import json
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Annotated
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, HTTPException, status
-from pydantic import AfterValidator, BaseModel, HttpUrl
-
-from lso.execute import get_executable_path, run_executable_async, run_executable_sync
-from lso.schema import ExecutableRunResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import AfterValidator, BaseModel, Field, HttpUrl
+
+from lso.config import settings
+from lso.execute import (
+    ExecutableRun,
+    get_artifact_path,
+    get_executable_path,
+    run_executable_aio,
+    run_executable_async,
+    run_executable_batch,
+    stream_executable,
+)
+from lso.jobs import get_job_registry
+from lso.routing import MAX_PRIORITY
+from lso.schema import BatchRunResponse, ExecutableRunResponse
 
 router = APIRouter()
 
@@ -63,6 +77,10 @@ class ExecutableRunParams(BaseModel):
         args (list[str], optional): A list of arguments that is provided to the script.
         callback (HttpUrl, optional): A callback URL where the execution result of the script is posted to.
         is_async (bool, optional): Whether this script should be executed asynchronously.
+        stream (bool, optional): Whether the output of a synchronous execution is streamed back while the script runs,
+            as newline-delimited JSON. Ignored when `is_async` is set.
+        priority (int, optional): The priority of an asynchronous execution in its Celery queue, from 0 to 9. Runs
+            with a higher priority are picked up first. Ignored by the local executors.
 
     """
 
@@ -70,15 +88,113 @@ class ExecutableRunParams(BaseModel):
     args: list[str] = []
     callback: HttpUrl | None = None
     is_async: bool = True
+    stream: bool = False
+    priority: Annotated[int, Field(ge=0, le=MAX_PRIORITY)] | None = None
+
+
+class ExecutableBatchRunParams(BaseModel):
+    """Parameters for a single executable run in a batch, which is always run asynchronously.
+
+    Attributes:
+        executable_name (ExecutableName): The absolute path to the executable.
+        args (list[str], optional): A list of arguments that is provided to the script.
+        callback (HttpUrl, optional): A callback URL where the execution result of the script is posted to.
+        priority (int, optional): The priority of the run in its Celery queue, from 0 to 9.
+
+    """
+
+    executable_name: ExecutableName
+    args: list[str] = []
+    callback: HttpUrl | None = None
+    priority: Annotated[int, Field(ge=0, le=MAX_PRIORITY)] | None = None
+
+
+class ExecutableBatchParams(BaseModel):
+    """Request parameters for running a batch of executables.
+
+    Attributes:
+        runs (list[ExecutableBatchRunParams]): The executable runs in the batch, at most `MAX_BATCH_SIZE`.
+        callback (HttpUrl, optional): A callback URL that is called once all runs in the batch have finished. The
+            callback holds the state and return code of every run.
+
+    """
+
+    runs: Annotated[list[ExecutableBatchRunParams], Field(min_length=1, max_length=settings.MAX_BATCH_SIZE)]
+    callback: HttpUrl | None = None
+
+
+async def _ndjson(frames: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for frame in frames:
+        yield json.dumps(frame) + "\n"
 
 
-@router.post("/", response_model=ExecutableRunResponse, status_code=status.HTTP_201_CREATED)
-async def run_executable_endpoint(params: ExecutableRunParams) -> ExecutableRunResponse:
-    """Dispatch a task to run an arbitrary executable."""
+@router.post(
+    "/",
+    response_model=ExecutableRunResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"content": {"application/x-ndjson": {}}}},
+)
+async def run_executable_endpoint(params: ExecutableRunParams) -> ExecutableRunResponse | StreamingResponse:
+    """Dispatch a task to run an arbitrary executable.
+
+    When running synchronously with `stream` set, the response is a stream of newline-delimited JSON frames. Each
+    frame holds a chunk of output from either `stdout` or `stderr`, and the final frame holds the return code.
+    """
+    # The job registry is a SQLite database, of which writes can wait on a lock, so they are done in a worker thread.
     if params.is_async:
-        job_id = run_executable_async(params.executable_name, params.args, params.callback)
+        job_id = await asyncio.to_thread(
+            run_executable_async, params.executable_name, params.args, params.callback, params.priority
+        )
         return ExecutableRunResponse(job_id=job_id)
 
     job_id = uuid4()
-    result = await asyncio.to_thread(run_executable_sync, str(params.executable_name), params.args)
+    if params.stream:
+        frames = stream_executable(job_id, str(params.executable_name), params.args)
+        return StreamingResponse(
+            _ndjson(frames), status_code=status.HTTP_201_CREATED, media_type="application/x-ndjson"
+        )
+
+    registry = get_job_registry()
+    await asyncio.to_thread(registry.create, str(job_id), "executable", str(params.executable_name))
+    await asyncio.to_thread(registry.mark_running, str(job_id))
+    result = await run_executable_aio(str(params.executable_name), params.args, str(job_id))
+    await asyncio.to_thread(
+        registry.mark_finished,
+        str(job_id),
+        return_code=result.return_code,
+        output=result.output,
+        failed=result.return_code != 0,
+    )
     return ExecutableRunResponse(job_id=job_id, result=result)
+
+
+@router.post("/batch", response_model=BatchRunResponse, status_code=status.HTTP_201_CREATED)
+def run_executable_batch_endpoint(params: ExecutableBatchParams) -> BatchRunResponse:
+    """Dispatch a batch of executable runs at once.
+
+    The batch is accepted or rejected as a whole. Every run becomes a job of its own, of which the ID is returned in the
+    same order as the runs. If a callback is given, the response also holds a batch ID, which is reported to the
+    callback once all jobs have finished.
+    """
+    runs = [
+        ExecutableRun(executable_path=run.executable_name, args=run.args, callback=run.callback, priority=run.priority)
+        for run in params.runs
+    ]
+    batch_id, job_ids = run_executable_batch(runs, params.callback)
+
+    return BatchRunResponse(batch_id=batch_id, job_ids=job_ids)
+
+
+@router.get("/artifacts/{artifact_id}", response_class=FileResponse)
+def get_artifact_endpoint(artifact_id: UUID) -> FileResponse:
+    """Return the full output of an executable run, if it was too large to be returned in the result.
+
+    Raises:
+        HTTPException: Raises a 404 if the artifact does not exist, or has expired.
+
+    """
+    artifact_path = get_artifact_path(artifact_id)
+    if not artifact_path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact '{artifact_id}' does not exist.")
+
+    return FileResponse(artifact_path, media_type="text/plain")
@@ -0,0 +1,47 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""FastAPI route for managing the cache of Ansible facts."""
+
+from fastapi import APIRouter, status
+from pydantic import BaseModel
+
+from lso.config import ExecutorType, settings
+from lso.facts import invalidate_facts
+
+router = APIRouter()
+
+
+class FactsInvalidateParams(BaseModel):
+    """Parameters for invalidating cached facts.
+
+    Attributes:
+        hosts (list[str]): The hosts of which the cached facts are removed.
+
+    """
+
+    hosts: list[str]
+
+
+@router.post("/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+def invalidate_facts_endpoint(params: FactsInvalidateParams) -> None:
+    """Remove the cached facts of the given hosts, so they are gathered again by the next playbook run.
+
+    With the Celery executor, every worker has a fact cache of its own. The invalidation is then broadcast to all
+    workers that are online.
+    """
+    invalidate_facts(params.hosts)
+    if settings.EXECUTOR == ExecutorType.WORKER:
+        from lso.worker import INVALIDATE_FACTS, celery  # noqa: PLC0415
+
+        celery.control.broadcast(INVALIDATE_FACTS, arguments={"hosts": params.hosts})
@@ -0,0 +1,83 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""FastAPI routes for looking up the status of submitted jobs, and for cancelling them."""
+
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from lso.jobs import get_job_registry
+from lso.schema import JobInfo, ProgressUpdate
+from lso.tasks import cancel_job
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job_endpoint(job_id: UUID) -> JobInfo:
+    """Return the state and result of a playbook or executable run.
+
+    Raises:
+        HTTPException: Raises a 404 if the job is unknown, or has expired from the job registry.
+
+    """
+    job = get_job_registry().get(str(job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' does not exist.")
+
+    return job
+
+
+@router.delete("/{job_id}", response_model=JobInfo)
+def cancel_job_endpoint(job_id: UUID) -> JobInfo:
+    """Cancel a queued or running playbook or executable run, along with any jobs that were attached to it.
+
+    A queued job does not run at all, and a running job is killed. The callback of the job is sent straight away, with
+    status `cancelled`.
+
+    Raises:
+        HTTPException: Raises a 404 if the job is unknown, or has expired from the job registry, and a 409 if the job
+            has already finished.
+
+    """
+    registry = get_job_registry()
+    job = registry.get(str(job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' does not exist.")
+    if not cancel_job(str(job_id)):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job '{job_id}' has already finished.")
+
+    return registry.get(str(job_id)) or job
+
+
+@router.get("/{job_id}/progress", response_model=ProgressUpdate)
+def get_job_progress_endpoint(
+    job_id: UUID, since: Annotated[int, Query(ge=0)] = 0, limit: Annotated[int, Query(ge=1, le=10000)] = 1000
+) -> ProgressUpdate:
+    """Return stored progress output of a playbook run with sequenced progress updates, starting at `since`.
+
+    Only the last `PROGRESS_BUFFER_MAX_LINES` lines of progress are stored. If older lines are requested, the returned
+    `sequence` is that of the oldest line that is still available.
+
+    Raises:
+        HTTPException: Raises a 404 if the job is unknown, or has expired from the job registry.
+
+    """
+    registry = get_job_registry()
+    if registry.get(str(job_id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' does not exist.")
+
+    lines = registry.get_progress(str(job_id), since, limit)
+    return ProgressUpdate(sequence=lines[0][0] if lines else since, progress=[line for _, line in lines])
@@ -0,0 +1,27 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""FastAPI route for exposing metrics to Prometheus."""
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from lso.metrics import collect_metrics
+
+router = APIRouter()
+
+
+@router.get("", response_class=Response)
+def metrics_endpoint() -> Response:
+    """Return the metrics of LSO in the Prometheus exposition format."""
+    return Response(content=collect_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -13,29 +13,106 @@
 
 """The API endpoint from which Ansible playbooks can be executed."""
 
+import functools
+import hashlib
 import json
-import tempfile
+from collections.abc import Callable, MutableMapping
 from contextlib import redirect_stderr
 from io import StringIO
 from pathlib import Path
-from typing import Annotated, Any
+from typing import Annotated, Any, Self
 from uuid import UUID
 
-import ansible_runner
-from ansible.inventory.manager import InventoryManager
-from ansible.parsing.dataloader import DataLoader
 from fastapi import APIRouter, HTTPException, status
-from pydantic import AfterValidator, BaseModel, HttpUrl
+from pydantic import AfterValidator, BaseModel, Field, HttpUrl, model_validator
 
-from lso.playbook import get_playbook_path, run_playbook
+from lso.catalogue import get_playbook_catalogue
+from lso.config import settings
+from lso.metrics import INVENTORY_VALIDATION_DURATION
+from lso.playbook import PlaybookRun, get_playbook_path, run_playbook, run_playbook_batch
+from lso.routing import MAX_PRIORITY
+from lso.schema import BatchRunResponse, PlaybookInfo
+from lso.tracing import start_span
+from lso.utils import TTLCache
 
 router = APIRouter()
 
 
+@functools.cache
+def _in_memory_inventory_loader() -> type:
+    """Create the Ansible `DataLoader` that serves an inventory from memory, instead of reading it from a file.
+
+    The class is created on first use, since importing Ansible takes longer than the rest of the API together.
+    """
+    from ansible.parsing.dataloader import DataLoader  # noqa: PLC0415
+
+    class InMemoryInventoryLoader(DataLoader):  # type: ignore[misc]
+        def __init__(self, inventory_json: str) -> None:
+            super().__init__()
+            self._inventory_json = inventory_json
+
+        def load_from_file(self, *_args: Any, **_kwargs: Any) -> Any:
+            # The YAML inventory plugin modifies the data it parses, so it is given a fresh copy every time.
+            return json.loads(self._inventory_json)
+
+        def _get_file_contents(self, _file_name: str) -> tuple[bytes, bool]:
+            return json.loads(self._inventory_json).encode(), False
+
+    return InMemoryInventoryLoader
+
+
+class _InventoryWarnings:
+    """Stand-in for Ansible's `Display` that collects the warnings of an inventory plugin.
+
+    Unlike `Display`, warnings are not deduplicated across the lifetime of the process, so an inventory that is
+    submitted twice is reported as invalid twice.
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    def warning(self, msg: str, *_args: Any, **_kwargs: Any) -> None:
+        self.messages.append(f"[WARNING]: {msg}\n")
+
+    def __getattr__(self, _name: str) -> Callable[..., None]:
+        return lambda *_args, **_kwargs: None
+
+
+_inventory_cache: TTLCache[str, list[str]] = TTLCache(
+    settings.INVENTORY_CACHE_MAX_ENTRIES, settings.INVENTORY_CACHE_TTL_SEC
+)
+
+
+def _parse_inventory(inventory: dict[str, Any] | str, inventory_json: str) -> list[str]:
+    """Parse an inventory in memory, and return the warnings and errors that Ansible reports for it.
+
+    Dictionaries are parsed by the YAML inventory plugin, strings by the INI inventory plugin. This matches how
+    `ansible-runner` writes out the inventory before running a playbook.
+    """
+    from ansible.errors import AnsibleError  # noqa: PLC0415
+    from ansible.inventory.data import InventoryData  # noqa: PLC0415
+    from ansible.plugins.loader import inventory_loader  # noqa: PLC0415
+
+    plugin_name = "ini" if isinstance(inventory, str) else "yaml"
+    plugin = inventory_loader.get(plugin_name)
+    warnings = _InventoryWarnings()
+    plugin.display = warnings
+    output = StringIO()
+    with redirect_stderr(output):
+        try:
+            plugin.parse(InventoryData(), _in_memory_inventory_loader()(inventory_json), "/inventory", cache=False)
+        except AnsibleError as e:
+            warnings.warning(f"Failed to parse inventory with '{plugin_name}' plugin: {e}")
+
+    output.seek(0)
+    return warnings.messages + output.readlines()
+
+
 def _inventory_validator(inventory: dict[str, Any] | str) -> dict[str, Any] | str:
     """Validate the provided inventory format.
 
-    Attempts to parse the inventory to verify its validity.
+    Attempts to parse the inventory to verify its validity. The outcome is cached by a hash of the inventory, so an
+    inventory that is submitted again is not parsed a second time.
 
     Args:
         inventory (dict[str, Any] | str): The inventory to validate, can be a dictionary or a string.
@@ -48,21 +125,25 @@ def _inventory_validator(inventory: dict[str, Any] | str) -> dict[str, Any] | st
         format is incorrect.
 
     """
-    if not ansible_runner.utils.isinventory(inventory):
+    with start_span("validate inventory"), INVENTORY_VALIDATION_DURATION.time():
+        return _validate_inventory(inventory)
+
+
+def _validate_inventory(inventory: dict[str, Any] | str) -> dict[str, Any] | str:
+    if not isinstance(inventory, MutableMapping | str):
         detail = "Invalid inventory provided. Should be a string, or JSON object."
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=detail)
+    if inventory == {}:
+        # An empty inventory is valid, but the YAML inventory plugin reports it as an empty file.
+        return inventory
 
-    loader = DataLoader()
-    output = StringIO()
-    with tempfile.NamedTemporaryFile(mode="w+") as temp_inv, redirect_stderr(output):
-        json.dump(inventory, temp_inv, ensure_ascii=False)
-        temp_inv.flush()
-
-        inventory_manager = InventoryManager(loader=loader, sources=[temp_inv.name], parse=True)
-        inventory_manager.parse_source(temp_inv.name)
+    inventory_json = json.dumps(inventory, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    inventory_hash = hashlib.sha256(inventory_json.encode()).hexdigest()
+    error_messages = _inventory_cache.get(inventory_hash)
+    if error_messages is None:
+        error_messages = _parse_inventory(inventory, inventory_json)
+        _inventory_cache.set(inventory_hash, error_messages)
 
-    output.seek(0)
-    error_messages = output.readlines()
     if error_messages:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=error_messages)
 
@@ -72,6 +153,8 @@ def _inventory_validator(inventory: dict[str, Any] | str) -> dict[str, Any] | st
 def _playbook_path_validator(playbook_name: Path) -> Path:
     """Validate the provided path to an Ansible playbook.
 
+    The playbook is looked up in the playbook catalogue, rather than on disk.
+
     Returns:
         A `Path` object, if the path is valid.
 
@@ -80,7 +163,12 @@ def _playbook_path_validator(playbook_name: Path) -> Path:
 
     """
     playbook_path = get_playbook_path(playbook_name)
-    if not Path.exists(playbook_path):
+    catalogue = get_playbook_catalogue()
+    try:
+        relative_name = playbook_path.relative_to(catalogue.root)
+    except ValueError:
+        relative_name = None
+    if relative_name is None or catalogue.get(relative_name) is None:
         msg = f"Filename '{playbook_path}' does not exist."
         raise HTTPException(status_code=status.HTTP_410_GONE, detail=msg)
 
@@ -111,6 +199,8 @@ class PlaybookRunParams(BaseModel):
         callback (HttpUrl, optional): The address where LSO should call back to upon completion.
         progress (HttpUrl, optional): The address where LSO should send progress updates as the playbook executes.
         progress_is_incremental (bool, optional): Whether progress updates should be incremental or not.
+        progress_is_sequenced (bool, optional): Whether progress updates should be incremental, and numbered with a
+            sequence number. Takes precedence over `progress_is_incremental`.
         inventory (PlaybookInventory): The inventory to run the playbook against. This inventory can also include any
             host vars, if needed. When including host vars, it should be a dictionary. Can be a simple string containing
             host names when no host vars are needed. In the latter case, multiple hosts should be separated with a `\n`
@@ -119,6 +209,15 @@ class PlaybookRunParams(BaseModel):
             This includes any required configuration objects from the workflow orchestrator, commit comments, whether
             this execution should be a dry run, a trouble ticket number, etc. Which extra vars are required solely
             depends on what inputs the playbook requires.
+        shards (int, optional): Split the hosts of the inventory into this many shards, at most `MAX_PLAYBOOK_SHARDS`.
+            Each shard is run as a separate task, and the results of all shards are merged into a single callback.
+            Can't be combined with `progress_is_sequenced`.
+        refresh_facts (bool, optional): Whether facts are gathered from all hosts, even if they are in the fact cache.
+        priority (int, optional): The priority of the run in its Celery queue, from 0 to 9. Runs with a higher priority
+            are picked up first. Ignored by the local executors.
+        deadline_sec (int, optional): The wall-clock time that the playbook run may take, in seconds, at most
+            `ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC`. A run that takes longer is killed, and reported with status `timeout`.
+            For a sharded run, every shard may take this long.
 
     !!! danger "Inventory format"
         Note the fact if the collection of all hosts is a dictionary, and not a list of strings, Ansible expects each
@@ -160,8 +259,33 @@ class PlaybookRunParams(BaseModel):
     callback: HttpUrl | None = None
     progress: HttpUrl | None = None
     progress_is_incremental: bool = True
+    progress_is_sequenced: bool = False
     inventory: PlaybookInventory
     extra_vars: dict[str, Any] = {}
+    shards: Annotated[int, Field(ge=1, le=settings.MAX_PLAYBOOK_SHARDS)] | None = None
+    refresh_facts: bool = False
+    priority: Annotated[int, Field(ge=0, le=MAX_PRIORITY)] | None = None
+    deadline_sec: Annotated[int, Field(ge=1)] | None = None
+
+    @model_validator(mode="after")
+    def check_deadline(self) -> Self:
+        """Check that the deadline does not exceed the maximum deadline of a playbook run."""
+        max_deadline_sec = settings.ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC
+        if self.deadline_sec and max_deadline_sec is not None and self.deadline_sec > max_deadline_sec:
+            msg = f"The deadline can't exceed {max_deadline_sec} seconds."
+            raise ValueError(msg)
+        return self
+
+    @model_validator(mode="after")
+    def check_sharded_progress(self) -> Self:
+        """Check that sequenced progress updates are not requested for a sharded run.
+
+        Every shard reports its own progress, so the updates of a sharded run can't be numbered in one sequence.
+        """
+        if self.shards and self.shards > 1 and self.progress_is_sequenced:
+            msg = "Sequenced progress updates can't be combined with sharding."
+            raise ValueError(msg)
+        return self
 
 
 @router.post("/", response_model=PlaybookRunResponse, status_code=status.HTTP_201_CREATED)
@@ -184,6 +308,86 @@ def run_playbook_endpoint(params: PlaybookRunParams) -> PlaybookRunResponse:
         callback=params.callback,
         progress=params.progress,
         progress_is_incremental=params.progress_is_incremental,
+        progress_is_sequenced=params.progress_is_sequenced,
+        shards=params.shards,
+        refresh_facts=params.refresh_facts,
+        priority=params.priority,
+        deadline_sec=params.deadline_sec,
     )
 
     return PlaybookRunResponse(job_id=job_id)
+
+
+class PlaybookBatchRunParams(PlaybookRunParams):
+    """Parameters for a single playbook run in a batch.
+
+    The same as `PlaybookRunParams`, except that the inventory may be left out, to use the shared inventory of the batch
+    instead.
+    """
+
+    inventory: PlaybookInventory | None = None  # type: ignore[assignment]
+
+
+class PlaybookBatchParams(BaseModel):
+    """Parameters for executing a batch of Ansible playbooks.
+
+    Attributes:
+        runs (list[PlaybookBatchRunParams]): The playbook runs in the batch, at most `MAX_BATCH_SIZE`.
+        inventory (PlaybookInventory, optional): An inventory that is shared by all runs that do not have an inventory
+            of their own. It is sent and validated only once for the whole batch.
+        callback (HttpUrl, optional): The address where LSO should call back to once all runs in the batch have
+            finished. The callback holds the state and return code of every run.
+
+    """
+
+    runs: Annotated[list[PlaybookBatchRunParams], Field(min_length=1, max_length=settings.MAX_BATCH_SIZE)]
+    inventory: PlaybookInventory | None = None
+    callback: HttpUrl | None = None
+
+    @model_validator(mode="after")
+    def check_inventories(self) -> Self:
+        """Check that every run has an inventory, either its own or the shared one."""
+        if self.inventory is None and any(run.inventory is None for run in self.runs):
+            msg = "Every run needs an inventory, when no shared inventory is given."
+            raise ValueError(msg)
+        return self
+
+
+@router.post("/batch", response_model=BatchRunResponse, status_code=status.HTTP_201_CREATED)
+def run_playbook_batch_endpoint(params: PlaybookBatchParams) -> BatchRunResponse:
+    """Launch a batch of Ansible playbooks at once.
+
+    The batch is accepted or rejected as a whole. Every run becomes a job of its own, of which the ID is returned in the
+    same order as the runs. If a callback is given, the response also holds a batch ID, which is reported to the
+    callback once all jobs have finished.
+    """
+    runs = [
+        PlaybookRun(
+            playbook_path=run.playbook_name,
+            extra_vars=run.extra_vars,
+            inventory=run.inventory if run.inventory is not None else params.inventory,
+            callback=run.callback,
+            progress=run.progress,
+            progress_is_incremental=run.progress_is_incremental,
+            progress_is_sequenced=run.progress_is_sequenced,
+            shards=run.shards,
+            refresh_facts=run.refresh_facts,
+            priority=run.priority,
+            deadline_sec=run.deadline_sec,
+        )
+        for run in params.runs
+    ]
+    batch_id, job_ids = run_playbook_batch(runs, params.callback)
+
+    return BatchRunResponse(batch_id=batch_id, job_ids=job_ids)
+
+
+@router.get("/", response_model=list[PlaybookInfo])
+def list_playbooks_endpoint() -> list[PlaybookInfo]:
+    """List all playbooks that are available in `ANSIBLE_PLAYBOOKS_ROOT_DIR`.
+
+    Returns:
+        The name, size, modification time, and content hash of each playbook.
+
+    """
+    return get_playbook_catalogue().entries()
@@ -0,0 +1,50 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing of jobs to Celery queues, and their priority within a queue.
+
+`CELERY_QUEUE_ROUTES` maps patterns of playbook and executable names to queues, so that e.g. short, latency-sensitive
+playbooks are run by dedicated workers, instead of waiting behind long-running ones. Jobs that match none of the
+patterns are sent to `WORKER_QUEUE_NAME`, or the default queue of Celery.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Any
+
+from lso.config import settings
+
+#: Highest priority that a job can be given. Priorities range from 0, the lowest, to this.
+MAX_PRIORITY = 9
+
+
+def get_queue(name: str) -> str | None:
+    """Return the queue of the first routing rule that matches the name of a playbook or executable, if any."""
+    for pattern, queue in settings.CELERY_QUEUE_ROUTES.items():
+        if fnmatchcase(name, pattern):
+            return queue
+    return None
+
+
+def task_options(name: str, priority: int | None = None) -> dict[str, Any]:
+    """Return the Celery options that a job for the given playbook or executable is sent with.
+
+    Redis treats the lowest priority number as the most urgent, unlike AMQP brokers, so priorities are reversed for it.
+    Either way, a job with a higher `priority` is picked up first.
+    """
+    options: dict[str, Any] = {}
+    if (queue := get_queue(name)) is not None:
+        options["queue"] = queue
+    if priority is not None:
+        is_redis = settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://", "redis+socket://"))
+        options["priority"] = MAX_PRIORITY - priority if is_redis else priority
+    return options
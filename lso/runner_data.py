@@ -0,0 +1,150 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Private data directories of `ansible-runner`, that are managed by LSO.
+
+Every playbook run gets its own private data directory, named after its job ID, in which `ansible-runner` writes the
+inventory, environment, and artifacts of the run. Old directories are removed based on their age, their amount, and
+their combined size, so they don't fill up the disk of a busy worker. The directories of jobs that are still queued or
+running are never removed.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from lso.config import settings
+from lso.jobs import get_job_registry
+
+logger = logging.getLogger(__name__)
+
+#: The tmpfs that private data directories are placed on when `ANSIBLE_RUNNER_DATA_TMPFS` is set.
+_TMPFS_DIR = Path("/dev/shm")  # noqa: S108
+#: Minimum interval between two prunes of the private data directories, in seconds.
+_PRUNE_INTERVAL_SEC = 60
+
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+#: The job IDs of the private data directories that are in use by playbook runs in this process.
+_active_job_ids: Counter[str] = Counter()
+_active_lock = threading.Lock()
+
+
+def get_runner_data_root() -> Path:
+    """Return the directory that holds the private data directories of all playbook runs.
+
+    Falls back to `ANSIBLE_RUNNER_DATA_DIR` if tmpfs placement is requested, but there is no tmpfs at `/dev/shm`.
+    """
+    if settings.ANSIBLE_RUNNER_DATA_TMPFS:
+        if _TMPFS_DIR.is_dir():
+            return _TMPFS_DIR / "lso-runner"
+        logger.warning("No tmpfs found at %s, using %s instead", _TMPFS_DIR, settings.ANSIBLE_RUNNER_DATA_DIR)
+
+    return Path(settings.ANSIBLE_RUNNER_DATA_DIR)
+
+
+def get_private_data_dir(job_id: str, shard: int | None = None) -> Path:
+    """Create and return the private data directory of a playbook run.
+
+    Every shard of a sharded run gets a directory of its own, inside the directory of the job.
+    """
+    private_data_dir = get_runner_data_root() / job_id
+    if shard is not None:
+        private_data_dir /= f"shard-{shard}"
+    private_data_dir.mkdir(parents=True, exist_ok=True)
+    return private_data_dir
+
+
+@contextmanager
+def keep_private_data_dir(job_id: str) -> Iterator[None]:
+    """Keep the private data directory of a job from being pruned by this process, while the context is active."""
+    with _active_lock:
+        _active_job_ids[job_id] += 1
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active_job_ids[job_id] -= 1
+            if not _active_job_ids[job_id]:
+                del _active_job_ids[job_id]
+
+
+def _dir_size(path: Path) -> int:
+    size = 0
+    for dir_path, _dir_names, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                size += (Path(dir_path) / file_name).lstat().st_size
+            except FileNotFoundError:
+                continue
+    return size
+
+
+def prune_private_data_dirs(*, force: bool = False) -> None:
+    """Remove the oldest private data directories, until all limits are met.
+
+    Directories older than `ANSIBLE_RUNNER_DATA_RETENTION_SEC` are always removed. After that, the oldest directories
+    are removed until at most `ANSIBLE_RUNNER_DATA_MAX_COUNT` directories, of at most `ANSIBLE_RUNNER_DATA_MAX_BYTES`
+    combined, are left. Since this walks all directories, it is done at most once a minute per process, unless forced.
+
+    The directories of jobs that are queued or running according to the job registry, or that are kept by
+    `keep_private_data_dir` in this process, are skipped. They still count towards the limits.
+    """
+    global _last_prune  # noqa: PLW0603
+    now = time.time()
+    with _prune_lock:
+        if not force and now - _last_prune < _PRUNE_INTERVAL_SEC:
+            return
+        _last_prune = now
+
+    root = get_runner_data_root()
+    if not root.is_dir():
+        return
+
+    directories = []
+    for entry in root.iterdir():
+        try:
+            directories.append((entry.stat().st_mtime, entry))
+        except FileNotFoundError:
+            continue
+    directories.sort()
+    try:
+        in_use = get_job_registry().in_progress([entry.name for _mtime, entry in directories])
+    except sqlite3.Error:
+        logger.exception("Not pruning private data directories, the jobs that are in progress could not be looked up")
+        return
+    with _active_lock:
+        in_use.update(_active_job_ids)
+
+    sizes = {entry: _dir_size(entry) for _mtime, entry in directories}
+    total_size = sum(sizes.values())
+    remaining = len(directories)
+    for mtime, entry in directories:
+        expired = mtime < now - settings.ANSIBLE_RUNNER_DATA_RETENTION_SEC
+        over_limit = (
+            remaining > settings.ANSIBLE_RUNNER_DATA_MAX_COUNT or total_size > settings.ANSIBLE_RUNNER_DATA_MAX_BYTES
+        )
+        if not expired and not over_limit:
+            break
+        if entry.name in in_use:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        remaining -= 1
+        total_size -= sizes[entry]
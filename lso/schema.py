@@ -13,7 +13,9 @@
 
 """Module for defining the schema for running arbitrary executables."""
 
+from datetime import datetime
 from enum import StrEnum
+from typing import Any
 from uuid import UUID
 
 from pydantic import BaseModel, model_validator
@@ -24,6 +26,17 @@ class JobStatus(StrEnum):
 
     SUCCESSFUL = "successful"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobState(StrEnum):
+    """Enumeration of the lifecycle states of a job tracked in the job registry."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class ExecutionResult(BaseModel):
@@ -32,19 +45,22 @@ class ExecutionResult(BaseModel):
     Attributes:
         output (str): Captured executable output from `stdout`.
         return_code (int): Return code of the executable.
-        status (JobStatus): `SUCCESSFUL` if return code is 0, `FAILED` otherwise.
+        status (JobStatus): `SUCCESSFUL` if return code is 0, `FAILED` otherwise, unless the run was `CANCELLED`.
+        artifact_id (UUID, optional): If the output exceeded `EXECUTABLE_OUTPUT_MAX_BYTES`, `output` only holds its head
+            and tail. The full output can then be retrieved at `/api/execute/artifacts/{artifact_id}`.
 
     """
 
     output: str
     return_code: int
     status: JobStatus | None = None
+    artifact_id: UUID | None = None
 
     @model_validator(mode="before")
     def populate_status(cls, values: dict) -> dict:
         """Set the status based on the return code."""
         rc = values.get("return_code")
-        if rc is not None:
+        if rc is not None and values.get("status") != JobStatus.CANCELLED:
             values["status"] = JobStatus.SUCCESSFUL if rc == 0 else JobStatus.FAILED
 
         return values
@@ -62,3 +78,97 @@ class ExecutableRunResponse(BaseModel):
 
     job_id: UUID
     result: ExecutionResult | None = None
+
+
+class JobInfo(BaseModel):
+    """Status of a job, as recorded in the job registry.
+
+    Attributes:
+        job_id (UUID): Unique identifier of the job.
+        kind (str): Type of the job, either `playbook` or `executable`.
+        name (str): Path to the playbook or executable that is run by this job.
+        state (JobState): Current state of the job.
+        created_at (datetime): Moment the job was submitted.
+        started_at (datetime, optional): Moment the job started running, `None` while it is queued.
+        finished_at (datetime, optional): Moment the job finished, `None` while it is queued or running.
+        return_code (int, optional): Return code of the job, once it has finished.
+        output (str, optional): The tail end of the job output, bounded by `JOB_OUTPUT_SUMMARY_MAX_CHARS`.
+        attached_to (UUID, optional): If this job was a duplicate of a job that was already in progress, the ID of that
+            job. The result of that job is shared with this one.
+        batch_id (UUID, optional): If this job was submitted as part of a batch with a callback, the ID of that batch.
+
+    """
+
+    job_id: UUID
+    kind: str
+    name: str
+    state: JobState
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    return_code: int | None = None
+    output: str | None = None
+    attached_to: UUID | None = None
+    batch_id: UUID | None = None
+
+
+class BatchRunResponse(BaseModel):
+    """Response for submitting a batch of playbook or executable runs.
+
+    Attributes:
+        batch_id (UUID, optional): Unique identifier of the batch, if a callback was given to report its completion.
+        job_ids (list[UUID]): The job IDs of the runs in the batch, in the order in which they were submitted.
+
+    """
+
+    batch_id: UUID | None = None
+    job_ids: list[UUID]
+
+
+class PlaybookInfo(BaseModel):
+    """Entry in the catalogue of available playbooks.
+
+    Attributes:
+        name (str): Path to the playbook, relative to `ANSIBLE_PLAYBOOKS_ROOT_DIR`.
+        size (int): Size of the playbook, in bytes.
+        modified_at (datetime): Moment the playbook was last modified.
+        sha256 (str): SHA-256 hash of the contents of the playbook.
+
+    """
+
+    name: str
+    size: int
+    modified_at: datetime
+    sha256: str
+
+
+class ProgressUpdate(BaseModel):
+    """A range of sequenced progress output of a playbook run.
+
+    Attributes:
+        sequence (int): Sequence number of the first line in `progress`.
+        progress (list[str]): Consecutive lines of progress output.
+
+    """
+
+    sequence: int
+    progress: list[str]
+
+
+class FailedCallback(BaseModel):
+    """A callback in the outbox that could not be delivered within `CALLBACK_RETRY_MAX_ATTEMPTS` attempts.
+
+    Attributes:
+        callback_id (int): Identifier of the callback in the outbox.
+        url (str): The callback URL.
+        payload (dict[str, Any]): The result that was to be delivered.
+        attempts (int): The amount of delivery attempts that were made.
+        failed_at (datetime): Moment the last delivery attempt failed.
+
+    """
+
+    callback_id: int
+    url: str
+    payload: dict[str, Any]
+    attempts: int
+    failed_at: datetime
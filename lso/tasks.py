@@ -17,60 +17,290 @@ The primary task, `run_playbook_proc_task`, runs an Ansible playbook and sends a
 the results to a specified callback URL.
 """
 
+import functools
+import importlib
 import logging
+import threading
 from collections.abc import Callable
-from typing import Any
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 import requests
-from ansible_runner import Runner, run
 from fastapi import HTTPException
 from requests.exceptions import HTTPError
 
+from lso.cancellation import (
+    WatchedRun,
+    cancel_local_job,
+    get_cancellation_watcher,
+    job_envvars,
+    kill_job_processes,
+)
 from lso.config import settings
-from lso.schema import ExecutableRunResponse
-from lso.worker import RUN_EXECUTABLE, RUN_PLAYBOOK, celery
+from lso.facts import fact_cache_envvars
+from lso.jobs import get_job_registry
+from lso.metrics import observe_http_post
+from lso.outbox import get_callback_outbox
+from lso.progress import ProgressReporter
+from lso.runner_data import get_private_data_dir, keep_private_data_dir, prune_private_data_dirs
+from lso.schema import ExecutableRunResponse, ExecutionResult, JobState, JobStatus
+from lso.tracing import add_event, inject_headers, start_span
+from lso.utils import get_http_session
+from lso.warm_worker import WarmPlaybookResult, kill_warm_run, run_playbook_warm, warm_worker_eligible
+
+if TYPE_CHECKING:
+    from ansible_runner import Runner
+    from celery import Task
+    from celery.canvas import Signature
+    from celery.result import AsyncResult
 
 logger = logging.getLogger(__name__)
 
+#: Output that is stored and reported for a job that was cancelled.
+_CANCELLED_OUTPUT = "Job was cancelled."
+#: Output that is added to the output of a playbook run that was killed because it passed its deadline.
+_TIMED_OUT_OUTPUT = "Playbook run was killed, because it passed its deadline."
+
+
+def _playbook_deadline_sec(deadline_sec: int | None) -> int | None:
+    """Return the wall-clock time that a playbook run may take, capped by `ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC`."""
+    return min(
+        (limit for limit in (deadline_sec, settings.ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC) if limit is not None),
+        default=None,
+    )
+
 
 class CallbackFailedError(HTTPException):
     """Exception raised when a callback URL can't be reached."""
 
 
-def playbook_event_handler_factory(
-    progress: str | None, *, progress_is_incremental: bool
-) -> Callable[[dict], bool] | None:
+def _send_callback(callback: str, payload: dict[str, Any]) -> None:
+    """Send a callback with the result of a job.
+
+    When `CALLBACK_OUTBOX_ENABLED` is set, the callback is stored in the durable outbox, and delivered in the
+    background with retries. Otherwise, it is POSTed straight away.
+
+    Raises:
+        CallbackFailedError: If the callback was POSTed, and the external system responded with an error.
+
+    """
+    if settings.CALLBACK_OUTBOX_ENABLED:
+        get_callback_outbox().enqueue(callback, payload)
+        return
+
+    with start_span("send callback", **{"url.full": callback}), observe_http_post("callback"):
+        response = get_http_session().post(
+            callback, json=payload, headers=inject_headers({}), timeout=settings.REQUEST_TIMEOUT_SEC
+        )
+        try:
+            response.raise_for_status()
+        except HTTPError as e:
+            raise CallbackFailedError(
+                status_code=e.response.status_code, detail=f"{e.response.reason} for url: {e.request.url}"
+            ) from e
+
+
+def _report_finished_batches(job_ids: list[str]) -> None:
+    """Report every batch that has finished along with the given jobs to its callback."""
+    for batch_id, callback, jobs in get_job_registry().finish_batches(job_ids):
+        if not callback:
+            continue
+        payload = {
+            "batch_id": batch_id,
+            "status": "successful" if all(job.state == JobState.FINISHED for job in jobs) else "failed",
+            "jobs": [{"job_id": str(job.job_id), "state": job.state, "return_code": job.return_code} for job in jobs],
+        }
+        try:
+            _send_callback(callback, payload)
+        except (requests.RequestException, CallbackFailedError):
+            logger.exception("Failed to POST batch callback to %s for batch_id=%s", callback, batch_id)
+
+
+def _mark_finished(job_id: str, *, return_code: int, output: str, failed: bool) -> list[tuple[str, str | None]] | None:
+    """Store the result of a finished job, and report every batch that has finished along with it.
+
+    Returns:
+        The job ID and callback URL of every job that was attached to this job. `None` if the job has been cancelled,
+        in which case it has already been reported as such, and its result must not be sent.
+
+    """
+    attached_jobs = get_job_registry().mark_finished(job_id, return_code=return_code, output=output, failed=failed)
+    if attached_jobs is None:
+        logger.info("Not reporting the result of cancelled job_id=%s", job_id)
+        return None
+
+    _report_finished_batches([job_id, *(attached for attached, _ in attached_jobs)])
+    return attached_jobs
+
+
+def cancel_job(job_id: str) -> bool:
+    """Cancel a queued or running job, along with any jobs attached to it, and report them as `cancelled`.
+
+    A queued job is taken out of the queue of the local executor, or skipped once a Celery worker picks it up. A running
+    job is killed by the process that runs it, within `JOB_CANCEL_POLL_INTERVAL_SEC`. The callback of every cancelled
+    job is sent straight away, in the shape of a failed result with status `cancelled`. Any errors while delivering them
+    are logged and swallowed.
+
+    Returns:
+        `True` if the job was cancelled, `False` if it is unknown or has already finished.
+
+    """
+    cancelled_jobs = get_job_registry().cancel(job_id, _CANCELLED_OUTPUT)
+    if not cancelled_jobs:
+        return False
+
+    cancel_local_job(job_id)
+    for cancelled_job_id, kind, callback in cancelled_jobs:
+        if not callback:
+            continue
+        payload: dict[str, Any]
+        if kind == "playbook":
+            payload = {
+                "status": JobStatus.CANCELLED,
+                "job_id": cancelled_job_id,
+                "output": [_CANCELLED_OUTPUT],
+                "return_code": -1,
+            }
+        else:
+            payload = ExecutableRunResponse(
+                job_id=UUID(cancelled_job_id),
+                result=ExecutionResult(output=_CANCELLED_OUTPUT, return_code=-1, status=JobStatus.CANCELLED),
+            ).model_dump(mode="json")
+        try:
+            _send_callback(callback, payload)
+        except (requests.RequestException, CallbackFailedError):
+            logger.exception("Failed to POST cancelled callback to %s for job_id=%s", callback, cancelled_job_id)
+
+    _report_finished_batches([cancelled_job_id for cancelled_job_id, _kind, _callback in cancelled_jobs])
+    return True
+
+
+def playbook_event_handler_factory(progress_reporter: ProgressReporter | None) -> Callable[[dict], bool] | None:
     """Handle Ansible playbook run events.
 
     This is used to send incremental progress updates to the external system that called for this playbook to be run.
+    The output of each event is handed to the progress reporter, which sends it in the background, so the playbook run
+    never waits for the external system. When tracing is enabled, each event is also recorded on the span of the run.
 
     Args:
-        progress (str, optional): The progress URL where the external system expects to receive updates.
-        progress_is_incremental (bool): Whether progress updates are sent incrementally, or contain the whole history
-            of event data.
+        progress_reporter (ProgressReporter, optional): The reporter that sends progress updates to the external
+            system, if a progress URL was given.
 
     """
-    events_stdout = []
+    if not progress_reporter and not settings.TRACING_ENABLED:
+        return None
 
     def _playbook_event_handler(event: dict) -> bool:
-        event_data = event["stdout"].strip()
-        if not event_data:
-            return False
+        event_data = event.get("event_data", {})
+        add_event(event.get("event", "unknown"), task=event_data.get("task", ""), host=event_data.get("host", ""))
+        if not progress_reporter:
+            return True
 
-        event_data_lines = event_data.split("\r\n")
-        if progress_is_incremental:
-            emit_body = event_data_lines
-        else:
-            events_stdout.extend(event_data_lines)
-            emit_body = events_stdout
+        event_output = event["stdout"].strip()
+        if not event_output:
+            return False
 
-        requests.post(str(progress), json={"progress": emit_body}, timeout=settings.REQUEST_TIMEOUT_SEC)
+        progress_reporter.put(event_output.split("\r\n"))
         return True
 
-    if progress:
-        return _playbook_event_handler
-    return None
+    return _playbook_event_handler
+
+
+def _report_playbook_result(
+    job_id: str,
+    callback: str | None,
+    *,
+    status: str,
+    return_code: int,
+    output: list[str],
+    stats: dict[str, Any] | None = None,
+) -> None:
+    """Store the result of a finished playbook run, and send it to the callbacks of the job and its attached jobs.
+
+    Raises:
+        CallbackFailedError: If the callback of the job itself has failed.
+
+    """
+    attached_jobs = _mark_finished(
+        job_id, return_code=return_code, output="\n".join(output), failed=status != "successful"
+    )
+    if attached_jobs is None:
+        return
+    payload: dict[str, Any] = {"status": status, "job_id": job_id, "output": output, "return_code": return_code}
+    if stats is not None:
+        payload["stats"] = stats
+    # Jobs that were attached to this one as duplicates share its result, each under their own job ID.
+    for attached_job_id, attached_callback in attached_jobs:
+        if not attached_callback:
+            continue
+        try:
+            _send_callback(attached_callback, {**payload, "job_id": attached_job_id})
+        except (requests.RequestException, CallbackFailedError):
+            logger.exception("Failed to POST callback to %s for job_id=%s", attached_callback, attached_job_id)
+
+    if not callback:
+        return
+
+    _send_callback(callback, payload)
+
+
+def _finish_shard(
+    job_id: str, shard: int, *, status: str, return_code: int, output: list[str], stats: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Store the result of a shard of a playbook run, and merge the results of all shards once the last one finished.
+
+    The merged run is successful only if every shard was. Its return code is that of the first shard that failed, its
+    output is the output of all shards in order, and its stats hold the stats of the hosts of all shards.
+
+    Returns:
+        The merged result as keyword arguments of `_report_playbook_result`, or `None` while shards are running.
+
+    """
+    results = get_job_registry().finish_shard(
+        job_id, shard, status=status, return_code=return_code, output=output, stats=stats
+    )
+    if results is None:
+        return None
+
+    merged_stats: dict[str, dict[str, Any]] = {}
+    for _status, _return_code, _output, shard_stats in results:
+        for category, hosts in shard_stats.items():
+            merged_stats.setdefault(category, {}).update(hosts)
+    return {
+        "status": "successful" if all(result[0] == "successful" for result in results) else "failed",
+        "return_code": next((result[1] for result in results if result[1] != 0), 0),
+        "output": [line for result in results for line in result[2]],
+        "stats": merged_stats,
+    }
+
+
+def _report_shard_failure(job_id: str, shard: int, callback: str | None, message: str) -> None:
+    """Record a shard that crashed as failed, and report the merged result if it was the last shard to finish.
+
+    Any error while delivering the callback is logged and swallowed, the same as for `_post_playbook_failure_callback`.
+    """
+    merged = _finish_shard(job_id, shard, status="failed", return_code=-1, output=[message], stats={})
+    if merged is None:
+        return
+    try:
+        _report_playbook_result(job_id, callback, **merged)
+    except (requests.RequestException, CallbackFailedError):
+        logger.exception("Failed to POST callback to %s for job_id=%s", callback, job_id)
+
+
+def _report_playbook_crash(job_id: str, callback: str | None, shard: int | None, exc: BaseException) -> None:
+    """Report a playbook run that crashed before it could report its own result as failed."""
+    if shard is not None:
+        _report_shard_failure(job_id, shard, callback, f"Ansible playbook run failed: {exc}")
+        return
+    attached_jobs = _mark_finished(job_id, return_code=-1, output=f"Ansible playbook run failed: {exc}", failed=True)
+    if attached_jobs is None:
+        return
+    for attached_job_id, attached_callback in attached_jobs:
+        _post_playbook_failure_callback(attached_callback, attached_job_id, exc)
+    _post_playbook_failure_callback(callback, job_id, exc)
 
 
 class PlaybookFinishedHandler:
@@ -80,49 +310,65 @@ class PlaybookFinishedHandler:
     It records in `reported` whether that report was made, so the caller can tell the run reached completion and
     avoid sending a second, conflicting callback if the run instead crashed before finishing.
 
+    When the run is a shard of a larger run, its result is stored until all shards have finished. Only the last shard
+    reports, with the merged result of all shards.
+
     Args:
         callback (str, optional): The callback URL that the Ansible runner should report to. When not set, the
             handler is a no-op (nothing is POSTed).
         job_id (str): The job ID of this playbook run, used for reporting.
+        progress_reporter (ProgressReporter, optional): The reporter of progress updates for this run. Any queued
+            progress updates are sent before the callback is made.
+        shard (int, optional): The number of the shard, if this run is a shard of a larger run.
+        timed_out (threading.Event, optional): Set if the run was killed because it passed its deadline. The run is then
+            reported with status `timeout`.
 
     Attributes:
         reported (bool): `True` once the handler has run, i.e. the playbook finished and its result callback was
             attempted (regardless of whether delivering it then succeeded).
 
     Raises:
-        CallbackFailedError: If the callback to the external system has failed.
+        CallbackFailedError: If the callback to the external system has failed. Not raised when callbacks are
+            delivered through the outbox.
 
     """
 
-    def __init__(self, callback: str | None, job_id: str) -> None:
+    def __init__(
+        self,
+        callback: str | None,
+        job_id: str,
+        progress_reporter: ProgressReporter | None = None,
+        shard: int | None = None,
+        timed_out: threading.Event | None = None,
+    ) -> None:
         """Store the callback URL and job ID to report on when the playbook run finishes."""
         self._callback = callback
         self._job_id = job_id
+        self._progress_reporter = progress_reporter
+        self._shard = shard
+        self._timed_out = timed_out
         self.reported = False
 
-    def __call__(self, runner: Runner) -> None:
+    def __call__(self, runner: "Runner | WarmPlaybookResult") -> None:
         """Send one request with the playbook result to the callback URL."""
         # Record completion before attempting delivery, so a failure while POSTing does not let the caller's
         # crash safety net fire a second callback for the same job.
         self.reported = True
-        if not self._callback:
-            return
-
-        playbook_output = [line for line in runner.stdout.read().split("\n") if line.strip()]
-        payload = {
+        if self._progress_reporter:
+            self._progress_reporter.close()
+        result: dict[str, Any] | None = {
             "status": runner.status,
-            "job_id": self._job_id,
-            "output": playbook_output,
             "return_code": int(str(runner.rc)),
+            "output": [line for line in runner.stdout.read().split("\n") if line.strip()],
         }
+        if self._timed_out is not None and self._timed_out.is_set():
+            result = {**result, "status": "timeout", "output": [*result["output"], _TIMED_OUT_OUTPUT]}
+        if self._shard is not None:
+            result = _finish_shard(self._job_id, self._shard, **result, stats=runner.stats or {})
+            if result is None:
+                return
 
-        response = requests.post(str(self._callback), json=payload, timeout=settings.REQUEST_TIMEOUT_SEC)
-        try:
-            response.raise_for_status()
-        except HTTPError as e:
-            raise CallbackFailedError(
-                status_code=e.response.status_code, detail=f"{e.response.reason} for url: {e.request.url}"
-            ) from e
+        _report_playbook_result(self._job_id, self._callback, **result)
 
 
 def _post_playbook_failure_callback(callback: str | None, job_id: str, exc: BaseException) -> None:
@@ -148,12 +394,118 @@ def _post_playbook_failure_callback(callback: str | None, job_id: str, exc: Base
         "return_code": -1,
     }
     try:
-        requests.post(str(callback), json=payload, timeout=settings.REQUEST_TIMEOUT_SEC)
-    except requests.RequestException:
+        _send_callback(callback, payload)
+    except (requests.RequestException, CallbackFailedError):
         logger.exception("Failed to POST failure callback to %s for job_id=%s", callback, job_id)
 
 
-@celery.task(name=RUN_PLAYBOOK)  # type: ignore[untyped-decorator]
+def worker_crash_handler_factory(
+    job_id: str, callback: str | None, *, kind: str, shard: int | None = None
+) -> Callable[[Future], None]:
+    """Handle the crash of a process pool worker that was running a job.
+
+    If the worker process dies, e.g. because it ran out of memory, the job can't report its own result. The returned
+    function is added as a done callback to the future of the job, and reports the job as failed in its place, so the
+    external system does not wait for a callback that never comes.
+
+    Args:
+        job_id (str): The job ID of the job that was submitted to the process pool.
+        callback (str, optional): The callback URL of the job.
+        kind (str): The kind of job, either `playbook` or `executable`, which decides the shape of the callback.
+        shard (int, optional): The number of the shard, if the job is a shard of a larger playbook run.
+
+    """
+
+    def _handle_worker_crash(future: Future) -> None:
+        exc = None if future.cancelled() else future.exception()
+        if not isinstance(exc, BrokenProcessPool):
+            return
+
+        logger.error("Worker process running job_id=%s crashed: %s", job_id, exc)
+        if shard is not None:
+            _report_shard_failure(job_id, shard, callback, f"Worker process crashed: {exc}")
+            return
+        attached_jobs = _mark_finished(job_id, return_code=-1, output=f"Worker process crashed: {exc}", failed=True)
+        if attached_jobs is None:
+            return
+        if kind == "playbook":
+            for attached_job_id, attached_callback in attached_jobs:
+                _post_playbook_failure_callback(attached_callback, attached_job_id, exc)
+            _post_playbook_failure_callback(callback, job_id, exc)
+        elif callback:
+            payload = ExecutableRunResponse(
+                job_id=UUID(job_id),
+                result=ExecutionResult(output=f"Worker process crashed: {exc}", return_code=-1),
+            ).model_dump(mode="json")
+            try:
+                _send_callback(callback, payload)
+            except (requests.RequestException, CallbackFailedError):
+                logger.exception("Failed to POST failure callback to %s for job_id=%s", callback, job_id)
+
+    return _handle_worker_crash
+
+
+def _load_task(name: str) -> "LazyCeleryTask":
+    module_name, _, attribute = name.rpartition(".")
+    return getattr(importlib.import_module(module_name), attribute)  # type: ignore[no-any-return]
+
+
+class LazyCeleryTask:
+    """A job function that is registered as a Celery task, without creating the Celery app up front.
+
+    Calling it runs the job in the current process, as the local executors do. `delay`, `apply_async`, and `si` send it
+    to a Celery worker instead. The Celery app in `lso.worker` is only created when a task is sent for the first time,
+    so an API that runs jobs with a local executor never loads Celery at all.
+
+    Args:
+        fn (Callable[..., None]): The function that runs the job.
+
+    Attributes:
+        name (str): The name of the Celery task, which is the import path of the function.
+        run (Callable[..., None]): The function that runs the job.
+
+    """
+
+    def __init__(self, fn: Callable[..., None]) -> None:
+        """Wrap the function that runs the job."""
+        functools.update_wrapper(self, fn)
+        self.name = f"{fn.__module__}.{fn.__name__}"
+        self.run = fn
+
+    def __call__(self, *args: Any, **kwargs: Any) -> None:
+        """Run the job in the current process."""
+        self.run(*args, **kwargs)
+
+    def __reduce__(self) -> tuple[Callable[[str], "LazyCeleryTask"], tuple[str]]:
+        """Pickle the job by name, to submit it to the process pool.
+
+        The function itself can't be pickled, since its import path refers to this wrapper instead.
+        """
+        return _load_task, (self.name,)
+
+    @property
+    def celery_task(self) -> "Task":
+        """The Celery task, registered with the Celery app that is created on first use."""
+        from lso.worker import celery  # noqa: PLC0415
+
+        return celery.tasks[self.name]
+
+    def delay(self, *args: Any, **kwargs: Any) -> "AsyncResult":
+        """Send the job to a Celery worker."""
+        return self.celery_task.delay(*args, **kwargs)
+
+    def apply_async(
+        self, args: tuple[Any, ...] | None = None, kwargs: dict[str, Any] | None = None, **options: Any
+    ) -> "AsyncResult":
+        """Send the job to a Celery worker, with Celery's execution options."""
+        return self.celery_task.apply_async(args, kwargs, **options)
+
+    def si(self, *args: Any, **kwargs: Any) -> "Signature":
+        """Return an immutable signature of the job, e.g. to send it as part of a Celery group."""
+        return self.celery_task.si(*args, **kwargs)
+
+
+@LazyCeleryTask
 def run_playbook_proc_task(
     job_id: str,
     playbook_path: str,
@@ -163,6 +515,11 @@ def run_playbook_proc_task(
     progress: str | None,
     *,
     progress_is_incremental: bool,
+    progress_is_sequenced: bool = False,
+    shard: int | None = None,
+    limit: list[str] | None = None,
+    refresh_facts: bool = False,
+    deadline_sec: int | None = None,
 ) -> None:
     """Celery task to run a playbook.
 
@@ -174,21 +531,67 @@ def run_playbook_proc_task(
         callback (str, optional): Callback URL for status update.
         progress (str, optional): URL for sending progress updates.
         progress_is_incremental (bool): Whether progress updates include all past progress.
+        progress_is_sequenced (bool, optional): Whether progress updates are numbered, and only include new progress.
+        shard (int, optional): The number of the shard, if this run is one of the shards of a larger run.
+        limit (list[str], optional): The hosts of the inventory that the playbook is limited to, for a shard.
+        refresh_facts (bool, optional): Whether facts are gathered again, even if they are in the fact cache.
+        deadline_sec (int, optional): The wall-clock time that the run may take, in seconds, after which it is killed
+            and reported with status `timeout`. Capped by `ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC`.
 
     """
+    from ansible_runner import run  # noqa: PLC0415
+
     msg = f"playbook_path: {playbook_path}, callback: {callback}"
     logger.info(msg)
+    if not get_job_registry().mark_running(job_id):
+        logger.info("Skipping cancelled job_id=%s", job_id)
+        return
 
-    finished_handler = PlaybookFinishedHandler(callback, job_id)
-    try:
-        run(
-            playbook=playbook_path,
-            inventory=inventory,
-            extravars=extra_vars,
-            event_handler=playbook_event_handler_factory(progress, progress_is_incremental=progress_is_incremental),
-            finished_callback=finished_handler,
-            settings={"pexpect_timeout": settings.ANSIBLE_PLAYBOOK_TIMEOUT_SEC},
+    progress_reporter = None
+    if progress:
+        progress_reporter = ProgressReporter(
+            progress,
+            job_id,
+            progress_is_incremental=progress_is_incremental,
+            progress_is_sequenced=progress_is_sequenced,
         )
+    prune_private_data_dirs()
+    span_attributes = {"lso.job_id": job_id, "lso.playbook": playbook_path}
+    if shard is not None:
+        span_attributes["lso.shard"] = str(shard)
+    private_data_dir = get_private_data_dir(job_id, shard)
+
+    def _terminate() -> None:
+        kill_job_processes(job_id)
+        kill_warm_run(private_data_dir)
+
+    deadline_sec = _playbook_deadline_sec(deadline_sec)
+    watched_run = WatchedRun(job_id, _terminate, deadline_sec)
+    finished_handler = PlaybookFinishedHandler(callback, job_id, progress_reporter, shard, watched_run.timed_out)
+    try:
+        with (
+            start_span("run playbook", **span_attributes),
+            keep_private_data_dir(job_id),
+            get_cancellation_watcher().watch(watched_run),
+        ):
+            if warm_worker_eligible(progress=progress, refresh_facts=refresh_facts):
+                finished_handler(run_playbook_warm(playbook_path, inventory, extra_vars, private_data_dir, limit))
+                return
+            # The cancel callback and the job timeout are only checked by ansible-runner when the playbook writes
+            # output, so the watcher kills the playbook processes to end the run promptly.
+            run(
+                private_data_dir=str(private_data_dir),
+                playbook=playbook_path,
+                inventory=inventory,
+                extravars=extra_vars,
+                envvars={**fact_cache_envvars(refresh=refresh_facts), **job_envvars(job_id)},
+                limit=",".join(limit) if limit else None,
+                event_handler=playbook_event_handler_factory(progress_reporter),
+                cancel_callback=watched_run.is_stopped,
+                finished_callback=finished_handler,
+                timeout=deadline_sec,
+                settings={"pexpect_timeout": settings.ANSIBLE_PLAYBOOK_TIMEOUT_SEC},
+            )
     except Exception as exc:
         # Safety net: if the runner crashes before finished_handler runs (e.g. a pexpect read timeout), no result
         # is ever POSTed and the orchestrator's workflow orphans in `awaiting_callback`. Notify the orchestrator
@@ -196,11 +599,14 @@ def run_playbook_proc_task(
         # guards against a second, conflicting callback when the run completed but delivering its result failed.
         logger.exception("Ansible playbook run for job_id=%s crashed", job_id)
         if not finished_handler.reported:
-            _post_playbook_failure_callback(callback, job_id, exc)
+            _report_playbook_crash(job_id, callback, shard, exc)
         raise
+    finally:
+        if progress_reporter:
+            progress_reporter.close()
 
 
-@celery.task(name=RUN_EXECUTABLE)  # type: ignore[untyped-decorator]
+@LazyCeleryTask
 def run_executable_proc_task(job_id: str, executable_path: str, args: list[str], callback: str | None) -> None:
     """Celery task to run an arbitrary executable and notify via callback.
 
@@ -220,18 +626,23 @@ def run_executable_proc_task(job_id: str, executable_path: str, args: list[str],
 
     msg = f"Executing executable: {executable_path} with args: {args}, callback: {callback}"
     logger.info(msg)
-    result = run_executable_sync(executable_path, args)
+    if not get_job_registry().mark_running(job_id):
+        logger.info("Skipping cancelled job_id=%s", job_id)
+        return
+
+    with (
+        start_span("run executable", **{"lso.job_id": job_id, "lso.executable": executable_path}),
+        get_cancellation_watcher().watch(WatchedRun(job_id, functools.partial(kill_job_processes, job_id))),
+    ):
+        result = run_executable_sync(executable_path, args, envvars=job_envvars(job_id))
+    attached_jobs = _mark_finished(
+        job_id, return_code=result.return_code, output=result.output, failed=result.return_code != 0
+    )
 
-    if callback:
+    if callback and attached_jobs is not None:
         payload = ExecutableRunResponse(
             job_id=UUID(job_id),
             result=result,
         ).model_dump(mode="json")
 
-        response = requests.post(str(callback), json=payload, timeout=settings.REQUEST_TIMEOUT_SEC)
-        try:
-            response.raise_for_status()
-        except HTTPError as e:
-            raise CallbackFailedError(
-                status_code=e.response.status_code, detail=f"{e.response.reason} for url: {e.request.url}"
-            ) from e
+        _send_callback(callback, payload)
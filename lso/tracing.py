@@ -0,0 +1,135 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Optional OpenTelemetry tracing of requests, jobs and callbacks.
+
+When `TRACING_ENABLED` is set, every stage of a job is recorded as a span: the API request, inventory validation,
+dispatching the job, running it, and delivering its callback. The trace context travels along with the job to the
+executor, through Celery task headers if needed, and out on the callback request.
+
+Exporting spans requires the `tracing` extra to be installed. When tracing is disabled, all helpers are no-ops.
+"""
+
+import functools
+import os
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from typing import Any
+
+from fastapi import Request, Response
+from opentelemetry import context, propagate, trace
+
+from lso.config import TracingExporter, settings
+
+_tracer: trace.Tracer | None = None
+_tracer_pid: int | None = None
+
+
+def _create_tracer() -> trace.Tracer:
+    """Create a tracer that exports spans with the configured exporter."""
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource  # noqa: PLC0415
+    from opentelemetry.sdk.trace import TracerProvider  # noqa: PLC0415
+    from opentelemetry.sdk.trace.export import (  # noqa: PLC0415
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+    )
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: settings.TRACING_SERVICE_NAME}))
+    if settings.TRACING_EXPORTER == TracingExporter.FILE:
+        # One span per line, appended by every process that exports spans.
+        trace_file = open(settings.TRACING_FILE_PATH, "a", buffering=1)  # noqa: PTH123, SIM115
+        exporter = ConsoleSpanExporter(out=trace_file, formatter=lambda span: span.to_json(indent=None) + "\n")
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter  # noqa: PLC0415
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+
+    return provider.get_tracer("lso")
+
+
+def get_tracer() -> trace.Tracer:
+    """Initialize or return a cached tracer for the current process.
+
+    A new tracer is created after a fork, since the background thread that exports spans does not survive it.
+    """
+    global _tracer, _tracer_pid  # noqa: PLW0603
+    if not settings.TRACING_ENABLED:
+        return trace.NoOpTracer()
+    if _tracer is None or _tracer_pid != os.getpid():
+        _tracer = _create_tracer()
+        _tracer_pid = os.getpid()
+
+    return _tracer
+
+
+@contextmanager
+def start_span(name: str, **attributes: str) -> Iterator[trace.Span]:
+    """Record a span for a stage of a request or job, as a child of the current span."""
+    with get_tracer().start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def add_event(name: str, **attributes: str) -> None:
+    """Record an event on the current span."""
+    trace.get_current_span().add_event(name, attributes=attributes)
+
+
+def inject_headers(headers: dict[str, Any]) -> dict[str, Any]:
+    """Add the current trace context to the headers of an outgoing request or task."""
+    propagate.inject(headers)
+    return headers
+
+
+def attach_context(carrier: Mapping[str, Any]) -> object:
+    """Continue the trace from a carrier with a trace context, until `detach_context` is called with the result."""
+    return context.attach(propagate.extract(carrier))
+
+
+def detach_context(token: object) -> None:
+    """Stop continuing a trace that was attached with `attach_context`."""
+    context.detach(token)  # type: ignore[arg-type]
+
+
+def _run_in_context(carrier: dict[str, Any], fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    token = attach_context(carrier)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        detach_context(token)
+
+
+def propagate_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a task that is submitted to a local executor, so it continues the current trace.
+
+    The wrapper can be pickled, so it can be submitted to a process pool as well.
+    """
+    return functools.partial(_run_in_context, inject_headers({}), fn)
+
+
+async def tracing_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """Record a span for every API request, which continues the trace of the client if it sent one."""
+    token = attach_context(request.headers)
+    try:
+        with start_span(f"{request.method} {request.url.path}") as span:
+            response = await call_next(request)
+            # Name the span after the route rather than the URL, so requests for e.g. different jobs are grouped.
+            path = request.url.path
+            for name, value in request.scope.get("path_params", {}).items():
+                path = path.replace(f"/{value}", f"/{{{name}}}")
+            span.update_name(f"{request.method} {path}")
+            span.set_attribute("http.response.status_code", response.status_code)
+            return response
+    finally:
+        detach_context(token)
@@ -13,11 +13,26 @@
 
 """Utility functions for the LSO package."""
 
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from lso.config import settings
 
 _executor = None
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+_http_session: requests.Session | None = None
+_http_session_pid: int | None = None
 
 
 def get_thread_pool() -> ThreadPoolExecutor:
@@ -27,3 +42,123 @@ def get_thread_pool() -> ThreadPoolExecutor:
         _executor = ThreadPoolExecutor(max_workers=settings.MAX_THREAD_POOL_WORKERS)
 
     return _executor
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Initialize or return a cached ProcessPoolExecutor for local asynchronous execution.
+
+    Processes are started with `PROCESS_POOL_START_METHOD`, rather than forked from the API process with all of its
+    threads and open connections, and are replaced after running `PROCESS_POOL_MAX_TASKS_PER_CHILD` tasks.
+    """
+    global _process_pool  # noqa: PLW0603
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.MAX_PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(settings.PROCESS_POOL_START_METHOD.value),
+                max_tasks_per_child=settings.PROCESS_POOL_MAX_TASKS_PER_CHILD or None,
+            )
+
+    return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop using a broken process pool, so the next call to `get_process_pool` creates a new one.
+
+    A broken pool has already terminated its processes and failed its pending tasks, so it is not shut down here.
+    """
+    global _process_pool  # noqa: PLW0603
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+
+
+def submit_to_process_pool(fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+    """Submit a task to the process pool.
+
+    When a process of the pool dies unexpectedly, all tasks that were still running in the pool fail with a
+    `BrokenProcessPool` exception, and the pool is replaced. The API process itself is not affected.
+    """
+    pool = get_process_pool()
+    try:
+        future = pool.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        pool = get_process_pool()
+        future = pool.submit(fn, *args, **kwargs)
+
+    def _replace_broken_pool(done: Future) -> None:
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+            _discard_process_pool(pool)
+
+    future.add_done_callback(_replace_broken_pool)
+    return future
+
+
+def get_http_session() -> requests.Session:
+    """Initialize or return a cached HTTP session for sending callbacks and progress updates.
+
+    The session keeps connections alive, and pools them per host, so consecutive requests to the same host don't set
+    up a new TCP and TLS connection each time. A new session is created after a fork, such as in a Celery worker, since
+    open connections can't be shared between processes.
+    """
+    global _http_session, _http_session_pid  # noqa: PLW0603
+    if _http_session is None or _http_session_pid != os.getpid():
+        adapter = HTTPAdapter(pool_connections=settings.HTTP_POOL_CONNECTIONS, pool_maxsize=settings.HTTP_POOL_MAXSIZE)
+        _http_session = requests.Session()
+        _http_session.mount("http://", adapter)
+        _http_session.mount("https://", adapter)
+        _http_session_pid = os.getpid()
+
+    return _http_session
+
+
+class TTLCache[K: Hashable, V]:
+    """A thread-safe mapping of bounded size, whose entries expire after a fixed time to live.
+
+    When the cache is full, the least recently used entry is evicted to make room for a new one.
+
+    Args:
+        max_entries (int): Maximum amount of entries kept in the cache. When set to 0, nothing is cached.
+        ttl_sec (float): Time to live of each entry, in seconds.
+
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float) -> None:
+        """Create an empty cache."""
+        self._max_entries = max_entries
+        self._ttl_sec = ttl_sec
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for a key, or `None` if it is missing or has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value in the cache, evicting the least recently used entry if the cache is full."""
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the amount of entries in the cache, including expired entries that have not been evicted yet."""
+        return len(self._entries)
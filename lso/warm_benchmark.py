@@ -0,0 +1,90 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the time it takes to run a playbook with `ansible-runner`, and with a warm worker.
+
+Runs the given playbook a number of times in both ways, and prints the median and mean duration of a run. With a
+trivial playbook, the difference is the startup cost that warm workers save::
+
+    python -m lso.warm_benchmark test/test-playbook.yaml --inventory "localhost ansible_connection=local"
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from ansible_runner import run
+
+from lso.config import settings
+from lso.warm_worker import get_warm_pool, run_playbook_warm
+
+
+def _measure(runs: int, run_once: Callable[[Path], str]) -> list[float]:
+    durations = []
+    with tempfile.TemporaryDirectory(prefix="lso-benchmark-") as data_dir:
+        for i in range(runs):
+            run_dir = Path(data_dir) / str(i)
+            run_dir.mkdir()
+            start = time.perf_counter()
+            status = run_once(run_dir)
+            durations.append(time.perf_counter() - start)
+            if status != "successful":
+                msg = f"Playbook run {i} finished with status {status}"
+                raise RuntimeError(msg)
+    return durations
+
+
+def _report(name: str, durations: list[float]) -> None:
+    print(  # noqa: T201
+        f"{name:>14}: median {statistics.median(durations):.3f}s, mean {statistics.mean(durations):.3f}s "
+        f"over {len(durations)} runs"
+    )
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("playbook", help="Path to the playbook to run.")
+    parser.add_argument(
+        "--inventory", default="localhost ansible_connection=local", help="Inventory to run the playbook against."
+    )
+    parser.add_argument("--runs", type=int, default=10, help="Amount of runs of each kind.")
+    args = parser.parse_args()
+    playbook = str(Path(args.playbook).resolve())
+
+    settings.ANSIBLE_WARM_WORKERS = 1
+    start = time.perf_counter()
+    get_warm_pool().submit(time.sleep, 0).result()
+    warm_up_sec = time.perf_counter() - start
+
+    _report(
+        "ansible-runner",
+        _measure(
+            args.runs,
+            lambda data_dir: (
+                run(private_data_dir=str(data_dir), playbook=playbook, inventory=args.inventory, quiet=True).status
+            ),
+        ),
+    )
+    _report(
+        "warm worker",
+        _measure(args.runs, lambda data_dir: run_playbook_warm(playbook, args.inventory, {}, data_dir).status),
+    )
+    print(f"{'warm-up':>14}: {warm_up_sec:.3f}s, once per warm worker")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
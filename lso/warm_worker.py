@@ -0,0 +1,230 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Warm workers that run playbooks without starting a new Python interpreter for every run.
+
+`ansible-runner` starts `ansible-playbook` for every run, which imports Ansible and loads its plugins from scratch. For
+short playbooks, that fixed cost dominates the run. A warm worker imports Ansible once, and then forks a copy of itself
+for every run, which starts running the playbook right away. Since every run happens in a fork, runs do not share any
+state, while the warm worker itself stays clean.
+
+Warm workers are recycled after `ANSIBLE_WARM_WORKER_MAX_RUNS` runs. The whole pool is replaced once a warm worker grows
+beyond `ANSIBLE_WARM_WORKER_MAX_RSS_BYTES`, after the runs that are in progress have finished.
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from lso.cancellation import kill_process_group
+from lso.config import settings
+from lso.facts import fact_cache_envvars
+
+#: Interval at which a warm worker checks whether the run it forked has finished, in seconds.
+_POLL_INTERVAL_SEC = 0.05
+#: Return code of a run that timed out, the same as `ansible-runner` uses.
+_TIMEOUT_RETURN_CODE = 254
+
+_pool: ProcessPoolExecutor | None = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+class WarmPlaybookResult:
+    """The result of a playbook run in a warm worker, in the shape of an `ansible-runner` `Runner`.
+
+    Attributes:
+        status (str): `successful`, `failed`, or `timeout`.
+        rc (int): Return code of the run.
+        stdout (StringIO): The output of the run.
+        stats (dict[str, Any]): Always empty, since per-host stats are only collected by `ansible-runner`.
+
+    """
+
+    def __init__(self, status: str, rc: int, stdout: str) -> None:
+        """Store the outcome of a run."""
+        self.status = status
+        self.rc = rc
+        self.stdout = StringIO(stdout)
+        self.stats: dict[str, Any] = {}
+
+
+def warm_worker_eligible(*, progress: str | None, refresh_facts: bool) -> bool:
+    """Return whether a playbook run can be run by a warm worker.
+
+    Runs that send progress updates need the events that only `ansible-runner` collects, and runs that refresh facts
+    need a different Ansible configuration than the one the warm workers were started with.
+    """
+    return settings.ANSIBLE_WARM_WORKERS > 0 and not progress and not refresh_facts
+
+
+def _warm_up() -> None:
+    """Prepare a warm worker, by importing Ansible with the configuration that every run uses."""
+    # Ansible refuses to be imported with non-blocking standard streams, which it may inherit from the parent process.
+    for fd in (0, 1, 2):
+        with contextlib.suppress(OSError):
+            os.set_blocking(fd, True)
+    os.environ.update(fact_cache_envvars())
+    import ansible.cli.playbook  # noqa: PLC0415
+    import ansible.executor.playbook_executor  # noqa: F401, PLC0415
+
+
+def _run_in_fork(argv: list[str], stdout_path: str) -> None:
+    """Run `ansible-playbook` in a freshly forked warm worker, and exit with its return code."""
+    code = 1
+    try:
+        os.setsid()
+        output = os.open(stdout_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(output, 1)
+        os.dup2(output, 2)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        from ansible.cli.playbook import PlaybookCLI  # noqa: PLC0415
+
+        PlaybookCLI.cli_executor(argv)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:  # noqa: BLE001
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def _run_playbook(argv: list[str], stdout_path: str, idle_timeout_sec: int) -> tuple[str, int, int]:
+    """Run a playbook in a fork of this warm worker, and wait for it to finish.
+
+    The run is killed if it does not write any output for `idle_timeout_sec`, the same as `ansible-runner` does. Its
+    process ID is written next to its output, so that `kill_warm_run` can find it.
+
+    Returns:
+        The status and return code of the run, and the peak memory usage of this warm worker in bytes.
+
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        _run_in_fork(argv, stdout_path)
+    Path(stdout_path).with_name("pid").write_text(str(pid))
+
+    output_size = -1
+    last_output = time.monotonic()
+    while True:
+        waited_pid, wait_status = os.waitpid(pid, os.WNOHANG)
+        if waited_pid:
+            return_code = os.waitstatus_to_exitcode(wait_status)
+            status = "successful" if return_code == 0 else "failed"
+            break
+        with contextlib.suppress(FileNotFoundError):
+            if (size := Path(stdout_path).stat().st_size) != output_size:
+                output_size = size
+                last_output = time.monotonic()
+        if time.monotonic() - last_output > idle_timeout_sec:
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            status, return_code = "timeout", _TIMEOUT_RETURN_CODE
+            break
+        time.sleep(_POLL_INTERVAL_SEC)
+
+    # On Linux, the peak resident set size is reported in kilobytes.
+    return status, return_code, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_warm_pool() -> ProcessPoolExecutor:
+    """Initialize or return the cached pool of warm workers of the current process.
+
+    A new pool is created after a fork, since the processes of a pool belong to the process that started them.
+    """
+    global _pool, _pool_pid  # noqa: PLW0603
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.ANSIBLE_WARM_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_warm_up,
+                max_tasks_per_child=settings.ANSIBLE_WARM_WORKER_MAX_RUNS,
+            )
+            _pool_pid = os.getpid()
+
+        return _pool
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """Start a new pool for the next runs. The old pool shuts down once its runs have finished and it is collected."""
+    global _pool  # noqa: PLW0603
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def run_playbook_warm(
+    playbook_path: str,
+    inventory: dict[str, Any] | str,
+    extra_vars: dict[str, Any],
+    private_data_dir: Path,
+    limit: list[str] | None = None,
+) -> WarmPlaybookResult:
+    """Run a playbook in a warm worker, and wait for the result.
+
+    The inventory, extra vars, and output of the run are written to its private data directory, in the same places as
+    `ansible-runner` puts them.
+
+    Raises:
+        BrokenProcessPool: If the warm worker died while running the playbook.
+
+    """
+    inventory_dir = private_data_dir / "inventory"
+    inventory_dir.mkdir(parents=True, exist_ok=True)
+    if isinstance(inventory, str):
+        inventory_path = inventory_dir / "hosts"
+        inventory_path.write_text(inventory)
+    else:
+        inventory_path = inventory_dir / "hosts.json"
+        inventory_path.write_text(json.dumps(inventory))
+    extra_vars_path = private_data_dir / "env" / "extravars"
+    extra_vars_path.parent.mkdir(parents=True, exist_ok=True)
+    extra_vars_path.write_text(json.dumps(extra_vars))
+    stdout_path = private_data_dir / "artifacts" / "stdout"
+    stdout_path.parent.mkdir(parents=True, exist_ok=True)
+
+    argv = ["ansible-playbook", "-i", str(inventory_path), "-e", f"@{extra_vars_path}", playbook_path]
+    if limit:
+        argv += ["--limit", ",".join(limit)]
+
+    pool = get_warm_pool()
+    status, return_code, rss_bytes = pool.submit(
+        _run_playbook, argv, str(stdout_path), settings.ANSIBLE_PLAYBOOK_TIMEOUT_SEC
+    ).result()
+    if rss_bytes > settings.ANSIBLE_WARM_WORKER_MAX_RSS_BYTES:
+        _recycle_pool(pool)
+
+    return WarmPlaybookResult(status, return_code, stdout_path.read_text(errors="replace"))
+
+
+def kill_warm_run(private_data_dir: Path) -> None:
+    """Kill the playbook run of a warm worker that writes to the given private data directory, if it is running."""
+    with contextlib.suppress(FileNotFoundError, ValueError):
+        kill_process_group(int((private_data_dir / "artifacts" / "pid").read_text()))
@@ -13,13 +13,28 @@
 
 """Module that sets up LSO as a Celery worker."""
 
-from celery import Celery
-from celery.signals import worker_shutting_down
+from celery import Celery, Task
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_shutting_down,
+)
+from celery.worker.control import control_command
+from opentelemetry import propagate
 
 from lso.config import settings
+from lso.execute import prune_artifacts
+from lso.facts import invalidate_facts
+from lso.outbox import get_callback_outbox
+from lso.routing import MAX_PRIORITY
+from lso.tasks import run_executable_proc_task, run_playbook_proc_task
+from lso.tracing import attach_context, detach_context, inject_headers
 
-RUN_PLAYBOOK = "lso.tasks.run_playbook_proc_task"
-RUN_EXECUTABLE = "lso.tasks.run_executable_proc_task"
+RUN_PLAYBOOK = run_playbook_proc_task.name
+RUN_EXECUTABLE = run_executable_proc_task.name
+INVALIDATE_FACTS = "lso_invalidate_facts"
 
 celery = Celery(
     "lso-worker",
@@ -35,6 +50,8 @@ celery.conf.update(
     redbeat_redis_url=settings.CELERY_BROKER_URL,
     broker_connection_retry_on_startup=True,
     task_ignore_result=not settings.TESTING,
+    task_queue_max_priority=MAX_PRIORITY,
+    broker_transport_options={"queue_order_strategy": "priority", "priority_steps": list(range(MAX_PRIORITY + 1))},
 )
 
 if settings.WORKER_QUEUE_NAME:
@@ -43,14 +60,54 @@ if settings.WORKER_QUEUE_NAME:
         RUN_EXECUTABLE: {"queue": settings.WORKER_QUEUE_NAME},
     }
 
-# Ensure the task modules are imported so their ``@celery.task`` decorators register the tasks. The worker is started
-# with ``-A lso.worker``, which does not otherwise import ``lso.tasks``; without this, the worker boots with an empty
-# task registry and rejects every incoming task with "Received unregistered task". ``autodiscover_tasks`` is used
-# instead of a top-level import to avoid the circular import between ``lso.worker`` and ``lso.tasks``.
-celery.autodiscover_tasks(["lso"], related_name="tasks", force=True)
+# Register the tasks here, rather than with ``@celery.task`` in ``lso.tasks``, so that running a job with a local
+# executor does not create the Celery app. The worker is started with ``-A lso.worker``, so the tasks are registered
+# before it accepts any; without them, it rejects every incoming task with "Received unregistered task".
+for _task in (run_playbook_proc_task, run_executable_proc_task):
+    celery.task(name=_task.name)(_task.run)
 
 
 @worker_shutting_down.connect  # type: ignore[untyped-decorator]
 def worker_shutting_down_handler(sig, how, exitcode, **kwargs) -> None:  # type: ignore[no-untyped-def] # noqa: ARG001
     """Handle the Celery worker shutdown event."""
     celery.close()
+
+
+@worker_process_init.connect  # type: ignore[untyped-decorator]
+def worker_process_init_handler(**kwargs) -> None:  # type: ignore[no-untyped-def] # noqa: ARG001
+    """Deliver callbacks that are left in the outbox, and remove expired artifacts, when a worker process starts."""
+    if settings.CALLBACK_OUTBOX_ENABLED:
+        get_callback_outbox()
+    prune_artifacts()
+
+
+#: Trace contexts that are attached while a task runs, by task ID.
+_trace_tokens: dict[str, object] = {}
+
+
+@before_task_publish.connect  # type: ignore[untyped-decorator]
+def before_task_publish_handler(headers: dict, **kwargs) -> None:  # type: ignore[no-untyped-def] # noqa: ARG001
+    """Send the current trace context along with a task, in its headers."""
+    inject_headers(headers)
+
+
+@task_prerun.connect  # type: ignore[untyped-decorator]
+def task_prerun_handler(task_id: str, task: Task, **kwargs) -> None:  # type: ignore[no-untyped-def] # noqa: ARG001
+    """Continue the trace from the headers of a task, while it runs."""
+    carrier = {field: value for field in propagate.get_global_textmap().fields if (value := task.request.get(field))}
+    _trace_tokens[task_id] = attach_context(carrier)
+
+
+@task_postrun.connect  # type: ignore[untyped-decorator]
+def task_postrun_handler(task_id: str, **kwargs) -> None:  # type: ignore[no-untyped-def] # noqa: ARG001
+    """Stop continuing the trace of a task once it has finished."""
+    token = _trace_tokens.pop(task_id, None)
+    if token is not None:
+        detach_context(token)
+
+
+@control_command(name=INVALIDATE_FACTS, args=[("hosts", list)], signature="<hosts>")  # type: ignore[untyped-decorator]
+def invalidate_facts_command(state, hosts: list[str]) -> dict[str, str]:  # type: ignore[no-untyped-def] # noqa: ARG001
+    """Remove the cached facts of the given hosts from the fact cache of this worker, when broadcast by the API."""
+    invalidated = invalidate_facts(hosts)
+    return {"ok": f"invalidated cached facts of {len(invalidated)} hosts"}
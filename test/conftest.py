@@ -31,12 +31,18 @@ def pytest_configure() -> None:
 
     # Set environment variables for the test session
     os.environ["ANSIBLE_PLAYBOOKS_ROOT_DIR"] = tempdir.name
+    os.environ["JOB_REGISTRY_PATH"] = str(Path(tempdir.name) / "jobs.sqlite3")
+    os.environ["EXECUTABLE_ARTIFACTS_DIR"] = str(Path(tempdir.name) / "artifacts")
+    os.environ["ANSIBLE_RUNNER_DATA_DIR"] = str(Path(tempdir.name) / "runner")
     os.environ["TESTING"] = "true"
 
     # Register finalizers to clean up after tests are done
     def cleanup() -> None:
         tempdir.cleanup()
         del os.environ["ANSIBLE_PLAYBOOKS_ROOT_DIR"]
+        del os.environ["JOB_REGISTRY_PATH"]
+        del os.environ["EXECUTABLE_ARTIFACTS_DIR"]
+        del os.environ["ANSIBLE_RUNNER_DATA_DIR"]
         del os.environ["TESTING"]
 
     pytest.session_cleanup = cleanup
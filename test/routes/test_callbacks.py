@@ -0,0 +1,52 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lso.config import settings
+from lso.outbox import CallbackOutbox
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+
+
+def test_failed_callbacks_without_outbox(client: TestClient) -> None:
+    assert client.get("/api/callbacks/failed").status_code == status.HTTP_404_NOT_FOUND
+    assert client.post("/api/callbacks/replay").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_and_replay_failed_callbacks(client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CALLBACK_OUTBOX_ENABLED", True)
+    outbox = CallbackOutbox(str(tmp_path / "outbox.sqlite3"))
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+    # Give up on the callback without delivering it, which would count towards the metrics of other tests.
+    [(callback_id, *_)] = outbox._claim_due(time.time())  # noqa: SLF001
+    outbox._fail(callback_id, 1, time.time())  # noqa: SLF001
+
+    with patch("lso.routes.callbacks.get_callback_outbox", return_value=outbox):
+        rv = client.get("/api/callbacks/failed")
+        assert rv.status_code == status.HTTP_200_OK
+        [failed] = rv.json()
+        assert failed["url"] == TEST_CALLBACK_URL
+        assert failed["payload"] == {"job_id": "job-1"}
+        assert failed["attempts"] == 1
+
+        rv = client.post("/api/callbacks/replay", params={"callback_id": [failed["callback_id"]]})
+        assert rv.status_code == status.HTTP_200_OK
+        assert rv.json() == {"replayed": 1}
+        assert client.get("/api/callbacks/failed").json() == []
+    assert outbox.pending() == 1
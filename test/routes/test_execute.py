@@ -1,12 +1,13 @@
+import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import responses
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from lso.config import ExecutorType
+from lso.config import ExecutorType, settings
 from lso.schema import JobStatus
 from test.utils import temp_executable_env
 
@@ -60,7 +61,7 @@ def test_execute_endpoint_worker_success(client: TestClient, temp_executable: Pa
             "args": [],
             "callback": TEST_CALLBACK_URL,
         }
-        with patch("lso.tasks.run_executable_proc_task.delay") as mock_celery_delay:
+        with patch("lso.tasks.run_executable_proc_task.apply_async") as mock_celery_delay:
             rv = client.post("/api/execute/", json=params)
             assert rv.status_code == status.HTTP_201_CREATED
             response = rv.json()
@@ -185,3 +186,72 @@ def test_execute_endpoint_sync_ignores_callback(client: TestClient, temp_executa
         assert data["result"] is not None
         # and no callback should have been invoked:
         responses.assert_call_count(TEST_CALLBACK_URL, 0)
+
+
+def test_execute_endpoint_sync_stream(client: TestClient):
+    """When is_async=False and stream=True, output is streamed as NDJSON frames, ending with the return code."""
+    with temp_executable_env(ExecutorType.THREADPOOL) as exec_dir:
+        target_exe = exec_dir / "chatty.sh"
+        target_exe.write_text("#!/bin/sh\necho 'to stdout'\necho 'to stderr' >&2\nexit 3\n")
+        target_exe.chmod(0o755)
+
+        rv = client.post("/api/execute/", json={"executable_name": "chatty.sh", "is_async": False, "stream": True})
+        assert rv.status_code == status.HTTP_201_CREATED
+        assert rv.headers["content-type"] == "application/x-ndjson"
+        frames = [json.loads(line) for line in rv.text.splitlines()]
+
+    job_id = frames[-1]["job_id"]
+    assert all(frame["job_id"] == job_id for frame in frames)
+    assert "".join(frame["output"] for frame in frames if frame.get("stream") == "stdout") == "to stdout\n"
+    assert "".join(frame["output"] for frame in frames if frame.get("stream") == "stderr") == "to stderr\n"
+    assert frames[-1]["return_code"] == 3  # noqa: PLR2004
+    assert frames[-1]["status"] == JobStatus.FAILED
+    assert client.get(f"/api/jobs/{job_id}").json()["state"] == "failed"
+
+
+def test_get_artifact_endpoint(client: TestClient, monkeypatch):
+    """The full output of a run with large output can be downloaded as an artifact."""
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_MAX_BYTES", 1024)
+    with temp_executable_env(ExecutorType.THREADPOOL) as exec_dir:
+        target_exe = exec_dir / "chatty.sh"
+        target_exe.write_text("#!/bin/sh\nseq 1 1000\n")
+        target_exe.chmod(0o755)
+
+        rv = client.post("/api/execute/", json={"executable_name": "chatty.sh", "is_async": False})
+        artifact_id = rv.json()["result"]["artifact_id"]
+        assert artifact_id is not None
+
+    rv = client.get(f"/api/execute/artifacts/{artifact_id}")
+    assert rv.status_code == status.HTTP_200_OK
+    assert rv.text == "".join(f"{i}\n" for i in range(1, 1001))
+
+
+def test_get_artifact_endpoint_not_found(client: TestClient):
+    """Unknown artifacts result in a 404."""
+    rv = client.get(f"/api/execute/artifacts/{uuid4()}")
+    assert rv.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_execute_batch_worker_enqueues_group(client: TestClient, temp_executable: Path):
+    """In worker mode, a batch is sent to Celery as a single group of tasks."""
+    with temp_executable_env(ExecutorType.WORKER) as exec_dir:
+        target_exe = exec_dir / temp_executable.name
+        target_exe.write_text(temp_executable.read_text())
+        target_exe.chmod(0o755)
+
+        params = {
+            "runs": [{"executable_name": temp_executable.name, "args": [str(index)]} for index in range(3)],
+            "callback": TEST_CALLBACK_URL,
+        }
+        with patch("celery.group") as mock_group:
+            rv = client.post("/api/execute/batch", json=params)
+
+        assert rv.status_code == status.HTTP_201_CREATED
+        response = rv.json()
+        UUID(response["batch_id"])
+        assert len(response["job_ids"]) == len(params["runs"])
+        mock_group.assert_called_once()
+        mock_group.return_value.apply_async.assert_called_once()
+        signatures = list(mock_group.call_args.args[0])
+        assert [signature.args[0] for signature in signatures] == response["job_ids"]
+        assert [signature.args[2] for signature in signatures] == [["0"], ["1"], ["2"]]
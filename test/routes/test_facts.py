@@ -0,0 +1,39 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lso.config import ExecutorType, settings
+from test.utils import temporary_executor
+
+
+def test_invalidate_facts_endpoint(client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "FACT_CACHE_DIR", str(tmp_path))
+    (tmp_path / "host1.local").write_text("{}")
+
+    rv = client.post("/api/facts/invalidate", json={"hosts": ["host1.local"]})
+
+    assert rv.status_code == status.HTTP_204_NO_CONTENT
+    assert not (tmp_path / "host1.local").exists()
+
+
+def test_invalidate_facts_endpoint_broadcasts_to_workers(client: TestClient) -> None:
+    with temporary_executor(ExecutorType.WORKER), patch("lso.worker.celery.control.broadcast") as mock_broadcast:
+        rv = client.post("/api/facts/invalidate", json={"hosts": ["host1.local"]})
+
+    assert rv.status_code == status.HTTP_204_NO_CONTENT
+    mock_broadcast.assert_called_once_with("lso_invalidate_facts", arguments={"hosts": ["host1.local"]})
@@ -0,0 +1,171 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+import responses
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lso.config import ExecutorType, settings
+from lso.execute import stream_executable
+from lso.jobs import get_job_registry
+from lso.schema import JobState
+from lso.tasks import cancel_job, run_executable_proc_task
+from test.utils import temp_executable_env
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+
+
+def test_job_status_after_executable_run(client: TestClient, temp_executable: Path) -> None:
+    with temp_executable_env(ExecutorType.THREADPOOL) as exec_dir:
+        target_exe = exec_dir / temp_executable.name
+        target_exe.write_text(temp_executable.read_text())
+        target_exe.chmod(0o755)
+
+        rv = client.post("/api/execute/", json={"executable_name": temp_executable.name})
+        assert rv.status_code == status.HTTP_201_CREATED
+        job_id = rv.json()["job_id"]
+
+    rv = client.get(f"/api/jobs/{job_id}")
+    assert rv.status_code == status.HTTP_200_OK
+    job = rv.json()
+    assert job["job_id"] == job_id
+    assert job["kind"] == "executable"
+    assert job["state"] == JobState.FINISHED
+    assert job["return_code"] == 0
+    assert "Executable Test" in job["output"]
+
+
+def test_job_status_unknown(client: TestClient) -> None:
+    rv = client.get(f"/api/jobs/{uuid4()}")
+    assert rv.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_job_progress(client: TestClient) -> None:
+    job_id = str(uuid4())
+    registry = get_job_registry()
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+    registry.append_progress(job_id, 0, ["TASK [one]", "ok: [host1]", "TASK [two]"])
+
+    rv = client.get(f"/api/jobs/{job_id}/progress", params={"since": 1, "limit": 1})
+    assert rv.status_code == status.HTTP_200_OK
+    assert rv.json() == {"sequence": 1, "progress": ["ok: [host1]"]}
+
+    rv = client.get(f"/api/jobs/{job_id}/progress", params={"since": 3})
+    assert rv.json() == {"sequence": 3, "progress": []}
+
+    rv = client.get(f"/api/jobs/{uuid4()}/progress")
+    assert rv.status_code == status.HTTP_404_NOT_FOUND
+
+
+@responses.activate
+def test_cancel_queued_job(client: TestClient) -> None:
+    job_id = str(uuid4())
+    get_job_registry().create(job_id, "playbook", "/playbooks/hello.yaml", callback=TEST_CALLBACK_URL)
+    responses.add(responses.POST, TEST_CALLBACK_URL, status=200)
+
+    rv = client.delete(f"/api/jobs/{job_id}")
+    assert rv.status_code == status.HTTP_200_OK
+    assert rv.json()["state"] == JobState.CANCELLED
+    responses.assert_call_count(TEST_CALLBACK_URL, 1)
+    assert json.loads(responses.calls[0].request.body) == {
+        "status": "cancelled",
+        "job_id": job_id,
+        "output": ["Job was cancelled."],
+        "return_code": -1,
+    }
+
+    rv = client.delete(f"/api/jobs/{job_id}")
+    assert rv.status_code == status.HTTP_409_CONFLICT
+    rv = client.delete(f"/api/jobs/{uuid4()}")
+    assert rv.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_cancel_running_executable(client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A running executable is killed within the poll interval, and its result is not reported."""
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_INTERVAL_SEC", 0.1)
+    slow = tmp_path / "slow.sh"
+    slow.write_text("#!/bin/sh\nsleep 30\n")
+    slow.chmod(0o755)
+    job_id = str(uuid4())
+    get_job_registry().create(job_id, "executable", str(slow))
+    run = threading.Thread(target=run_executable_proc_task, args=(job_id, str(slow), [], None))
+    run.start()
+    while get_job_registry().get(job_id).state == JobState.QUEUED:
+        time.sleep(0.05)
+
+    start = time.monotonic()
+    rv = client.delete(f"/api/jobs/{job_id}")
+    assert rv.status_code == status.HTTP_200_OK
+    run.join(timeout=10)
+
+    assert not run.is_alive()
+    assert time.monotonic() - start < 5  # noqa: PLR2004
+    assert get_job_registry().get(job_id).state == JobState.CANCELLED
+
+
+def test_cancel_synchronous_executable(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A synchronous executable run is killed by the API process, and responds with status `cancelled`."""
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_INTERVAL_SEC", 0.1)
+    job_id = uuid4()
+    monkeypatch.setattr("lso.routes.execute.uuid4", lambda: job_id)
+    results: list[dict] = []
+    with temp_executable_env(ExecutorType.THREADPOOL) as exec_dir:
+        slow = exec_dir / "slow.sh"
+        slow.write_text("#!/bin/sh\nsleep 30\n")
+        slow.chmod(0o755)
+        params = {"executable_name": "slow.sh", "is_async": False}
+        run = threading.Thread(target=lambda: results.append(client.post("/api/execute/", json=params).json()))
+        run.start()
+        while (job := get_job_registry().get(str(job_id))) is None or job.state == JobState.QUEUED:
+            time.sleep(0.05)
+
+        start = time.monotonic()
+        rv = client.delete(f"/api/jobs/{job_id}")
+        assert rv.status_code == status.HTTP_200_OK
+        run.join(timeout=10)
+
+    assert not run.is_alive()
+    assert time.monotonic() - start < 5  # noqa: PLR2004
+    assert results[0]["result"]["status"] == "cancelled"
+    assert get_job_registry().get(str(job_id)).state == JobState.CANCELLED
+
+
+def test_cancel_streamed_executable(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A streamed executable run is killed, and its final frame has status `cancelled`."""
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_INTERVAL_SEC", 0.1)
+    slow = tmp_path / "slow.sh"
+    slow.write_text("#!/bin/sh\necho started\nsleep 30\n")
+    slow.chmod(0o755)
+    job_id = uuid4()
+
+    async def _stream() -> list[dict]:
+        frames = stream_executable(job_id, str(slow), [])
+        received = [await anext(frames)]
+        await asyncio.to_thread(cancel_job, str(job_id))
+        received.extend([frame async for frame in frames])
+        return received
+
+    start = time.monotonic()
+    frames = asyncio.run(_stream())
+
+    assert time.monotonic() - start < 5  # noqa: PLR2004
+    assert frames[0]["output"] == "started\n"
+    assert frames[-1]["status"] == "cancelled"
+    assert get_job_registry().get(str(job_id)).state == JobState.CANCELLED
@@ -0,0 +1,44 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+
+import responses
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lso.config import ExecutorType
+from test.utils import temp_executable_env
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+
+
+@responses.activate
+def test_metrics_after_executable_run(client: TestClient, temp_executable: Path) -> None:
+    responses.add(responses.POST, TEST_CALLBACK_URL, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    with temp_executable_env(ExecutorType.THREADPOOL) as exec_dir:
+        target_exe = exec_dir / "metrics.sh"
+        target_exe.write_text(temp_executable.read_text())
+        target_exe.chmod(0o755)
+
+        client.post("/api/execute/", json={"executable_name": "metrics.sh", "is_async": False})
+        # The executable runs fine, but its callback can't be delivered.
+        client.post("/api/execute/", json={"executable_name": "metrics.sh", "callback": TEST_CALLBACK_URL})
+
+    rv = client.get("/api/metrics")
+    assert rv.status_code == status.HTTP_200_OK
+    assert rv.headers["content-type"].startswith("text/plain")
+    metrics = rv.text
+    assert f'lso_job_duration_seconds_count{{kind="executable",name="{target_exe}",outcome="finished"}} 2.0' in metrics
+    assert 'lso_http_post_failures_total{kind="callback"} 1.0' in metrics
+    assert "lso_executor_queue_depth 0.0" in metrics
+    assert "lso_inventory_validation_duration_seconds_count" in metrics
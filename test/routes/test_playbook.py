@@ -10,9 +10,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
 import re
 from collections.abc import Callable
+from io import StringIO
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -20,7 +23,7 @@ import responses
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from lso.config import ExecutorType
+from lso.config import ExecutorType, settings
 from lso.playbook import get_playbook_path
 from test.utils import temporary_executor
 
@@ -49,7 +52,7 @@ def test_playbook_endpoint_dict_inventory_success(
         responses.post(url=progress, status=status.HTTP_200_OK)
         params["progress"] = progress
 
-    with patch("lso.routes.playbook.ansible_runner.run", new=mocked_ansible_runner_run):
+    with patch("ansible_runner.run", new=mocked_ansible_runner_run):
         rv = client.post("/api/playbook/", json=params)
         assert rv.status_code == status.HTTP_201_CREATED
         response = rv.json()
@@ -68,7 +71,7 @@ def test_playbook_endpoint_str_inventory_success(client: TestClient, mocked_ansi
         "inventory": {"all": {"hosts": "host1.local\nhost2.local\nhost3.local"}},
     }
 
-    with patch("lso.routes.playbook.ansible_runner.run", new=mocked_ansible_runner_run):
+    with patch("ansible_runner.run", new=mocked_ansible_runner_run):
         rv = client.post("/api/playbook/", json=params)
         assert rv.status_code == status.HTTP_201_CREATED
         response = rv.json()
@@ -88,7 +91,7 @@ def test_playbook_endpoint_invalid_host_vars(client: TestClient, mocked_ansible_
         },
     }
 
-    with patch("lso.routes.playbook.ansible_runner.run", new=mocked_ansible_runner_run) as _:
+    with patch("ansible_runner.run", new=mocked_ansible_runner_run) as _:
         rv = client.post("/api/playbook/", json=params)
         assert rv.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
         response = rv.json()
@@ -114,7 +117,7 @@ def test_playbook_endpoint_invalid_hosts(client: TestClient, mocked_ansible_runn
         },
     }
 
-    with patch("lso.routes.playbook.ansible_runner.run", new=mocked_ansible_runner_run):
+    with patch("ansible_runner.run", new=mocked_ansible_runner_run):
         rv = client.post("/api/playbook/", json=params)
         assert rv.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
         response = rv.json()
@@ -173,7 +176,7 @@ def test_run_playbook_celery_execution(client: TestClient) -> None:
             "extra_vars": {"dry_run": True},
         }
 
-        with patch("lso.tasks.run_playbook_proc_task.delay") as mock_celery_delay:
+        with patch("lso.tasks.run_playbook_proc_task.apply_async") as mock_celery_delay:
             rv = client.post("/api/playbook/", json=params)
             assert rv.status_code == status.HTTP_201_CREATED
             response = rv.json()
@@ -216,8 +219,115 @@ def test_run_playbook_invalid_playbook_path(client: TestClient) -> None:
         "extra_vars": {"dry_run": True},
     }
 
-    with patch("lso.tasks.run_playbook_proc_task.delay"):
+    with patch("lso.tasks.run_playbook_proc_task.apply_async"):
         rv = client.post("/api/playbook/", json=params)
         assert rv.status_code == status.HTTP_410_GONE
         response = rv.json()
         assert response["detail"] == f"Filename '{get_playbook_path(Path('invalid.yaml'))}' does not exist."
+
+
+def test_run_playbook_deadline_over_maximum(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ANSIBLE_PLAYBOOK_MAX_DEADLINE_SEC", 600)
+    params = {"playbook_name": "placeholder.yaml", "inventory": "host1.local", "deadline_sec": 601}
+
+    rv = client.post("/api/playbook/", json=params)
+    assert rv.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert "can't exceed 600 seconds" in rv.text
+
+
+def test_playbook_endpoint_empty_inventory(client: TestClient, mocked_ansible_runner_run: Callable) -> None:
+    params = {"playbook_name": "placeholder.yaml", "inventory": {}}
+
+    with patch("ansible_runner.run", new=mocked_ansible_runner_run):
+        rv = client.post("/api/playbook/", json=params)
+
+    assert rv.status_code == status.HTTP_201_CREATED
+
+
+def test_inventory_validation_is_cached(client: TestClient) -> None:
+    """Submitting the same inventory twice only parses it once, and reports the same outcome both times."""
+    from lso.routes.playbook import _parse_inventory  # noqa: PLC0415
+
+    inventory = {
+        "_meta": {"host_vars": {"cached.local": {"foo": "bar"}}},
+        "all": {"hosts": {"cached.local": None}},
+    }
+    params = {"playbook_name": "placeholder.yaml", "inventory": inventory}
+
+    with patch("lso.routes.playbook._parse_inventory", wraps=_parse_inventory) as mock_parse:
+        first = client.post("/api/playbook/", json=params)
+        # Key order does not matter for the cache.
+        second = client.post("/api/playbook/", json={**params, "inventory": dict(reversed(inventory.items()))})
+
+    assert first.status_code == second.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert first.json() == second.json()
+    mock_parse.assert_called_once()
+
+
+def test_list_playbooks(client: TestClient) -> None:
+    rv = client.get("/api/playbook/")
+    assert rv.status_code == status.HTTP_200_OK
+    playbooks = {playbook["name"]: playbook for playbook in rv.json()}
+    assert "placeholder.yaml" in playbooks
+    assert playbooks["placeholder.yaml"]["size"] == 0
+
+
+def test_playbook_endpoint_over_concurrency_limit(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_JOBS", {"placeholder.yaml": 0})
+    params = {"playbook_name": "placeholder.yaml", "inventory": "host1.local"}
+
+    rv = client.post("/api/playbook/", json=params)
+
+    assert rv.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in rv.headers
+
+
+@responses.activate
+def test_run_playbook_batch_with_shared_inventory(client: TestClient) -> None:
+    """A batch validates its shared inventory once, and reports to the batch callback when all runs have finished."""
+    from lso.routes.playbook import _parse_inventory  # noqa: PLC0415
+
+    batch_callback_url = "https://fqdn.abc.xyz/api/batch"
+    responses.post(url=TEST_CALLBACK_URL, status=status.HTTP_200_OK)
+    responses.post(url=batch_callback_url, status=status.HTTP_200_OK)
+
+    def fake_run(*_args: Any, extravars: dict[str, Any], finished_callback: Callable, **_kwargs: Any) -> None:
+        rc = 0 if extravars["succeed"] else 2
+        finished_callback(MagicMock(status="successful" if rc == 0 else "failed", rc=rc, stdout=StringIO("done\n")))
+
+    params = {
+        "inventory": {"all": {"hosts": {"batch.local": None}}},
+        "callback": batch_callback_url,
+        "runs": [
+            {"playbook_name": "placeholder.yaml", "extra_vars": {"succeed": True}, "callback": TEST_CALLBACK_URL},
+            {"playbook_name": "placeholder.yaml", "extra_vars": {"succeed": False}},
+            {"playbook_name": "placeholder.yaml", "extra_vars": {"succeed": True}, "inventory": "other.local"},
+        ],
+    }
+    with (
+        patch("lso.routes.playbook._parse_inventory", wraps=_parse_inventory) as mock_parse,
+        patch("ansible_runner.run", new=fake_run),
+    ):
+        rv = client.post("/api/playbook/batch", json=params)
+
+    assert rv.status_code == status.HTTP_201_CREATED
+    response = rv.json()
+    assert len(response["job_ids"]) == len(params["runs"])
+    assert [call.args[0] for call in mock_parse.call_args_list].count(params["inventory"]) == 1
+
+    responses.assert_call_count(TEST_CALLBACK_URL, 1)
+    responses.assert_call_count(batch_callback_url, 1)
+    batch_result = json.loads(responses.calls[-1].request.body)
+    assert batch_result["batch_id"] == response["batch_id"]
+    assert batch_result["status"] == "failed"
+    assert [job["job_id"] for job in batch_result["jobs"]] == response["job_ids"]
+    assert [job["return_code"] for job in batch_result["jobs"]] == [0, 2, 0]
+
+
+def test_run_playbook_batch_without_inventory(client: TestClient) -> None:
+    """A batch is rejected if a run has no inventory, and there is no shared inventory either."""
+    params = {"runs": [{"playbook_name": "placeholder.yaml"}]}
+
+    rv = client.post("/api/playbook/batch", json=params)
+
+    assert rv.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
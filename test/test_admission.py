@@ -0,0 +1,118 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sqlite3
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import status
+
+from lso.admission import AdmissionController, JobRejectedError
+from lso.config import ExecutorType, settings
+from lso.execute import ExecutableRun, run_executable_async, run_executable_batch
+from lso.playbook import PlaybookRun, run_playbook, run_playbook_batch
+from test.utils import temporary_executor
+
+
+def test_admission_rejects_over_queue_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MAX_THREAD_POOL_WORKERS", 2)
+    monkeypatch.setattr(settings, "MAX_QUEUED_JOBS", 1)
+    controller = AdmissionController()
+    releases = [controller.admit("playbook.yaml") for _ in range(3)]
+
+    with pytest.raises(JobRejectedError) as exc:
+        controller.admit("playbook.yaml")
+    assert exc.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+    releases[0](Future())
+    controller.admit("other.yaml")
+    assert controller.in_flight() == 3  # noqa: PLR2004
+    assert controller.in_flight("playbook.yaml") == 2  # noqa: PLR2004
+
+
+def test_admission_rejects_over_concurrency_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_JOBS", {"playbook.yaml": 1})
+    controller = AdmissionController()
+    # A job that finished straight away, which the estimate of the retry delay is based on.
+    controller.admit("playbook.yaml")(Future())
+    controller.admit("playbook.yaml")
+    controller.admit("other.yaml")
+
+    with pytest.raises(JobRejectedError) as exc:
+        controller.admit("playbook.yaml")
+    assert exc.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert exc.value.headers["Retry-After"] == "1"
+
+
+def test_admission_does_not_apply_to_celery(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_JOBS", {"playbook.yaml": 0})
+    controller = AdmissionController()
+    with temporary_executor(ExecutorType.WORKER):
+        controller.admit("playbook.yaml")
+
+    assert controller.in_flight() == 0
+
+
+def test_admission_release_is_idempotent() -> None:
+    controller = AdmissionController()
+    release = controller.admit("playbook.yaml")
+
+    release(Future())
+    release()
+    assert controller.in_flight() == 0
+    assert controller.in_flight("playbook.yaml") == 0
+
+
+def test_admission_slots_are_released_when_dispatch_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = AdmissionController()
+    monkeypatch.setattr("lso.playbook.get_admission_controller", lambda: controller)
+
+    def broken_dispatch(*_args: object) -> None:
+        msg = "Broker is unreachable"
+        raise ConnectionError(msg)
+
+    monkeypatch.setattr("lso.playbook._dispatch", broken_dispatch)
+    with pytest.raises(ConnectionError):
+        run_playbook(
+            playbook_path=Path("/playbooks/audit.yaml"),
+            extra_vars={},
+            inventory={"all": {"hosts": dict.fromkeys(["host1.local", "host2.local"])}},
+            callback=None,
+            progress=None,
+            progress_is_incremental=True,
+            shards=2,
+        )
+    with pytest.raises(ConnectionError):
+        run_playbook_batch(
+            [PlaybookRun(playbook_path=Path("/playbooks/audit.yaml"), extra_vars={}, inventory="host1.local")], None
+        )
+
+    assert controller.in_flight() == 0
+    assert controller.in_flight("audit.yaml") == 0
+
+
+def test_admission_slots_are_released_when_registration_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = AdmissionController()
+    monkeypatch.setattr("lso.execute.get_admission_controller", lambda: controller)
+    registry = MagicMock()
+    registry.create.side_effect = sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr("lso.execute.get_job_registry", lambda: registry)
+
+    with pytest.raises(sqlite3.OperationalError):
+        run_executable_async(Path("/bin/true"), [], None)
+    with pytest.raises(sqlite3.OperationalError):
+        run_executable_batch([ExecutableRun(executable_path=Path("/bin/true"))] * 2, None)
+
+    assert controller.in_flight() == 0
@@ -0,0 +1,118 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+from lso.catalogue import PlaybookCatalogue
+
+
+def test_catalogue_indexes_playbooks(tmp_path: Path) -> None:
+    (tmp_path / "hello.yaml").write_text("- hosts: all\n")
+    (tmp_path / "roles").mkdir()
+    (tmp_path / "roles" / "site.yaml").write_text("- hosts: routers\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+
+    catalogue = PlaybookCatalogue(tmp_path, refresh_interval_sec=60)
+
+    assert [entry.name for entry in catalogue.entries()] == ["hello.yaml", "roles/site.yaml"]
+    entry = catalogue.get(Path("hello.yaml"))
+    assert entry is not None
+    assert entry.size == len("- hosts: all\n")
+    assert entry.sha256 == hashlib.sha256(b"- hosts: all\n").hexdigest()
+    assert catalogue.get(Path("missing.yaml")) is None
+    assert catalogue.get(Path("../hello.yaml")) is None
+
+
+def test_catalogue_picks_up_changes(tmp_path: Path) -> None:
+    playbook = tmp_path / "hello.yaml"
+    playbook.write_text("- hosts: all\n")
+    catalogue = PlaybookCatalogue(tmp_path, refresh_interval_sec=60)
+
+    # A playbook that is added after the last refresh is found without waiting for the next one.
+    (tmp_path / "new.yaml").write_text("- hosts: new\n")
+    assert catalogue.get(Path("new.yaml")) is not None
+
+    playbook.write_text("- hosts: routers\n")
+    playbook.touch()
+    (tmp_path / "new.yaml").unlink()
+    catalogue.refresh()
+
+    assert catalogue.get(Path("hello.yaml")).sha256 == hashlib.sha256(b"- hosts: routers\n").hexdigest()
+    assert [entry.name for entry in catalogue.entries()] == ["hello.yaml"]
+
+
+def test_catalogue_only_hashes_changed_files(tmp_path: Path) -> None:
+    (tmp_path / "hello.yaml").write_text("- hosts: all\n")
+    catalogue = PlaybookCatalogue(tmp_path, refresh_interval_sec=60)
+
+    with patch("lso.catalogue._hash_file") as mock_hash:
+        catalogue.refresh()
+
+    mock_hash.assert_not_called()
+
+
+def test_catalogue_follows_symlinks(tmp_path: Path) -> None:
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "site.yaml").write_text("- hosts: all\n")
+    root = tmp_path / "playbooks"
+    root.mkdir()
+    (root / "shared").symlink_to(shared)
+    # A link to a parent directory is only walked once.
+    (shared / "loop").symlink_to(shared)
+
+    catalogue = PlaybookCatalogue(root, refresh_interval_sec=60)
+
+    assert [entry.name for entry in catalogue.entries()] == ["shared/site.yaml"]
+
+
+def test_catalogue_indexes_new_playbook_on_its_own(tmp_path: Path) -> None:
+    catalogue = PlaybookCatalogue(tmp_path, refresh_interval_sec=60)
+    (tmp_path / "new.yaml").write_text("- hosts: new\n")
+    (tmp_path / ".hidden.yaml").write_text("- hosts: hidden\n")
+
+    # The lookup neither walks the playbook directory, nor waits for a refresh that is in progress.
+    with catalogue._refresh_lock, patch.object(catalogue, "_walk") as mock_walk:  # noqa: SLF001
+        found = catalogue.get(Path("new.yaml"))
+        hidden = catalogue.get(Path(".hidden.yaml"))
+    mock_walk.assert_not_called()
+
+    assert found is not None
+    assert found.sha256 == hashlib.sha256(b"- hosts: new\n").hexdigest()
+    assert hidden is None
+    assert [entry.name for entry in catalogue.entries()] == ["new.yaml"]
+
+
+def test_catalogue_refreshes_in_background(tmp_path: Path) -> None:
+    catalogue = PlaybookCatalogue(tmp_path, refresh_interval_sec=0)
+    (tmp_path / "new.yaml").write_text("- hosts: new\n")
+    proceed = threading.Event()
+    refreshed = threading.Event()
+    refresh = catalogue.refresh
+
+    def refresh_in_thread() -> None:
+        assert threading.current_thread() is not threading.main_thread()
+        proceed.wait(timeout=5)
+        refresh()
+        refreshed.set()
+
+    with patch.object(catalogue, "refresh", side_effect=refresh_in_thread):
+        # The stale index is used until the refresh is done.
+        assert catalogue.entries() == []
+        proceed.set()
+        assert refreshed.wait(timeout=5)
+
+    assert [entry.name for entry in catalogue.entries()] == ["new.yaml"]
@@ -1,15 +1,29 @@
+import asyncio
+import os
 import subprocess
+import threading
+import time
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import pytest
 import responses
 
-from lso.config import ExecutorType
-from lso.execute import get_executable_path, run_executable_async, run_executable_sync
-from lso.schema import JobStatus
+from lso.config import ExecutorType, settings
+from lso.execute import (
+    _OutputCapture,
+    get_artifact_path,
+    get_executable_path,
+    prepare_artifacts_dir,
+    run_executable_aio,
+    run_executable_async,
+    run_executable_sync,
+    stream_executable,
+)
+from lso.jobs import get_job_registry
+from lso.schema import ExecutionResult, JobState, JobStatus
 from lso.tasks import CallbackFailedError
-from test.utils import temp_executable_env
+from test.utils import temp_executable_env, temporary_executor
 
 TEST_CALLBACK_URL = "http://localhost/callback"
 
@@ -45,8 +59,23 @@ def test_run_executable_async_threadpool_callback_failure(temp_executable: Path)
         assert str(exc.value) == f"500: Internal Server Error for url: {TEST_CALLBACK_URL}"
 
 
+def test_run_executable_async_processpool(temp_executable: Path):
+    """ProcessPool mode: the executable is run by a separate process, which records the result in the registry."""
+    with temp_executable_env(ExecutorType.PROCESSPOOL) as exec_dir:
+        target_exe = exec_dir / temp_executable.name
+        target_exe.write_text(temp_executable.read_text())
+        target_exe.chmod(0o755)
+
+        job_id = run_executable_async(target_exe, [], None)
+
+    job = get_job_registry().get(str(job_id))
+    assert job is not None
+    assert job.state == JobState.FINISHED
+    assert "Executable Test" in (job.output or "")
+
+
 def test_run_executable_async_worker_delay(monkeypatch, temp_executable: Path):
-    """Worker mode: schedules Celery .delay without HTTP calls."""
+    """Worker mode: schedules Celery .apply_async without HTTP calls."""
     with temp_executable_env(ExecutorType.WORKER) as exec_dir:
         target_exe = exec_dir / temp_executable.name
         target_exe.write_text(temp_executable.read_text())
@@ -57,8 +86,8 @@ def test_run_executable_async_worker_delay(monkeypatch, temp_executable: Path):
 
         monkeypatch.setattr(
             exec_mod.run_executable_proc_task,
-            "delay",
-            lambda job_id, path, args, callback: calls.append((job_id, path, args, callback)),
+            "apply_async",
+            lambda task_args, **_options: calls.append(task_args),
         )
 
         job_id = run_executable_async(target_exe, ["a", "b"], TEST_CALLBACK_URL)
@@ -123,3 +152,249 @@ def test_run_executable_sync_exception(monkeypatch):
     assert result.return_code == -1
     assert "boom!" in result.output
     assert result.status == JobStatus.FAILED
+
+
+def test_run_executable_sync_large_output(tmp_path: Path, monkeypatch):
+    """Output beyond the configured maximum is spilled to an artifact, and only its head and tail are returned."""
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_MAX_BYTES", 1024)
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_EXCERPT_BYTES", 64)
+    chatty = tmp_path / "chatty.sh"
+    chatty.write_text("#!/bin/sh\necho first\nseq 1 1000\necho last >&2\n")
+    chatty.chmod(0o755)
+
+    result = run_executable_sync(str(chatty), [])
+
+    assert result.return_code == 0
+    assert result.artifact_id is not None
+    assert result.output.startswith("first\n")
+    assert result.output.endswith("1000\nlast\n")
+    assert f"full output is available as artifact {result.artifact_id}" in result.output
+    full_output = get_artifact_path(result.artifact_id).read_text()
+    assert full_output.startswith("first\n1\n2\n")
+    assert full_output.endswith("999\n1000\nlast\n")
+
+
+def test_run_executable_aio_timeout(tmp_path: Path, monkeypatch):
+    """An executable that runs past the timeout is killed along with its children, and reported as timed out."""
+    monkeypatch.setattr(settings, "EXECUTABLE_TIMEOUT_SEC", 0.5)
+    slow = tmp_path / "slow.sh"
+    slow.write_text("#!/bin/sh\necho started\nsleep 30\n")
+    slow.chmod(0o755)
+
+    result = asyncio.run(run_executable_aio(str(slow), []))
+
+    assert result.return_code == -1
+    assert result.output == "Execution timed out."
+    assert result.status == JobStatus.FAILED
+
+
+def test_run_executable_aio_concurrent(tmp_path: Path):
+    """Many executables run concurrently on the event loop, each with their own captured output."""
+    echo = tmp_path / "echo.sh"
+    echo.write_text('#!/bin/sh\nsleep 0.2\necho "$1"\necho "err $1" >&2\n')
+    echo.chmod(0o755)
+
+    async def _run_all():
+        return await asyncio.gather(*(run_executable_aio(str(echo), [str(i)]) for i in range(50)))
+
+    results = asyncio.run(_run_all())
+
+    assert [result.output for result in results] == [f"{i}\nerr {i}\n" for i in range(50)]
+    assert all(result.status == JobStatus.SUCCESSFUL for result in results)
+
+
+def test_run_executable_aio_reads_output_off_the_event_loop(tmp_path: Path, monkeypatch):
+    """Reading back a large output does not hold up the event loop."""
+    echo = tmp_path / "echo.sh"
+    echo.write_text("#!/bin/sh\necho done\n")
+    echo.chmod(0o755)
+    read = _OutputCapture.read
+
+    def slow_read(capture: _OutputCapture) -> tuple[str, UUID | None]:
+        time.sleep(0.5)
+        return read(capture)
+
+    monkeypatch.setattr(_OutputCapture, "read", slow_read)
+
+    async def _run_and_tick():
+        ticks = 0
+
+        async def _tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(_tick())
+        result = await run_executable_aio(str(echo), [])
+        ticker.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(_run_and_tick())
+
+    assert result.output == "done\n"
+    assert ticks > 10  # noqa: PLR2004
+
+
+def test_run_executable_aio_not_found():
+    """A missing executable results in return_code=-1 and the error as output."""
+    result = asyncio.run(run_executable_aio("/does/not/exist", []))
+    assert result.return_code == -1
+    assert "/does/not/exist" in result.output
+
+
+async def _collect(frames):
+    return [frame async for frame in frames]
+
+
+def test_stream_executable_timeout(tmp_path: Path, monkeypatch):
+    """A streamed executable that runs past the timeout is killed, and reported as timed out."""
+    monkeypatch.setattr(settings, "EXECUTABLE_TIMEOUT_SEC", 0.5)
+    slow = tmp_path / "slow.sh"
+    slow.write_text("#!/bin/sh\necho started\nsleep 30\n")
+    slow.chmod(0o755)
+
+    frames = asyncio.run(_collect(stream_executable(uuid4(), str(slow), [])))
+
+    assert frames[0]["output"] == "started\n"
+    assert frames[-2]["output"] == "Execution timed out."
+    assert frames[-1]["return_code"] == -1
+
+
+def test_stream_executable_disconnect(tmp_path: Path, monkeypatch):
+    """When the consumer stops early, the run is killed and finished in the job registry, off the event loop."""
+    slow = tmp_path / "slow.sh"
+    slow.write_text("#!/bin/sh\necho started\nsleep 30\n")
+    slow.chmod(0o755)
+    registry = get_job_registry()
+    registry_threads: set[str] = set()
+    for method in ("create", "mark_running", "mark_finished"):
+        original = getattr(registry, method)
+
+        def _recording(*args, _original=original, **kwargs):
+            registry_threads.add(threading.current_thread().name)
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(registry, method, _recording)
+    job_id = uuid4()
+
+    async def _first_frame():
+        frames = stream_executable(job_id, str(slow), [])
+        frame = await anext(frames)
+        await frames.aclose()
+        return frame
+
+    start = time.monotonic()
+    assert asyncio.run(_first_frame())["output"] == "started\n"
+
+    assert time.monotonic() - start < 5  # noqa: PLR2004
+    assert registry.get(str(job_id)).state == JobState.FAILED
+    assert threading.main_thread().name not in registry_threads
+
+
+def test_run_executable_result_cache(tmp_path: Path, monkeypatch):
+    """Successful results of cacheable executables are reused, until the executable changes."""
+    monkeypatch.setattr(settings, "EXECUTABLES_ROOT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXECUTABLE_CACHE_PATTERNS", ["lookup_*.sh"])
+    counter = tmp_path / "runs"
+    lookup = tmp_path / "lookup_prefix.sh"
+    lookup.write_text(f'#!/bin/sh\necho run >> {counter}\necho "$1"\n')
+    lookup.chmod(0o755)
+
+    assert run_executable_sync(str(lookup), ["a"]).output == "a\n"
+    assert asyncio.run(run_executable_aio(str(lookup), ["a"])).output == "a\n"
+    assert run_executable_sync(str(lookup), ["b"]).output == "b\n"
+    assert counter.read_text().splitlines() == ["run"] * 2
+
+    lookup.write_text(f'#!/bin/sh\necho run >> {counter}\necho "changed $1"\n')
+    assert run_executable_sync(str(lookup), ["a"]).output == "changed a\n"
+    assert counter.read_text().splitlines() == ["run"] * 3
+
+
+def test_run_executable_result_cache_skips_artifacts(tmp_path: Path, monkeypatch):
+    """Results with truncated output are not cached, since their artifact may expire before the cached result."""
+    monkeypatch.setattr(settings, "EXECUTABLES_ROOT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXECUTABLE_CACHE_PATTERNS", ["lookup_*.sh"])
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_MAX_BYTES", 16)
+    lookup = tmp_path / "lookup_all.sh"
+    lookup.write_text("#!/bin/sh\nseq 1 100\n")
+    lookup.chmod(0o755)
+
+    first = run_executable_sync(str(lookup), [])
+    second = run_executable_sync(str(lookup), [])
+
+    assert first.artifact_id is not None
+    assert second.artifact_id is not None
+    assert second.artifact_id != first.artifact_id
+
+
+def test_run_executable_sync_prunes_expired_artifacts(tmp_path: Path, monkeypatch):
+    """Expired artifacts, and temporary output files that were left behind by an earlier run, are removed."""
+    monkeypatch.setattr(settings, "EXECUTABLE_ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_MAX_BYTES", 16)
+    monkeypatch.setattr(settings, "EXECUTABLE_ARTIFACT_RETENTION_SEC", 3600)
+    monkeypatch.setattr("lso.execute._last_artifact_prune", 0.0)
+    artifacts_dir = tmp_path / "artifacts"
+    artifacts_dir.mkdir()
+    expired_artifact = get_artifact_path(uuid4())
+    leftover = artifacts_dir / "tmpleftover.tmp"
+    for path in (expired_artifact, leftover):
+        path.write_text("old output\n")
+        os.utime(path, (0, 0))
+    chatty = tmp_path / "chatty.sh"
+    chatty.write_text("#!/bin/sh\nseq 1 100\n")
+    chatty.chmod(0o755)
+
+    result = run_executable_sync(str(chatty), [])
+
+    assert result.artifact_id is not None
+    assert sorted(artifacts_dir.iterdir()) == [get_artifact_path(result.artifact_id)]
+
+
+def test_prepare_artifacts_dir_prunes_expired_artifacts(tmp_path: Path, monkeypatch):
+    """Expired artifacts are removed when the API starts, even if no executable is run."""
+    monkeypatch.setattr(settings, "EXECUTABLE_ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(settings, "EXECUTABLE_ARTIFACT_RETENTION_SEC", 3600)
+    (tmp_path / "artifacts").mkdir()
+    expired_artifact = get_artifact_path(uuid4())
+    expired_artifact.write_text("old output\n")
+    os.utime(expired_artifact, (0, 0))
+    recent_artifact = get_artifact_path(uuid4())
+    recent_artifact.write_text("new output\n")
+
+    prepare_artifacts_dir()
+
+    assert not expired_artifact.exists()
+    assert recent_artifact.exists()
+
+
+def _run_chatty_on_worker(tmp_path: Path, monkeypatch, *, shared: bool) -> ExecutionResult:
+    monkeypatch.setattr(settings, "EXECUTABLE_ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(settings, "EXECUTABLE_OUTPUT_MAX_BYTES", 16)
+    chatty = tmp_path / "chatty.sh"
+    chatty.write_text("#!/bin/sh\nseq 1 100\n")
+    chatty.chmod(0o755)
+    with temporary_executor(ExecutorType.WORKER):
+        if shared:
+            prepare_artifacts_dir()
+        return run_executable_sync(str(chatty), [])
+
+
+def test_worker_keeps_artifact_in_shared_dir(tmp_path: Path, monkeypatch):
+    """A Celery worker keeps an artifact if the API marked the artifacts directory, so it can be downloaded."""
+    result = _run_chatty_on_worker(tmp_path, monkeypatch, shared=True)
+
+    assert result.artifact_id is not None
+    assert get_artifact_path(result.artifact_id).read_text().startswith("1\n2\n")
+
+
+def test_worker_leaves_out_artifact_in_unshared_dir(tmp_path: Path, monkeypatch):
+    """A Celery worker that does not share the artifacts directory with the API does not refer to an artifact."""
+    result = _run_chatty_on_worker(tmp_path, monkeypatch, shared=False)
+
+    assert result.return_code == 0
+    assert result.artifact_id is None
+    assert result.output.startswith("1\n")
+    assert result.output.endswith("100\n")
+    assert "bytes omitted ...]" in result.output
+    assert not list((tmp_path / "artifacts").glob("*.log"))
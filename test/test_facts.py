@@ -0,0 +1,73 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lso.config import settings
+from lso.facts import fact_cache_envvars, invalidate_facts
+from lso.tasks import run_playbook_proc_task
+
+
+def test_fact_cache_envvars(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "FACT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "FACT_CACHE_TTL_SEC", 600)
+
+    monkeypatch.setattr(settings, "FACT_CACHE_ENABLED", False)
+    assert fact_cache_envvars() == {}
+
+    monkeypatch.setattr(settings, "FACT_CACHE_ENABLED", True)
+    envvars = fact_cache_envvars()
+    assert envvars["ANSIBLE_GATHERING"] == "smart"
+    assert envvars["ANSIBLE_CACHE_PLUGIN"] == "jsonfile"
+    assert envvars["ANSIBLE_CACHE_PLUGIN_CONNECTION"] == str(tmp_path)
+    assert envvars["ANSIBLE_CACHE_PLUGIN_TIMEOUT"] == "600"
+    assert fact_cache_envvars(refresh=True)["ANSIBLE_GATHERING"] == "implicit"
+
+
+def test_run_playbook_passes_fact_cache_to_runner(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: dict[str, Any] = {}
+    monkeypatch.setattr("ansible_runner.run", lambda *_args, **kwargs: captured.update(kwargs))
+    monkeypatch.setattr(settings, "FACT_CACHE_ENABLED", True)
+
+    run_playbook_proc_task(
+        job_id="facts-1",
+        playbook_path="/path/to/playbook.yaml",
+        extra_vars={},
+        inventory="127.0.0.1",
+        callback=None,
+        progress=None,
+        progress_is_incremental=True,
+        refresh_facts=True,
+    )
+
+    assert captured["envvars"]["ANSIBLE_GATHERING"] == "implicit"
+
+
+def test_invalidate_facts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Only the cache files of the given hosts are removed, and nothing outside of the cache directory."""
+    cache_dir = tmp_path / "facts"
+    cache_dir.mkdir()
+    monkeypatch.setattr(settings, "FACT_CACHE_DIR", str(cache_dir))
+    for host in ("host1.local", "host2.local"):
+        (cache_dir / host).write_text("{}")
+    outside = tmp_path / "outside"
+    outside.write_text("{}")
+
+    invalidated = invalidate_facts(["host1.local", "unknown.local", "../outside"])
+
+    assert invalidated == ["host1.local"]
+    assert not (cache_dir / "host1.local").exists()
+    assert (cache_dir / "host2.local").exists()
+    assert outside.exists()
@@ -0,0 +1,100 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sqlite3
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from lso.config import settings
+from lso.jobs import JobRegistry
+from lso.schema import JobState
+
+
+@pytest.fixture
+def registry(tmp_path: Path) -> JobRegistry:
+    return JobRegistry(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_job_lifecycle(registry: JobRegistry) -> None:
+    job_id = str(uuid4())
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+
+    job = registry.get(job_id)
+    assert job is not None
+    assert job.state == JobState.QUEUED
+    assert job.started_at is None
+
+    registry.mark_running(job_id)
+    assert registry.get(job_id).state == JobState.RUNNING
+
+    registry.mark_finished(job_id, return_code=0, output="all done", failed=False)
+    job = registry.get(job_id)
+    assert job.state == JobState.FINISHED
+    assert job.return_code == 0
+    assert job.output == "all done"
+    assert job.created_at <= job.started_at <= job.finished_at
+
+
+def test_job_failed_output_is_bounded(registry: JobRegistry, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "JOB_OUTPUT_SUMMARY_MAX_CHARS", 10)
+    job_id = str(uuid4())
+    registry.create(job_id, "executable", "/executables/script.sh")
+    registry.mark_finished(job_id, return_code=1, output="x" * 100 + "last line!", failed=True)
+
+    job = registry.get(job_id)
+    assert job.state == JobState.FAILED
+    assert job.output == "last line!"
+
+
+def test_job_unknown_and_purged(registry: JobRegistry) -> None:
+    assert registry.get(str(uuid4())) is None
+
+    job_id = str(uuid4())
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+    registry.purge(time.time() + 1)
+    assert registry.get(job_id) is None
+
+
+def test_job_registry_adds_missing_columns(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.sqlite3"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, name TEXT NOT NULL, state TEXT NOT NULL, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, updated_at REAL NOT NULL, "
+            "return_code INTEGER, output TEXT)"
+        )
+    connection.close()
+
+    registry = JobRegistry(str(path))
+    job_id = str(uuid4())
+    assert registry.create_or_attach(job_id, "playbook", "/playbooks/hello.yaml", "hash", None) is None
+    assert registry.create_or_attach(str(uuid4()), "playbook", "/playbooks/hello.yaml", "hash", None) == job_id
+
+
+def test_job_cancel(registry: JobRegistry) -> None:
+    """A cancelled job is not started, and keeps its state when the run that was in progress finishes anyway."""
+    job_id = str(uuid4())
+    registry.create(job_id, "executable", "/executables/script.sh", callback="http://localhost/callback")
+
+    assert registry.cancel(job_id, "Job was cancelled.") == [(job_id, "executable", "http://localhost/callback")]
+    assert registry.cancelled([job_id, str(uuid4())]) == {job_id}
+    assert registry.mark_running(job_id) is False
+    assert registry.mark_finished(job_id, return_code=0, output="all done", failed=False) is None
+
+    job = registry.get(job_id)
+    assert job.state == JobState.CANCELLED
+    assert job.return_code == -1
+    assert job.output == "Job was cancelled."
+    assert registry.cancel(job_id, "Job was cancelled.") == []
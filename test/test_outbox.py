@@ -0,0 +1,158 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import sqlite3
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import responses
+from fastapi import status
+
+from lso.config import settings
+from lso.outbox import CallbackOutbox
+from lso.tasks import run_executable_proc_task
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+
+
+@pytest.fixture
+def outbox(tmp_path: Path) -> CallbackOutbox:
+    return CallbackOutbox(str(tmp_path / "outbox.sqlite3"))
+
+
+@responses.activate
+def test_outbox_delivers_callback(outbox: CallbackOutbox) -> None:
+    callback = responses.post(TEST_CALLBACK_URL)
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1", "status": "successful"})
+
+    outbox.dispatch_due()
+
+    assert callback.call_count == 1
+    assert json.loads(callback.calls[0].request.body) == {"job_id": "job-1", "status": "successful"}
+    assert outbox.pending() == 0
+
+
+@responses.activate
+def test_outbox_retries_with_backoff(outbox: CallbackOutbox, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CALLBACK_RETRY_MAX_ATTEMPTS", 2)
+    callback = responses.post(TEST_CALLBACK_URL, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+
+    outbox.dispatch_due()
+    assert callback.call_count == 1
+    assert outbox.pending() == 1
+
+    # The retry is not due yet.
+    outbox.dispatch_due()
+    assert callback.call_count == 1
+
+    with patch("lso.outbox.time.time", return_value=time.time() + settings.CALLBACK_RETRY_BASE_DELAY_SEC):
+        outbox.dispatch_due()
+    assert callback.call_count == 2  # noqa: PLR2004
+    # The maximum amount of attempts was reached, so the callback is no longer retried, but kept as failed.
+    assert outbox.pending() == 0
+    assert [(failed.url, failed.payload, failed.attempts) for failed in outbox.failed()] == [
+        (TEST_CALLBACK_URL, {"job_id": "job-1"}, 2)
+    ]
+
+
+@responses.activate
+def test_outbox_replays_failed_callbacks(outbox: CallbackOutbox, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CALLBACK_RETRY_MAX_ATTEMPTS", 1)
+    callback = responses.post(TEST_CALLBACK_URL, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-2"})
+    outbox.dispatch_due()
+    first, second = outbox.failed()
+
+    callback.status = status.HTTP_200_OK
+    assert outbox.replay([first.callback_id]) == 1
+    outbox.dispatch_due()
+
+    assert callback.call_count == 3  # noqa: PLR2004
+    assert json.loads(callback.calls[2].request.body) == {"job_id": "job-1"}
+    assert [failed.callback_id for failed in outbox.failed()] == [second.callback_id]
+    assert outbox.replay() == 1
+    outbox.dispatch_due()
+    assert outbox.failed() == []
+    assert outbox.pending() == 0
+
+
+@responses.activate
+def test_outbox_claim_is_rolled_back_on_error(outbox: CallbackOutbox, monkeypatch: pytest.MonkeyPatch) -> None:
+    callback = responses.post(TEST_CALLBACK_URL)
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+    # A batch size that SQLite refuses as a limit, so claiming fails halfway through its transaction.
+    monkeypatch.setattr("lso.outbox._BATCH_SIZE", 2.5)
+    with pytest.raises(sqlite3.IntegrityError):
+        outbox.dispatch_due()
+    monkeypatch.undo()
+
+    outbox.dispatch_due()
+
+    assert callback.call_count == 1
+    assert outbox.pending() == 0
+
+
+@responses.activate
+def test_outbox_circuit_breaker(outbox: CallbackOutbox, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CALLBACK_CIRCUIT_BREAKER_THRESHOLD", 1)
+    callback = responses.post(TEST_CALLBACK_URL, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-2"})
+
+    outbox.dispatch_due()
+
+    # The first failure opened the circuit, so the second callback was not attempted.
+    assert callback.call_count == 1
+    assert outbox.pending() == 2  # noqa: PLR2004
+
+
+@responses.activate
+def test_executable_callback_goes_through_outbox(
+    outbox: CallbackOutbox, temp_executable: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "CALLBACK_OUTBOX_ENABLED", True)
+    callback = responses.post(TEST_CALLBACK_URL, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    with patch("lso.tasks.get_callback_outbox", return_value=outbox):
+        # The job does not wait for, or fail on, the callback.
+        run_executable_proc_task("0a1d4b8e-1a1b-4c1d-8e1f-0a1b2c3d4e5f", str(temp_executable), [], TEST_CALLBACK_URL)
+
+    assert callback.call_count == 0
+    assert outbox.pending() == 1
+
+
+@responses.activate
+def test_outbox_adds_columns_to_existing_database(tmp_path: Path) -> None:
+    path = tmp_path / "outbox.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE callbacks (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, payload TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, lease_until REAL NOT NULL DEFAULT 0)"
+    )
+    connection.execute(
+        "INSERT INTO callbacks (url, payload, next_attempt_at) VALUES (?, ?, ?)", (TEST_CALLBACK_URL, "{}", 0)
+    )
+    connection.commit()
+    connection.close()
+    callback = responses.post(TEST_CALLBACK_URL)
+
+    outbox = CallbackOutbox(str(path))
+    outbox.enqueue(TEST_CALLBACK_URL, {"job_id": "job-1"})
+    outbox.dispatch_due()
+
+    assert callback.call_count == 2  # noqa: PLR2004
+    assert outbox.pending() == 0
@@ -11,16 +11,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import time
+from io import StringIO
 from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
 
 import pytest
 import responses
 from starlette import status
 
-from lso.config import settings
-from lso.playbook import run_playbook
-from lso.tasks import run_playbook_proc_task
+from lso.config import ExecutorType, settings
+from lso.jobs import get_job_registry
+from lso.playbook import PlaybookRun, _inventory_hosts, run_playbook
+from lso.schema import JobState
+from lso.tasks import PlaybookFinishedHandler, run_playbook_proc_task
 
 TEST_CALLBACK_URL = "http://localhost/callback"
 TEST_PROGRESS_URL = "http://localhost/progress"
@@ -50,7 +56,7 @@ def test_run_playbook_passes_configured_timeout_to_runner(monkeypatch: pytest.Mo
     def fake_run(*_args: Any, **kwargs: Any) -> None:
         captured.update(kwargs)
 
-    monkeypatch.setattr("lso.tasks.run", fake_run)
+    monkeypatch.setattr("ansible_runner.run", fake_run)
     monkeypatch.setattr(settings, "ANSIBLE_PLAYBOOK_TIMEOUT_SEC", configured_timeout)
 
     run_playbook_proc_task(
@@ -66,6 +72,35 @@ def test_run_playbook_passes_configured_timeout_to_runner(monkeypatch: pytest.Mo
     assert captured["settings"]["pexpect_timeout"] == configured_timeout
 
 
+@responses.activate
+def test_run_playbook_deadline_kills_run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A run that keeps going past its deadline is killed promptly, and reported with status `timeout`."""
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_INTERVAL_SEC", 0.1)
+    playbook = tmp_path / "slow.yaml"
+    playbook.write_text("- hosts: all\n  gather_facts: false\n  tasks:\n    - command: sleep 60\n")
+    callback = responses.post(TEST_CALLBACK_URL)
+    job_id = str(uuid4())
+    get_job_registry().create(job_id, "playbook", str(playbook))
+
+    start = time.monotonic()
+    run_playbook_proc_task(
+        job_id=job_id,
+        playbook_path=str(playbook),
+        extra_vars={},
+        inventory="localhost ansible_connection=local",
+        callback=TEST_CALLBACK_URL,
+        progress=None,
+        progress_is_incremental=True,
+        deadline_sec=1,
+    )
+
+    assert time.monotonic() - start < 30  # noqa: PLR2004
+    payload = json.loads(callback.calls[0].request.body)
+    assert payload["status"] == "timeout"
+    assert payload["output"][-1] == "Playbook run was killed, because it passed its deadline."
+    assert get_job_registry().get(job_id).state == JobState.FAILED
+
+
 @responses.activate
 def test_run_playbook_crash_posts_failure_callback(monkeypatch: pytest.MonkeyPatch) -> None:
     """If ansible_runner.run raises, a failed-status callback is POSTed before the exception is re-raised.
@@ -78,7 +113,7 @@ def test_run_playbook_crash_posts_failure_callback(monkeypatch: pytest.MonkeyPat
     def fake_run(*_args: Any, **_kwargs: Any) -> None:
         raise RuntimeError(crash_message)
 
-    monkeypatch.setattr("lso.tasks.run", fake_run)
+    monkeypatch.setattr("ansible_runner.run", fake_run)
     callback = responses.post(TEST_CALLBACK_URL)
 
     with pytest.raises(RuntimeError, match="TIMEOUT"):
@@ -121,7 +156,7 @@ def test_run_playbook_result_callback_failure_not_double_posted(monkeypatch: pyt
         # Simulate a completed run invoking its finished_callback, which POSTs the result callback.
         kwargs["finished_callback"](_Runner())
 
-    monkeypatch.setattr("lso.tasks.run", fake_run)
+    monkeypatch.setattr("ansible_runner.run", fake_run)
     # Orchestrator rejects the result callback, so the finished handler raises CallbackFailedError.
     responses.post(TEST_CALLBACK_URL, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -138,3 +173,109 @@ def test_run_playbook_result_callback_failure_not_double_posted(monkeypatch: pyt
 
     # Exactly one POST — the result callback. No spurious second failure callback.
     responses.assert_call_count(TEST_CALLBACK_URL, 1)
+
+
+@responses.activate
+def test_run_playbook_duplicate_attaches_to_job_in_progress(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A duplicate request does not start a second run, and its callback receives the result of the first run."""
+    monkeypatch.setattr(settings, "PLAYBOOK_DEDUPLICATION_ENABLED", True)
+    monkeypatch.setattr(settings, "EXECUTOR", ExecutorType.WORKER)
+    dispatched: list[str] = []
+    monkeypatch.setattr(
+        run_playbook_proc_task, "apply_async", lambda args, _kwargs, **_options: dispatched.append(args[0])
+    )
+    responses.post(TEST_CALLBACK_URL)
+    other_callback_url = "http://localhost/other-callback"
+    responses.post(other_callback_url)
+
+    request = {
+        "playbook_path": Path("/playbooks/deploy.yaml"),
+        "extra_vars": {"dry_run": True, "vlan": 100},
+        "inventory": {"all": {"hosts": {"host1.local": None}}},
+        "progress": None,
+        "progress_is_incremental": True,
+    }
+    job_id = run_playbook(callback=TEST_CALLBACK_URL, **request)
+    duplicate_job_id = run_playbook(callback=other_callback_url, **request)
+    other_job_id = run_playbook(callback=TEST_CALLBACK_URL, **{**request, "extra_vars": {"dry_run": False}})
+    # Requests that run the same playbook in a different way are not duplicates either.
+    deadline_job_id = run_playbook(callback=TEST_CALLBACK_URL, **request, deadline_sec=60)
+    refresh_job_id = run_playbook(callback=TEST_CALLBACK_URL, **request, refresh_facts=True)
+
+    assert dispatched == [str(job_id), str(other_job_id), str(deadline_job_id), str(refresh_job_id)]
+    registry = get_job_registry()
+    assert registry.get(str(duplicate_job_id)).attached_to == job_id
+
+    runner = MagicMock(status="successful", rc=0, stdout=StringIO("ok: [host1.local]\n"))
+    PlaybookFinishedHandler(TEST_CALLBACK_URL, str(job_id))(runner)
+
+    callbacks = {call.request.url: json.loads(call.request.body) for call in responses.calls}
+    assert callbacks[TEST_CALLBACK_URL]["job_id"] == str(job_id)
+    assert callbacks[other_callback_url]["job_id"] == str(duplicate_job_id)
+    assert callbacks[other_callback_url]["output"] == ["ok: [host1.local]"]
+    assert registry.get(str(duplicate_job_id)).state == JobState.FINISHED
+    assert registry.get(str(other_job_id)).state == JobState.QUEUED
+
+
+def test_inventory_hosts() -> None:
+    """Hosts are collected from all groups of an inventory, once each, in the order in which they appear."""
+    inventory = {
+        "_meta": {"hostvars": {"ignored.local": {}}},
+        "all": {
+            "hosts": {"host1.local": None},
+            "children": {"routers": {"hosts": ["host2.local", "host1.local"]}},
+        },
+        "switches": {"hosts": {"host3.local": {"foo": "bar"}}},
+    }
+    ini_inventory = "host1.local\n# comment\n[routers]\nhost2.local ansible_host=10.0.0.2\n[routers:vars]\nfoo=bar\n"
+
+    assert _inventory_hosts(inventory) == ["host1.local", "host2.local", "host3.local"]
+    assert _inventory_hosts(ini_inventory) == ["host1.local", "host2.local"]
+
+
+@responses.activate
+def test_run_playbook_sharded_merges_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A sharded run runs every shard against its own hosts, and sends a single callback with the merged result."""
+    responses.post(TEST_CALLBACK_URL)
+    limits: list[str] = []
+
+    def fake_run(*_args: Any, limit: str, finished_callback: Any, **_kwargs: Any) -> None:
+        limits.append(limit)
+        failed = "host2.local" in limit
+        runner = MagicMock(
+            status="failed" if failed else "successful",
+            rc=2 if failed else 0,
+            stdout=StringIO(f"PLAY RECAP {limit}\n"),
+            stats={"ok": dict.fromkeys(limit.split(","), 1), "failures": {"host2.local": 1} if failed else {}},
+        )
+        finished_callback(runner)
+
+    monkeypatch.setattr("ansible_runner.run", fake_run)
+    job_id = run_playbook(
+        playbook_path=Path("/playbooks/audit.yaml"),
+        extra_vars={},
+        inventory={"all": {"hosts": dict.fromkeys(["host1.local", "host2.local", "host3.local"])}},
+        callback=TEST_CALLBACK_URL,
+        progress=None,
+        progress_is_incremental=True,
+        shards=2,
+    )
+
+    assert limits == ["host1.local,host3.local", "host2.local"]
+    responses.assert_call_count(TEST_CALLBACK_URL, 1)
+    result = json.loads(responses.calls[0].request.body)
+    assert result["job_id"] == str(job_id)
+    assert result["status"] == "failed"
+    assert result["return_code"] == 2  # noqa: PLR2004
+    assert result["output"] == ["PLAY RECAP host1.local,host3.local", "PLAY RECAP host2.local"]
+    assert result["stats"]["ok"] == {"host1.local": 1, "host2.local": 1, "host3.local": 1}
+    assert result["stats"]["failures"] == {"host2.local": 1}
+    assert get_job_registry().get(str(job_id)).state == JobState.FAILED
+
+
+def test_playbook_request_hash() -> None:
+    run = PlaybookRun(playbook_path=Path("/playbooks/deploy.yaml"), extra_vars={"vlan": 100}, inventory="host1.local")
+
+    assert run.request_hash() == run.model_copy().request_hash()
+    for update in ({"shards": 2}, {"deadline_sec": 60}, {"refresh_facts": True}, {"extra_vars": {"vlan": 200}}):
+        assert run.model_copy(update=update).request_hash() != run.request_hash()
@@ -0,0 +1,228 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import threading
+from typing import Any
+from uuid import uuid4
+
+import pytest
+import requests
+import responses
+from fastapi import status
+
+from lso.config import ProgressQueueFullPolicy, settings
+from lso.jobs import get_job_registry
+from lso.progress import ProgressReporter
+
+TEST_PROGRESS_URL = "http://localhost/progress"
+
+
+@responses.activate
+def test_progress_events_are_batched(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_WINDOW_SEC", 60)
+    progress = responses.post(TEST_PROGRESS_URL)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, "job-1", progress_is_incremental=True)
+    reporter.put(["TASK [one]"])
+    reporter.put(["ok: [host1]", "ok: [host2]"])
+    reporter.close()
+
+    assert progress.call_count == 1
+    assert json.loads(progress.calls[0].request.body) == {"progress": ["TASK [one]", "ok: [host1]", "ok: [host2]"]}
+
+
+@responses.activate
+def test_progress_full_history(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_MAX_EVENTS", 1)
+    progress = responses.post(TEST_PROGRESS_URL)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, "job-1", progress_is_incremental=False)
+    reporter.put(["TASK [one]"])
+    reporter.put(["TASK [two]"])
+    reporter.close()
+
+    assert [json.loads(call.request.body)["progress"] for call in progress.calls] == [
+        ["TASK [one]"],
+        ["TASK [one]", "TASK [two]"],
+    ]
+
+
+def test_progress_queue_drops_oldest_when_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_MAX_EVENTS", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_MAX_SIZE", 2)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_FULL_POLICY", ProgressQueueFullPolicy.DROP_OLDEST)
+    sending = threading.Event()
+    release = threading.Event()
+    sent: list[list[str]] = []
+
+    def slow_post(_session: Any, _url: str, json: dict[str, Any], **_kwargs: Any) -> requests.Response:
+        sending.set()
+        release.wait()
+        sent.append(json["progress"])
+        response = requests.Response()
+        response.status_code = status.HTTP_200_OK
+        return response
+
+    monkeypatch.setattr("requests.Session.post", slow_post)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, "job-1", progress_is_incremental=True)
+    reporter.put(["event 0"])
+    sending.wait()
+    # The progress endpoint is stuck, but queueing more events never blocks the playbook run.
+    for i in range(1, 5):
+        reporter.put([f"event {i}"])
+    release.set()
+    reporter.close()
+
+    assert reporter.dropped == 2  # noqa: PLR2004
+    assert sent == [["event 0"], ["event 3"], ["event 4"]]
+
+
+@responses.activate
+def test_progress_sequenced(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_MAX_EVENTS", 1)
+    monkeypatch.setattr(settings, "PROGRESS_BUFFER_MAX_LINES", 2)
+    progress = responses.post(TEST_PROGRESS_URL)
+    job_id = str(uuid4())
+    registry = get_job_registry()
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, job_id, progress_is_incremental=False, progress_is_sequenced=True)
+    reporter.put(["TASK [one]", "ok: [host1]"])
+    reporter.put(["TASK [two]"])
+    reporter.close()
+
+    assert [json.loads(call.request.body) for call in progress.calls] == [
+        {"progress": ["TASK [one]", "ok: [host1]"], "sequence": 0},
+        {"progress": ["TASK [two]"], "sequence": 2},
+    ]
+    # Only the last lines are buffered for retrieval.
+    assert registry.get_progress(job_id, since=0, limit=10) == [(1, "ok: [host1]"), (2, "TASK [two]")]
+
+
+def test_progress_sequenced_history_is_complete_when_events_are_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_MAX_EVENTS", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_MAX_SIZE", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_FULL_POLICY", ProgressQueueFullPolicy.DROP_OLDEST)
+    sending = threading.Event()
+    release = threading.Event()
+    sent: list[dict[str, Any]] = []
+
+    def slow_post(_session: Any, _url: str, json: dict[str, Any], **_kwargs: Any) -> requests.Response:
+        sending.set()
+        release.wait()
+        sent.append(json)
+        response = requests.Response()
+        response.status_code = status.HTTP_200_OK
+        return response
+
+    monkeypatch.setattr("requests.Session.post", slow_post)
+    job_id = str(uuid4())
+    registry = get_job_registry()
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, job_id, progress_is_incremental=False, progress_is_sequenced=True)
+    reporter.put(["event 0"])
+    sending.wait()
+    for i in range(1, 4):
+        reporter.put([f"event {i}", f"line {i}"])
+    release.set()
+    reporter.close()
+
+    assert reporter.dropped == 2  # noqa: PLR2004
+    # The receiver sees a gap in the sequence numbers, and can fill it from the stored history.
+    assert sent == [{"progress": ["event 0"], "sequence": 0}, {"progress": ["event 3", "line 3"], "sequence": 5}]
+    assert [line for _sequence, line in registry.get_progress(job_id, since=0, limit=10)] == [
+        "event 0",
+        "event 1",
+        "line 1",
+        "event 2",
+        "line 2",
+        "event 3",
+        "line 3",
+    ]
+
+
+def test_progress_sender_survives_unexpected_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_MAX_EVENTS", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_MAX_SIZE", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_FULL_POLICY", ProgressQueueFullPolicy.BLOCK)
+    sent: list[list[str]] = []
+
+    def broken_post(_session: Any, _url: str, json: dict[str, Any], **_kwargs: Any) -> requests.Response:
+        if json["progress"] == ["event 0"]:
+            msg = "Unexpected error"
+            raise ValueError(msg)
+        sent.append(json["progress"])
+        response = requests.Response()
+        response.status_code = status.HTTP_200_OK
+        return response
+
+    monkeypatch.setattr("requests.Session.post", broken_post)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, "job-1", progress_is_incremental=True)
+    for i in range(3):
+        reporter.put([f"event {i}"])
+    reporter.close()
+
+    assert sent == [["event 1"], ["event 2"]]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_progress_put_does_not_block_when_sender_stopped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_MAX_SIZE", 1)
+    monkeypatch.setattr(settings, "PROGRESS_QUEUE_FULL_POLICY", ProgressQueueFullPolicy.BLOCK)
+
+    def broken_next_batch(_reporter: ProgressReporter) -> list[tuple[int, list[str]]]:
+        msg = "Unexpected error"
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr(ProgressReporter, "_next_batch", broken_next_batch)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, "job-1", progress_is_incremental=True)
+    reporter._sender.join()  # noqa: SLF001
+    for i in range(3):
+        reporter.put([f"event {i}"])
+    reporter.close()
+
+    assert reporter.dropped == 2  # noqa: PLR2004
+
+
+@responses.activate
+def test_progress_sequenced_is_stored_by_sender(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The playbook never waits on the job registry, the sender thread stores the output in batches."""
+    monkeypatch.setattr(settings, "PROGRESS_BATCH_WINDOW_SEC", 60)
+    responses.post(TEST_PROGRESS_URL)
+    job_id = str(uuid4())
+    registry = get_job_registry()
+    registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+    append_progress = registry.append_progress
+    stored_by: list[tuple[str, int]] = []
+
+    def recording_append_progress(job_id: str, first_sequence: int, lines: list[str]) -> None:
+        stored_by.append((threading.current_thread().name, len(lines)))
+        append_progress(job_id, first_sequence, lines)
+
+    monkeypatch.setattr(registry, "append_progress", recording_append_progress)
+
+    reporter = ProgressReporter(TEST_PROGRESS_URL, job_id, progress_is_incremental=False, progress_is_sequenced=True)
+    for i in range(3):
+        reporter.put([f"event {i}"])
+    reporter.close()
+
+    assert stored_by == [("lso-progress", 3)]
+    assert [line for _sequence, line in registry.get_progress(job_id, since=0, limit=10)] == [
+        "event 0",
+        "event 1",
+        "event 2",
+    ]
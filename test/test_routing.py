@@ -0,0 +1,61 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from lso.config import ExecutorType, settings
+from lso.playbook import run_playbook
+from lso.routing import task_options
+
+
+def test_task_options_first_matching_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        settings, "CELERY_QUEUE_ROUTES", {"interface_*.yaml": "lso-fast", "*.yaml": "lso-slow", "lookup_*": "lso-fast"}
+    )
+
+    assert task_options("interface_enable.yaml") == {"queue": "lso-fast"}
+    assert task_options("upgrade_fleet.yaml") == {"queue": "lso-slow"}
+    assert task_options("lookup_prefix.sh") == {"queue": "lso-fast"}
+    assert task_options("other.sh") == {}
+
+
+def test_task_options_priority_per_broker(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A higher priority is picked up first on every broker, while Redis serves the lowest number first."""
+    monkeypatch.setattr(settings, "CELERY_BROKER_URL", "amqp://localhost:5672//")
+    assert task_options("deploy.yaml", 8) == {"priority": 8}
+
+    monkeypatch.setattr(settings, "CELERY_BROKER_URL", "redis://localhost:6379/0")
+    assert task_options("deploy.yaml", 8) == {"priority": 1}
+
+
+def test_run_playbook_sends_route_and_priority(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXECUTOR", ExecutorType.WORKER)
+    monkeypatch.setattr(settings, "CELERY_BROKER_URL", "amqp://localhost:5672//")
+    monkeypatch.setattr(settings, "CELERY_QUEUE_ROUTES", {"interface_*.yaml": "lso-fast"})
+
+    with patch("lso.tasks.run_playbook_proc_task.apply_async") as mock_apply_async:
+        job_id = run_playbook(
+            playbook_path=Path(settings.ANSIBLE_PLAYBOOKS_ROOT_DIR) / "interface_enable.yaml",
+            extra_vars={},
+            inventory="host1.local",
+            callback=None,
+            progress=None,
+            progress_is_incremental=True,
+            priority=9,
+        )
+
+    mock_apply_async.assert_called_once()
+    assert mock_apply_async.call_args.args[0][0] == str(job_id)
+    assert mock_apply_async.call_args.kwargs == {"queue": "lso-fast", "priority": 9}
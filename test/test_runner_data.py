@@ -0,0 +1,90 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from lso.config import settings
+from lso.jobs import get_job_registry
+from lso.runner_data import get_private_data_dir, keep_private_data_dir, prune_private_data_dirs
+
+
+@pytest.fixture
+def runner_data_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_TMPFS", False)
+    return tmp_path
+
+
+def _make_private_data_dir(job_id: str, age_sec: float, size: int) -> Path:
+    private_data_dir = get_private_data_dir(job_id)
+    (private_data_dir / "stdout").write_bytes(b"x" * size)
+    mtime = time.time() - age_sec
+    os.utime(private_data_dir, (mtime, mtime))
+    return private_data_dir
+
+
+def test_private_data_dir_per_job_and_shard(runner_data_dir: Path) -> None:
+    assert get_private_data_dir("job-1") == runner_data_dir / "job-1"
+    assert get_private_data_dir("job-1", 2) == runner_data_dir / "job-1" / "shard-2"
+    assert (runner_data_dir / "job-1" / "shard-2").is_dir()
+
+
+@pytest.mark.usefixtures("runner_data_dir")
+def test_prune_private_data_dirs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The oldest directories are removed when they expire, or when there are too many, or they are too large."""
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_RETENTION_SEC", 3600)
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_MAX_COUNT", 3)
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_MAX_BYTES", 150)
+    expired = _make_private_data_dir("expired", age_sec=7200, size=10)
+    oldest = _make_private_data_dir("oldest", age_sec=300, size=100)
+    older = _make_private_data_dir("older", age_sec=200, size=100)
+    old = _make_private_data_dir("old", age_sec=100, size=100)
+    new = _make_private_data_dir("new", age_sec=0, size=10)
+
+    prune_private_data_dirs(force=True)
+
+    # The expired directory is removed for its age, the oldest to keep three directories, and the older one to stay
+    # within the size limit.
+    assert not expired.exists()
+    assert not oldest.exists()
+    assert not older.exists()
+    assert old.exists()
+    assert new.exists()
+
+
+@pytest.mark.usefixtures("runner_data_dir")
+def test_prune_skips_private_data_dirs_in_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ANSIBLE_RUNNER_DATA_RETENTION_SEC", 3600)
+    registry = get_job_registry()
+    queued_job_id, running_job_id, finished_job_id, kept_job_id = (str(uuid4()) for _ in range(4))
+    for job_id in (queued_job_id, running_job_id, finished_job_id):
+        registry.create(job_id, "playbook", "/playbooks/hello.yaml")
+    registry.mark_running(running_job_id)
+    registry.mark_running(finished_job_id)
+    registry.mark_finished(finished_job_id, return_code=0, output="", failed=False)
+    private_data_dirs = {
+        job_id: _make_private_data_dir(job_id, age_sec=7200, size=10)
+        for job_id in (queued_job_id, running_job_id, finished_job_id, kept_job_id)
+    }
+
+    with keep_private_data_dir(kept_job_id):
+        prune_private_data_dirs(force=True)
+
+    assert private_data_dirs[queued_job_id].exists()
+    assert private_data_dirs[running_job_id].exists()
+    assert not private_data_dirs[finished_job_id].exists()
+    assert private_data_dirs[kept_job_id].exists()
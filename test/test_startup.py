@@ -0,0 +1,65 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Startup benchmark of the API and the worker, each imported in a fresh interpreter.
+
+The import time budget can be set with `LSO_IMPORT_TIME_BUDGET_SEC`, for slower or faster machines.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_TIME_BUDGET_SEC = float(os.environ.get("LSO_IMPORT_TIME_BUDGET_SEC", "5.0"))
+#: Amount of times every module is imported, of which the fastest counts, to even out a busy machine.
+IMPORT_ATTEMPTS = 3
+
+_MEASURE_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _import(module: str) -> tuple[float, set[str]]:
+    """Import a module in a fresh interpreter, and return how long it took and which modules were loaded."""
+    results = []
+    for _ in range(IMPORT_ATTEMPTS):
+        process = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", _MEASURE_IMPORT.format(module=module)],
+            capture_output=True,
+            check=True,
+            text=True,
+            env={**os.environ, "EXECUTOR": "threadpool"},
+        )
+        results.append(json.loads(process.stdout.splitlines()[-1]))
+    fastest = min(results, key=lambda result: result["seconds"])
+    return fastest["seconds"], set(fastest["modules"])
+
+
+@pytest.mark.parametrize("module", ["lso.app", "lso.worker"])
+def test_import_time_within_budget(module: str) -> None:
+    seconds, _modules = _import(module)
+    assert seconds < IMPORT_TIME_BUDGET_SEC, f"Importing {module} took {seconds:.2f}s"
+
+
+def test_app_does_not_load_unused_backends() -> None:
+    """With a local executor, the API does not load Celery, and only loads Ansible once it is needed."""
+    _seconds, modules = _import("lso.app")
+    assert "lso.worker" not in modules
+    assert "celery.app.base" not in modules
+    assert not any(module.startswith("ansible.") for module in modules)
+    assert not any(module.startswith("ansible_runner") for module in modules)
@@ -0,0 +1,110 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+import responses
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lso.app import create_app
+from lso.config import TracingExporter, settings
+
+pytest.importorskip("opentelemetry.sdk", reason="Requires the tracing extra.")
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+
+
+class _Runner:
+    status = "successful"
+    rc = 0
+
+    def __init__(self) -> None:
+        self.stdout = StringIO("ok: [host1.local]\n")
+
+
+def _run(**kwargs: Any) -> None:
+    event = {"event": "runner_on_ok", "event_data": {"task": "ping", "host": "host1.local"}, "stdout": ""}
+    kwargs["event_handler"](event)
+    kwargs["finished_callback"](_Runner())
+
+
+@responses.activate
+def test_trace_spans_playbook_request_until_callback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    trace_file = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", TracingExporter.FILE)
+    monkeypatch.setattr(settings, "TRACING_FILE_PATH", str(trace_file))
+    monkeypatch.setattr("lso.tracing._tracer", None)
+    responses.post(TEST_CALLBACK_URL, status=status.HTTP_200_OK)
+    client = TestClient(create_app())
+
+    with patch("ansible_runner.run", new=_run):
+        rv = client.post(
+            "/api/playbook/",
+            json={"playbook_name": "placeholder.yaml", "inventory": "host1.local", "callback": TEST_CALLBACK_URL},
+        )
+    assert rv.status_code == status.HTTP_201_CREATED
+
+    spans = {span["name"]: span for span in map(json.loads, trace_file.read_text().splitlines())}
+    assert set(spans) == {
+        "POST /api/playbook/",
+        "validate inventory",
+        "dispatch playbook",
+        "run playbook",
+        "send callback",
+    }
+    trace_id = spans["POST /api/playbook/"]["context"]["trace_id"]
+    assert all(span["context"]["trace_id"] == trace_id for span in spans.values())
+    assert spans["run playbook"]["parent_id"] == spans["dispatch playbook"]["context"]["span_id"]
+    assert spans["run playbook"]["events"][0]["name"] == "runner_on_ok"
+    # The callback continues the same trace, so the receiving system can add its own spans to it.
+    traceparent = responses.calls[0].request.headers["traceparent"]
+    assert traceparent.split("-")[1] == trace_id.removeprefix("0x")
+
+
+@responses.activate
+def test_trace_continues_through_callback_outbox(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    trace_file = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", TracingExporter.FILE)
+    monkeypatch.setattr(settings, "TRACING_FILE_PATH", str(trace_file))
+    monkeypatch.setattr(settings, "CALLBACK_OUTBOX_ENABLED", True)
+    monkeypatch.setattr(settings, "CALLBACK_OUTBOX_PATH", str(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setattr("lso.tracing._tracer", None)
+    monkeypatch.setattr("lso.outbox._outbox", None)
+    responses.post(TEST_CALLBACK_URL, status=status.HTTP_200_OK)
+    client = TestClient(create_app())
+
+    with patch("ansible_runner.run", new=_run):
+        rv = client.post(
+            "/api/playbook/",
+            json={"playbook_name": "placeholder.yaml", "inventory": "host1.local", "callback": TEST_CALLBACK_URL},
+        )
+    assert rv.status_code == status.HTTP_201_CREATED
+    # The callback is delivered by the dispatcher thread of the outbox.
+    deadline = time.monotonic() + 5
+    while '"send callback"' not in trace_file.read_text() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    spans = {span["name"]: span for span in map(json.loads, trace_file.read_text().splitlines())}
+    trace_id = spans["POST /api/playbook/"]["context"]["trace_id"]
+    # The delivery by the outbox dispatcher continues the trace of the request, and passes it on to the receiver.
+    assert spans["send callback"]["context"]["trace_id"] == trace_id
+    traceparent = responses.calls[0].request.headers["traceparent"]
+    assert traceparent.split("-")[1] == trace_id.removeprefix("0x")
@@ -0,0 +1,66 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+
+from lso.utils import TTLCache, get_http_session, get_process_pool, submit_to_process_pool
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    max_entries = 2
+    cache: TTLCache[str, int] = TTLCache(max_entries=max_entries, ttl_sec=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") is not None
+    assert len(cache) == max_entries
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl_sec=60)
+    with patch("lso.utils.time.monotonic", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("lso.utils.time.monotonic", return_value=1061.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_disabled() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_entries=0, ttl_sec=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_http_session_is_shared_per_process() -> None:
+    session = get_http_session()
+    assert get_http_session() is session
+
+    with patch("lso.utils.os.getpid", return_value=-1):
+        assert get_http_session() is not session
+
+
+def test_process_pool_is_replaced_after_worker_crash() -> None:
+    crashed = submit_to_process_pool(os._exit, 1)
+    with pytest.raises(BrokenProcessPool):
+        crashed.result(timeout=60)
+
+    assert submit_to_process_pool(os.getpid).result(timeout=60) != os.getpid()
+    assert submit_to_process_pool(abs, -1).result(timeout=60) == 1
+    assert get_process_pool() is get_process_pool()
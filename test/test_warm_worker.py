@@ -0,0 +1,82 @@
+# Copyright 2026 GÉANT Vereniging.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import responses
+
+from lso.config import settings
+from lso.tasks import run_playbook_proc_task
+from lso.warm_worker import get_warm_pool
+
+TEST_CALLBACK_URL = "http://localhost/callback"
+TEST_PLAYBOOK = str(Path(__file__).parent / "test-playbook.yaml")
+
+
+@pytest.fixture
+def warm_workers(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(settings, "ANSIBLE_WARM_WORKERS", 1)
+    monkeypatch.setattr("lso.warm_worker._pool", None)
+    yield
+    get_warm_pool().shutdown()
+
+
+def _fail_runner(*_args: Any, **_kwargs: Any) -> None:
+    pytest.fail("The playbook was run with ansible-runner")
+
+
+@responses.activate
+@pytest.mark.usefixtures("warm_workers")
+def test_playbook_runs_in_warm_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    callback = responses.post(TEST_CALLBACK_URL)
+    monkeypatch.setattr("ansible_runner.run", _fail_runner)
+
+    for job_id in ("warm-1", "warm-2"):
+        run_playbook_proc_task(
+            job_id=job_id,
+            playbook_path=TEST_PLAYBOOK,
+            extra_vars={"unused": "value"},
+            inventory="127.0.0.1",
+            callback=TEST_CALLBACK_URL,
+            progress=None,
+            progress_is_incremental=True,
+        )
+
+    assert callback.call_count == 2  # noqa: PLR2004
+    payload = json.loads(callback.calls[-1].request.body)
+    assert payload["job_id"] == "warm-2"
+    assert payload["status"] == "successful"
+    assert payload["return_code"] == 0
+    assert any("ok=1" in line for line in payload["output"])
+
+
+@pytest.mark.usefixtures("warm_workers")
+def test_runs_with_progress_use_ansible_runner(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Warm workers do not report progress, so those runs still go through ansible-runner."""
+    captured: dict[str, Any] = {}
+    monkeypatch.setattr("ansible_runner.run", lambda *_args, **kwargs: captured.update(kwargs))
+
+    run_playbook_proc_task(
+        job_id="warm-3",
+        playbook_path=TEST_PLAYBOOK,
+        extra_vars={},
+        inventory="127.0.0.1",
+        callback=None,
+        progress="http://localhost/progress",
+        progress_is_incremental=True,
+    )
+
+    assert captured["playbook"] == TEST_PLAYBOOK